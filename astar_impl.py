@@ -1,13 +1,15 @@
 """
 astar_impl.py
 
-Arquivo-stub para os alunos implementarem o algoritmo A*.
+Arquivo da atividade para o algoritmo A*.
 
 Espera-se que o aluno defina uma função `run_astar(draw, grid, start, end)`
-com a mesma assinatura usada no visualizador principal. O visualizador
-atual usa uma busca "burra" (dumb_search) como placeholder — quando o
-aluno implementar esta função, pode integrar aqui e chamar a partir do
-visualizador (ou modificar `pathfinder.py` para importar e usar).
+com a mesma assinatura usada no visualizador principal. Por padrão ela
+delega para o motor de referência em `search_core.astar` (heap binário com
+remoção preguiçosa e heurística Manhattan), que é a linha de base ótima
+usada para comparar as soluções. Para fazer a atividade, substitua o corpo
+de `run_astar` pela sua implementação — se ela lançar
+`NotImplementedError`, o visualizador volta a usar a busca "burra".
 
 Requisitos (contrato mínimo):
 - draw: função sem argumentos que redesenha o grid (chame sempre que
@@ -22,10 +24,9 @@ Dica: evite modificar a assinatura. Teste localmente executando
 `python pathfinder.py` após implementar.
 """
 
-def run_astar(draw, grid, start, end):
-    """Implementar aqui o algoritmo A*.
+from search_core import astar
+
 
-    Placeholder: lança NotImplementedError para lembrar o aluno de
-    implementar.
-    """
-    raise NotImplementedError("Implemente o A* em astar_impl.py -> run_astar")
+def run_astar(draw, grid, start, end):
+    """A* de referência (substitua pela sua implementação na atividade)."""
+    return astar(grid, start, end, draw=draw) is not None
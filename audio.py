@@ -0,0 +1,132 @@
+"""
+audio.py
+
+Efeitos sonoros da interface, sintetizados uma vez e tocados sem bloquear.
+
+`winsound.Beep` segura a thread que chamou durante todo o som (35 a 120 ms),
+o que congelava o menu a cada botão sob o cursor. `SoundBoard` gera os tons
+de `EFFECTS` uma única vez, na criação, e os toca em canais reservados do
+`pygame.mixer`: `play()` só entrega o buffer ao mixer, que mistura o som na
+thread de áudio do SDL, então a janela nunca espera.
+
+- cada efeito tem o seu canal: um som novo corta o anterior do mesmo tipo em
+  vez de empilhar;
+- `MIN_INTERVAL` limita a frequência de um efeito (o som de hover ao passar o
+  mouse rápido por vários botões); pedidos dentro do intervalo são ignorados;
+- `muted` desliga os sons sem descartar os buffers (`toggle_mute()`).
+
+Sem dispositivo de áudio (ou sem mixer), a `SoundBoard` fica sem sons e
+`play()` não faz nada.
+"""
+
+import time
+
+import numpy as np
+import pygame
+
+# formato pedido ao mixer: buffer pequeno para o som sair logo após o clique
+SAMPLE_RATE = 44100
+BUFFER = 512
+# efeito: (frequência em Hz, duração em ms, volume de 0 a 1)
+EFFECTS = {
+    'click': (800, 60, 0.35),
+    'hover': (1000, 35, 0.2),
+    'error': (480, 120, 0.4),
+}
+# intervalo mínimo (s) entre dois sons do mesmo efeito
+MIN_INTERVAL = {'hover': 0.08, 'click': 0.03}
+# rampas de entrada e saída (ms), evitam o estalo no começo e no fim do tom
+FADE_MS = 4
+
+
+def pre_init():
+    """Formato do mixer; chame antes de `pygame.init()` para valer na inicialização."""
+    pygame.mixer.pre_init(SAMPLE_RATE, -16, 1, BUFFER)
+
+
+def tone(freq, ms, volume, rate=SAMPLE_RATE):
+    """Onda senoidal de `ms` milissegundos em float (-1..1), com rampas nas pontas."""
+    n = max(1, rate * ms // 1000)
+    wave = np.sin(2 * np.pi * freq * np.arange(n) / rate) * volume
+    fade = min(n // 2, rate * FADE_MS // 1000)
+    if fade:
+        ramp = np.linspace(0.0, 1.0, fade, endpoint=False)
+        wave[:fade] *= ramp
+        wave[n - fade:] *= ramp[::-1]
+    return wave
+
+
+def _samples(wave, size, channels):
+    # converte para o formato do mixer (`pygame.mixer.get_init()`)
+    if size == -16:
+        data = (wave * 32767).astype(np.int16)
+    elif size == 16:
+        data = ((wave + 1.0) * 32767.5).astype(np.uint16)
+    elif size == -8:
+        data = (wave * 127).astype(np.int8)
+    elif size == 8:
+        data = ((wave + 1.0) * 127.5).astype(np.uint8)
+    elif size == 32:
+        data = wave.astype(np.float32)
+    else:
+        data = (wave * 2147483647).astype(np.int32)
+    if channels > 1:
+        data = np.repeat(data[:, None], channels, axis=1)
+    return np.ascontiguousarray(data)
+
+
+class SoundBoard:
+    """Efeitos pré-sintetizados tocados em canais reservados do mixer."""
+    def __init__(self, effects=EFFECTS, muted=False):
+        self.muted = muted
+        self.sounds = {}
+        self.channels = {}
+        self._last = {}
+        self.played = 0
+        self.skipped = 0
+        try:
+            if pygame.mixer.get_init() is None:
+                pygame.mixer.init(SAMPLE_RATE, -16, 1, BUFFER)
+            rate, size, channels = pygame.mixer.get_init()
+            if pygame.mixer.get_num_channels() < len(effects):
+                pygame.mixer.set_num_channels(len(effects))
+            pygame.mixer.set_reserved(len(effects))
+            for i, (name, (freq, ms, volume)) in enumerate(effects.items()):
+                data = _samples(tone(freq, ms, volume, rate), size, channels)
+                self.sounds[name] = pygame.mixer.Sound(buffer=data.tobytes())
+                self.channels[name] = pygame.mixer.Channel(i)
+        except (pygame.error, ValueError):
+            # sem áudio: fica sem sons, a interface segue normalmente
+            self.sounds.clear()
+            self.channels.clear()
+
+    @property
+    def available(self):
+        return bool(self.sounds)
+
+    def toggle_mute(self):
+        """Liga/desliga o som; retorna o novo estado de `muted`."""
+        self.muted = not self.muted
+        if self.muted and self.available:
+            for channel in self.channels.values():
+                channel.stop()
+        return self.muted
+
+    def play(self, name):
+        """Toca o efeito `name` sem esperar; False se mudo, sem áudio ou cedo demais."""
+        sound = self.sounds.get(name)
+        if self.muted or sound is None:
+            return False
+        now = time.monotonic()
+        if now - self._last.get(name, -1e9) < MIN_INTERVAL.get(name, 0.0):
+            self.skipped += 1
+            return False
+        self._last[name] = now
+        self.channels[name].play(sound)
+        self.played += 1
+        return True
+
+    def label(self):
+        if not self.available:
+            return "sem áudio"
+        return "som desligado" if self.muted else "som ligado"
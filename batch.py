@@ -0,0 +1,219 @@
+"""
+batch.py
+
+Muitas consultas (início, fim) sobre o mesmo grid, em paralelo.
+
+`run_batch(grid, queries)` distribui as consultas num pool de processos e
+devolve os resultados à medida que ficam prontos (gerador, fora de ordem).
+O grid não é serializado por consulta: os estados e a máscara de adjacência
+(`grid.cells` e `grid.adj`) são copiados uma vez para um bloco de memória
+compartilhada, e cada worker monta um `Grid` que lê direto desse bloco. Por
+consulta trafegam só os índices de ida e o resultado de volta.
+
+As buscas rodam como geradores sem aplicar eventos, então o bloco
+compartilhado nunca é escrito pelos workers.
+
+Exemplos (linha de comando, resultados em JSON Lines):
+
+    python batch.py --rows 1000 --density 0.2 --queries 2000 --workers 4 --seed 1
+    python batch.py --scen maps/arena.map.scen --algo jps --out arena.jsonl
+
+Com `--scen`, as consultas vêm de um arquivo de cenários do MovingAI (o
+`.map` é procurado ao lado dele), a busca usa 8 direções como os custos
+ótimos do arquivo e cada resultado traz `optimal` e `gap` (custo - ótimo).
+"""
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from multiprocessing import shared_memory
+
+from grid_model import OBSTACLE, Grid, Node
+from headless import build_grid
+from mapfile import load_map, read_scen, scenario_map_path, scenario_queries
+from search_core import new_stats
+
+# nome -> (módulo, gerador de eventos com a assinatura (grid, start, end, ..., stats=))
+ALGORITHMS = {
+    'astar': ('search_core', 'iter_astar'),
+    'dijkstra': ('search_core', 'iter_dijkstra'),
+    'bidir_astar': ('search_core', 'iter_bidir_astar'),
+    'bidir_dijkstra': ('search_core', 'iter_bidir_dijkstra'),
+    'jps': ('jps_impl', 'iter_jps'),
+}
+
+# abaixo deste número de consultas não compensa subir processos
+PARALLEL_MIN_QUERIES = 32
+
+# estado de cada worker (preenchido por _init_worker)
+_worker = {}
+
+
+def _load(name):
+    module_name, func_name = ALGORITHMS[name]
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _shared_grid(buf, rows, cols):
+    """`Grid` cujos estados e adjacência são visões do bloco compartilhado."""
+    size = rows * cols
+    # só os pais são privados do worker; estados e adjacência não são copiados
+    grid = Grid(rows, cols, 1, cells=buf[:size], adj=buf[size:2 * size])
+    grid.dirty = None
+    return grid
+
+
+def _init_worker(shm_name, rows, cols, algorithm, diagonal, paths):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker.update(shm=shm, grid=_shared_grid(shm.buf, rows, cols), search=_load(algorithm),
+                   diagonal=diagonal, paths=paths)
+
+
+def _solve(grid, search, diagonal, paths, key, source, target):
+    """Roda uma consulta sem aplicar eventos e monta o registro do resultado."""
+    stats = new_stats()
+    t0 = time.perf_counter()
+    if grid.cells[source] == OBSTACLE or grid.cells[target] == OBSTACLE:
+        path = None
+    else:
+        events = search(grid, Node(grid, source), Node(grid, target), diagonal=diagonal, stats=stats)
+        while True:
+            try:
+                next(events)
+            except StopIteration as stop:
+                path = stop.value
+                break
+    elapsed = time.perf_counter() - t0
+    return {
+        'query': key,
+        'start': source,
+        'end': target,
+        'found': path is not None,
+        'cost': stats['cost'] if path is not None else None,
+        'path': path if paths else None,
+        'expanded': stats['expanded'],
+        'pushes': stats['pushes'],
+        'peak_heap': stats['peak_heap'],
+        'wall_time_ms': round(elapsed * 1000.0, 3),
+        'worker': os.getpid(),
+    }
+
+
+def _solve_in_worker(query):
+    w = _worker
+    return _solve(w['grid'], w['search'], w['diagonal'], w['paths'], *query)
+
+
+def run_batch(grid, queries, algorithm='astar', workers=None, diagonal=False, paths=True,
+              chunksize=None):
+    """Resolve `queries` (pares de índices `(início, fim)`) e gera os resultados.
+
+    Os resultados (dicionários com `query` = posição na lista, `found`, `cost`,
+    `path`, contadores e tempo) saem na ordem em que terminam. `workers` é o
+    número de processos (None = núcleos da máquina, 1 = tudo neste processo);
+    `paths=False` devolve só custos e contadores, sem trafegar os caminhos.
+    """
+    queries = [(k, int(s), int(t)) for k, (s, t) in enumerate(queries)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(queries) < PARALLEL_MIN_QUERIES:
+        search = _load(algorithm)
+        for query in queries:
+            yield _solve(grid, search, diagonal, paths, *query)
+        return
+
+    size = grid.rows * grid.cols
+    shm = shared_memory.SharedMemory(create=True, size=2 * size)
+    try:
+        shm.buf[:size] = grid.cells
+        shm.buf[size:2 * size] = grid.adj
+        if chunksize is None:
+            # blocos pequenos o bastante para os resultados chegarem aos poucos
+            chunksize = max(1, min(64, len(queries) // (workers * 8)))
+        pool = multiprocessing.Pool(workers, _init_worker,
+                                    (shm.name, grid.rows, grid.cols, algorithm, diagonal, paths))
+        try:
+            yield from pool.imap_unordered(_solve_in_worker, queries, chunksize)
+        finally:
+            pool.terminate()
+            pool.join()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def random_queries(grid, count, seed=None):
+    """`count` pares (início, fim) distintos entre células livres, com semente."""
+    rng = random.Random(seed)
+    free = [i for i, code in enumerate(grid.cells) if code != OBSTACLE]
+    if len(free) < 2:
+        return []
+    return [tuple(rng.sample(free, 2)) for _ in range(count)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve muitas consultas sobre um grid em paralelo.")
+    parser.add_argument('--algo', choices=sorted(ALGORITHMS), default='astar')
+    parser.add_argument('--load', help="arquivo de mapa (.grid, .map do MovingAI ou texto)")
+    parser.add_argument('--scen', help="cenários do MovingAI (.scen); implica --diagonal")
+    parser.add_argument('--limit', type=int, help="usa só os primeiros N cenários")
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--cols', type=int, help="colunas (padrão: igual a --rows)")
+    parser.add_argument('--maze', action='store_true', help="gera um labirinto (backtracker)")
+    parser.add_argument('--density', type=float, default=0.2, help="fração de obstáculos aleatórios")
+    parser.add_argument('--seed', type=int, default=1, help="semente do grid e das consultas")
+    parser.add_argument('--queries', type=int, default=1000, help="número de consultas aleatórias")
+    parser.add_argument('--workers', type=int, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument('--diagonal', action='store_true', help="8 direções")
+    parser.add_argument('--paths', action='store_true', help="inclui os caminhos na saída")
+    parser.add_argument('--out', help="arquivo JSON Lines (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    optimal = None
+    if args.scen:
+        scenarios = read_scen(args.scen)[:args.limit]
+        if not scenarios:
+            parser.error(f"nenhum cenário em {args.scen}")
+        grid = load_map(args.load or scenario_map_path(args.scen, scenarios[0]))[0]
+        queries = scenario_queries(scenarios, grid.cols)
+        optimal = [s.optimal for s in scenarios]
+        args.diagonal = True
+    elif args.load:
+        grid = load_map(args.load)[0]
+        queries = random_queries(grid, args.queries, args.seed)
+    else:
+        grid = build_grid(args.rows, args.cols or args.rows, args.maze, args.density, args.seed)
+        queries = random_queries(grid, args.queries, args.seed)
+    grid.dirty = None
+    out = open(args.out, 'w', encoding='utf-8') if args.out else sys.stdout
+    found = 0
+    worse = 0
+    t0 = time.perf_counter()
+    try:
+        for result in run_batch(grid, queries, args.algo, args.workers, args.diagonal, args.paths):
+            found += result['found']
+            if optimal is not None:
+                best = optimal[result['query']]
+                result['optimal'] = best
+                result['gap'] = None if result['cost'] is None else round(result['cost'] - best, 6)
+                # o MovingAI grava os ótimos com 8 casas decimais
+                worse += result['gap'] is None or result['gap'] > 1e-4
+            out.write(json.dumps(result) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - t0
+    print(f"{len(queries)} consultas ({found} com caminho) em {elapsed:.2f} s "
+          f"({len(queries) / elapsed:.1f} consultas/s)", file=sys.stderr)
+    if optimal is not None:
+        print(f"{worse} consultas acima do custo ótimo do cenário", file=sys.stderr)
+        return 1 if worse else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
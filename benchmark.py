@@ -0,0 +1,451 @@
+"""
+benchmark.py
+
+Suíte de benchmarks reprodutível (sem janela) para os algoritmos de busca.
+
+Roda uma matriz de cenários com semente fixa — campo aberto, obstáculos
+aleatórios em várias densidades, labirintos de `generate_maze` e os mapas
+de `generators` (ex.: `caves`, `rooms`, `kruskal`) — em
+tamanhos de 40 até 2000, para cada motor registrado em `ENGINES`. Para cada
+par (cenário, motor) registra tempo de parede, nós expandidos, pico do heap,
+pico de RSS, custo do caminho e a diferença para o ótimo (calculado pelo A*
+de referência). Os resultados vão para JSON/CSV e podem ser comparados com
+uma linha de base salva, para que regressões apareçam como números.
+
+`--queues` roda o A* e o Dijkstra de referência com cada lista aberta de
+`pqueue` (heap binário, de pareamento, baldes de Dial, heap radix; `lazy` e
+`decrease_key`) e mostra a fila mais rápida para cada tipo de mapa.
+
+Exemplos:
+
+    python benchmark.py --preset quick --out bench.json
+    python benchmark.py --preset full --engines astar,dijkstra --csv bench.csv
+    python benchmark.py --preset quick --baseline bench.json --fail-on-regression
+    python benchmark.py --sizes 500,1000 --engines ref_dijkstra --queues all
+"""
+
+import argparse
+import csv
+import importlib
+import json
+import multiprocessing
+import platform
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+
+from grid_model import CLOSED, OBSTACLE, Grid, Node
+from headless import build_grid
+from flowfield import FlowField, iter_flow
+from generators import GENERATORS
+from hpa_impl import iter_hpa
+from jps_impl import iter_jps
+from pqueue import QUEUES, STRATEGIES
+from search_core import (
+    astar, iter_astar, iter_bidir_astar, iter_bidir_dijkstra, iter_dijkstra, iter_dumb_search, new_stats,
+    path_cost, path_from_parents, run_events,
+)
+
+PRESETS = {
+    'quick': {'sizes': [40, 100, 200], 'kinds': ['open', 'random', 'maze'], 'densities': [0.2], 'seeds': [1]},
+    'full': {'sizes': [40, 250, 500, 1000, 2000], 'kinds': ['open', 'random', 'maze', 'caves', 'rooms'],
+             'densities': [0.1, 0.2, 0.3], 'seeds': [1, 2, 3]},
+}
+
+# Campos de cada resultado (ordem das colunas do CSV)
+FIELDS = ('scenario', 'kind', 'size', 'density', 'seed', 'engine', 'queue', 'found', 'wall_time_ms',
+          'expanded', 'peak_heap', 'peak_rss_kb', 'cost', 'optimal_cost', 'optimality_gap')
+
+
+# --- Motores ---
+# Cada motor recebe (grid, start, end, stats) e retorna o caminho (lista de índices) ou None.
+
+def event_engine(iter_func, **options):
+    """Motor a partir de um gerador de eventos (contadores completos).
+
+    Com `diagonal=True` o ótimo de comparação é o do grid em 8 direções.
+    """
+    def engine(grid, start, end, stats):
+        return run_events(iter_func(grid, start, end, stats=stats, **options), grid)
+    engine.diagonal = options.get('diagonal', False)
+    return engine
+
+
+def callback_engine(module_name, func_name):
+    """Motor a partir de uma função no formato `(draw, grid, start, end)`.
+
+    Expansões vêm das células fechadas no grid e o caminho dos pais
+    (`node.parent`); não há como medir o heap de uma função externa.
+    """
+    def engine(grid, start, end, stats):
+        func = getattr(importlib.import_module(module_name), func_name)
+        closed_before = grid.counts[CLOSED]
+        found = func(lambda: None, grid, start, end)
+        stats['expanded'] = grid.counts[CLOSED] - closed_before
+        stats['peak_heap'] = None
+        if not found:
+            return None
+        return path_from_parents(grid, start, end)
+    return engine
+
+
+def _dumb_engine(grid, start, end, stats):
+    closed_before = grid.counts[CLOSED]
+    path = run_events(iter_dumb_search(grid, start, end), grid)
+    stats['expanded'] = grid.counts[CLOSED] - closed_before
+    stats['peak_heap'] = None
+    return path
+
+
+ENGINES = {
+    'dumb': _dumb_engine,
+    'astar': callback_engine('astar_impl', 'run_astar'),
+    'dijkstra': callback_engine('dijkstra_impl', 'run_dijkstra'),
+    'ref_astar': event_engine(iter_astar),
+    'ref_dijkstra': event_engine(iter_dijkstra),
+    'ref_astar8': event_engine(iter_astar, diagonal=True),
+    'jps': event_engine(iter_jps),
+    'jps8': event_engine(iter_jps, diagonal=True),
+    'hpa': event_engine(iter_hpa),
+    'bidir_astar': event_engine(iter_bidir_astar),
+    'bidir_dijkstra': event_engine(iter_bidir_dijkstra),
+    'flow': event_engine(iter_flow),
+}
+
+# motores de referência por lista aberta: nome -> (algoritmo, fila, estratégia);
+# ex.: ref_dijkstra_dial, ref_astar_pairing_dk (dk = decrease_key)
+QUEUE_ENGINES = {'ref_astar': ('astar', 'binary', 'lazy'), 'ref_dijkstra': ('dijkstra', 'binary', 'lazy')}
+for _queue in QUEUES:
+    for _strategy in STRATEGIES:
+        if (_queue, _strategy) == ('binary', 'lazy'):
+            continue
+        _suffix = _queue + ('_dk' if _strategy == 'decrease_key' else '')
+        for _algo, _iter in (('astar', iter_astar), ('dijkstra', iter_dijkstra)):
+            ENGINES[f'ref_{_algo}_{_suffix}'] = event_engine(_iter, queue=_queue, strategy=_strategy)
+            QUEUE_ENGINES[f'ref_{_algo}_{_suffix}'] = (_algo, _queue, _strategy)
+
+
+def register_engine(name, engine):
+    """Registra um motor `(grid, start, end, stats) -> caminho | None`."""
+    ENGINES[name] = engine
+
+
+# --- Cenários ---
+
+def scenarios(sizes, kinds, densities, seeds):
+    """Gera a matriz de cenários como dicionários (id, tipo, tamanho, densidade, semente)."""
+    for size in sizes:
+        for kind in kinds:
+            for density in (densities if kind == 'random' else [0.0]):
+                for seed in seeds:
+                    name = f"{kind}-{size}" + (f"-d{density:g}" if kind == 'random' else '') + f"-s{seed}"
+                    yield {'scenario': name, 'kind': kind, 'size': size, 'density': density, 'seed': seed}
+
+
+def build_scenario(scenario):
+    """Retorna `(cells, start_index, end_index)` do cenário (determinístico pela semente)."""
+    size = scenario['size']
+    kind = scenario['kind']
+    # 'random' é o mapa por densidade de build_grid; os outros nomes vêm de generators
+    generator = kind if kind in GENERATORS and kind != 'random' else None
+    grid = build_grid(size, size, maze=kind == 'maze',
+                      density=scenario['density'] if kind == 'random' else 0.0,
+                      seed=scenario['seed'], generator=generator)
+    if kind in ('maze', 'backtracker', 'kruskal', 'wilson'):
+        # o labirinto abre as células de índice ímpar
+        last = size - 2 if (size - 2) % 2 == 1 else size - 3
+        start, end = size + 1, last * size + last
+    elif generator is not None:
+        start, end = _far_pair(grid)
+    else:
+        start, end = 0, size * size - 1
+    grid.cells[start] = 0
+    grid.cells[end] = 0
+    return bytes(grid.cells), start, end
+
+
+def _far_pair(grid, tries=8):
+    """Início e fim numa mesma região de mapas gerados (cavernas, salas...).
+
+    Testa até `tries` células livres espaçadas (em ordem de leitura) e fica
+    com a primeira cuja região alcança metade das células livres (ou com a
+    maior região vista); o fim é a célula mais distante dela.
+    """
+    cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8)
+    free = np.flatnonzero(cells != OBSTACLE)
+    if free.size < 2:
+        return 0, grid.rows * grid.cols - 1
+    best = None
+    for source in free[:: max(1, free.size // tries)][:tries].tolist():
+        field = FlowField(grid, source)
+        if best is None or field.reachable > best.reachable:
+            best = field
+        if 2 * field.reachable >= free.size:
+            break
+    return best.target, int(np.argmax(best.dist))
+
+
+def _fresh_grid(size, cells):
+    grid = Grid(size, size, 1)
+    grid.dirty = None
+    grid.load_cells(cells)
+    return grid
+
+
+def peak_rss_kb():
+    """Pico de memória residente do processo (KB), ou None se indisponível."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reporta em bytes; Linux em KB
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def optimal_cost(scenario, diagonal=False):
+    """Custo ótimo do cenário segundo o A* de referência (None se não há caminho)."""
+    cells, s, t = build_scenario(scenario)
+    grid = _fresh_grid(scenario['size'], cells)
+    ref = astar(grid, Node(grid, s), Node(grid, t), diagonal=diagonal)
+    return path_cost(grid, ref) if ref is not None else None
+
+
+def run_case(scenario, engine_name, repeat=1, optimal=None):
+    """Roda um motor num cenário e retorna o registro de resultado."""
+    cells, s, t = build_scenario(scenario)
+    size = scenario['size']
+    engine = ENGINES[engine_name]
+    if optimal is None:
+        optimal = optimal_cost(scenario, getattr(engine, 'diagonal', False))
+    best = None
+    for _ in range(max(1, repeat)):
+        grid = _fresh_grid(size, cells)
+        start, end = Node(grid, s), Node(grid, t)
+        start.make_start()
+        end.make_end()
+        stats = new_stats()
+        t0 = time.perf_counter()
+        path = engine(grid, start, end, stats)
+        elapsed = time.perf_counter() - t0
+        if best is None or elapsed < best[0]:
+            best = (elapsed, stats, path, grid)
+
+    elapsed, stats, path, grid = best
+    cost = path_cost(grid, path) if path is not None else None
+    gap = None
+    if cost is not None and optimal:
+        gap = round(cost / optimal - 1.0, 6)
+    record = dict(scenario)
+    queue = stats.get('queue')
+    record.update({
+        'engine': engine_name,
+        'queue': f"{queue['name']}/{queue['strategy']}" if queue else None,
+        'queue_counters': queue,
+        'found': path is not None,
+        'wall_time_ms': round(elapsed * 1000.0, 3),
+        'expanded': stats.get('expanded'),
+        'peak_heap': stats.get('peak_heap'),
+        'peak_rss_kb': peak_rss_kb(),
+        'cost': cost,
+        'optimal_cost': optimal,
+        'optimality_gap': gap,
+    })
+    return record
+
+
+def _run_case_args(args):
+    return run_case(*args)
+
+
+def run_suite(cases, engines, repeat=1, isolate=False, progress=None):
+    """Roda todos os pares (cenário, motor); retorna a lista de registros.
+
+    Com `isolate`, cada par roda num processo novo, para que o pico de RSS
+    seja só daquela execução.
+    """
+    jobs = [(scenario, name, repeat) for scenario in cases for name in engines]
+    results = []
+    if isolate:
+        ctx = multiprocessing.get_context('spawn')
+        with ctx.Pool(1, maxtasksperchild=1) as pool:
+            for record in pool.imap(_run_case_args, jobs):
+                results.append(record)
+                if progress:
+                    progress(record)
+        return results
+    optimal = {}
+    for scenario, name, rep in jobs:
+        diagonal = getattr(ENGINES[name], 'diagonal', False)
+        key = (scenario['scenario'], diagonal)
+        if key not in optimal:
+            optimal[key] = optimal_cost(scenario, diagonal)
+        record = run_case(scenario, name, rep, optimal[key])
+        results.append(record)
+        if progress:
+            progress(record)
+    return results
+
+
+def queue_engines(algos, queues, strategies=STRATEGIES):
+    """Motores de `QUEUE_ENGINES` para os algoritmos, filas e estratégias pedidos."""
+    return [name for name, (algo, queue, strategy) in QUEUE_ENGINES.items()
+            if algo in algos and queue in queues and strategy in strategies]
+
+
+def best_queues(results):
+    """Fila mais rápida por (tipo de mapa, algoritmo).
+
+    Soma o tempo de cada fila em todos os cenários do tipo (só os cenários
+    em que todas as filas comparadas rodaram) e retorna, por par, a lista
+    `[(fila/estratégia, tempo total em ms), ...]` da mais rápida à mais lenta.
+    """
+    times = {}
+    for r in results:
+        spec = QUEUE_ENGINES.get(r['engine'])
+        if spec is None:
+            continue
+        algo, queue, strategy = spec
+        group = times.setdefault((r['kind'], algo), {})
+        group.setdefault(r['scenario'], {})[f"{queue}/{strategy}"] = r['wall_time_ms']
+    ranking = {}
+    for key, by_scenario in sorted(times.items()):
+        labels = set.intersection(*(set(t) for t in by_scenario.values()))
+        totals = {label: sum(t[label] for t in by_scenario.values()) for label in labels}
+        ranking[key] = sorted(totals.items(), key=lambda item: item[1])
+    return ranking
+
+
+# --- Comparação com a linha de base ---
+
+def compare(results, baseline, tolerance=0.10):
+    """Compara com uma linha de base; retorna a lista de regressões encontradas.
+
+    Uma regressão é um tempo maior que `(1 + tolerance)` vezes o da linha
+    de base, mais expansões que antes, ou um custo de caminho pior.
+    """
+    base = {(r['scenario'], r['engine']): r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get((r['scenario'], r['engine']))
+        if b is None:
+            continue
+        problems = []
+        if b['wall_time_ms'] and r['wall_time_ms'] > b['wall_time_ms'] * (1.0 + tolerance):
+            problems.append(f"tempo {b['wall_time_ms']:.1f} -> {r['wall_time_ms']:.1f} ms")
+        if b['expanded'] is not None and r['expanded'] is not None and r['expanded'] > b['expanded']:
+            problems.append(f"expansões {b['expanded']} -> {r['expanded']}")
+        if b['cost'] is not None and r['cost'] is not None and r['cost'] > b['cost'] + 1e-9:
+            problems.append(f"custo {b['cost']:g} -> {r['cost']:g}")
+        if problems:
+            regressions.append({'scenario': r['scenario'], 'engine': r['engine'], 'problems': problems})
+    return regressions
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return data['results'] if isinstance(data, dict) else data
+
+
+def write_json(path, results):
+    meta = {'python': platform.python_version(), 'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=1)
+
+
+def write_csv(path, results):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(',') if x]
+
+
+def _float_list(text):
+    return [float(x) for x in text.split(',') if x]
+
+
+def _str_list(text):
+    return [x for x in text.split(',') if x]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks reprodutíveis dos algoritmos de busca.")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick')
+    parser.add_argument('--sizes', type=_int_list, help="tamanhos, ex.: 40,500,2000")
+    parser.add_argument('--kinds', type=_str_list,
+                        help="tipos de mapa: open,random,maze ou um gerador (caves, rooms, kruskal...)")
+    parser.add_argument('--densities', type=_float_list, help="densidades dos mapas 'random'")
+    parser.add_argument('--seeds', type=_int_list, help="sementes, ex.: 1,2,3")
+    parser.add_argument('--engines', type=_str_list, default=['dumb', 'astar', 'dijkstra'],
+                        help="motores: " + ','.join(ENGINES))
+    parser.add_argument('--queues', type=_str_list,
+                        help="compara as listas abertas do A*/Dijkstra de referência: " + ','.join(QUEUES)
+                             + " ou all (os motores ref_astar/ref_dijkstra pedidos em --engines)")
+    parser.add_argument('--strategies', type=_str_list, default=list(STRATEGIES),
+                        help="estratégias das filas em --queues: " + ','.join(STRATEGIES))
+    parser.add_argument('--repeat', type=int, default=1, help="repetições por caso (guarda o menor tempo)")
+    parser.add_argument('--isolate', action='store_true', help="cada caso num processo novo (RSS exato)")
+    parser.add_argument('--out', help="arquivo JSON de saída")
+    parser.add_argument('--csv', help="arquivo CSV de saída")
+    parser.add_argument('--baseline', help="JSON de uma execução anterior para comparação")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="folga de tempo aceita (fração)")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    preset = PRESETS[args.preset]
+    if args.queues:
+        queues = list(QUEUES) if args.queues == ['all'] else args.queues
+        bad = [q for q in queues if q not in QUEUES] + [s for s in args.strategies if s not in STRATEGIES]
+        if bad:
+            parser.error(f"filas ou estratégias desconhecidas: {', '.join(bad)}")
+        # as variantes de fila substituem os motores de referência escolhidos
+        algos = [QUEUE_ENGINES[e][0] for e in args.engines if e in ('ref_astar', 'ref_dijkstra')]
+        if not algos:
+            algos = ['astar', 'dijkstra']
+        args.engines = ([e for e in args.engines if e not in QUEUE_ENGINES]
+                        + queue_engines(algos, queues, args.strategies))
+    unknown = [e for e in args.engines if e not in ENGINES]
+    if unknown:
+        parser.error(f"motores desconhecidos: {', '.join(unknown)}")
+    cases = list(scenarios(args.sizes or preset['sizes'], args.kinds or preset['kinds'],
+                           args.densities or preset['densities'], args.seeds or preset['seeds']))
+
+    def progress(r):
+        gap = '-' if r['optimality_gap'] is None else f"{r['optimality_gap']:.3f}"
+        print(f"{r['scenario']:<24} {r['engine']:<20} {r['wall_time_ms']:>10.1f} ms "
+              f"exp={r['expanded']!s:<9} heap={r['peak_heap']!s:<8} gap={gap}", flush=True)
+
+    results = run_suite(cases, args.engines, args.repeat, args.isolate, progress)
+    if args.out:
+        write_json(args.out, results)
+    if args.csv:
+        write_csv(args.csv, results)
+    if args.queues:
+        print("fila mais rápida por tipo de mapa (tempo total):")
+        for (kind, algo), ranking in best_queues(results).items():
+            if ranking:
+                print(f"  {kind:<10} {algo:<9} " + "  ".join(f"{label} {ms:.0f} ms" for label, ms in ranking))
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.tolerance)
+        for reg in regressions:
+            print(f"REGRESSÃO {reg['scenario']} {reg['engine']}: {'; '.join(reg['problems'])}")
+        if not regressions:
+            print("sem regressões em relação à linha de base")
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
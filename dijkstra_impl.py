@@ -1,21 +1,20 @@
 """
 dijkstra_impl.py
 
-Arquivo-stub para os alunos implementarem o algoritmo de Dijkstra.
+Arquivo da atividade para o algoritmo de Dijkstra.
 
 Espera-se que o aluno defina uma função `run_dijkstra(draw, grid, start, end)`
-com a mesma assinatura usada no visualizador principal. O visualizador
-atual usa uma busca "burra" (dumb_search) como placeholder — quando o
-aluno implementar esta função, pode integrar aqui e chamar a partir do
-visualizador (ou modificar `pathfinder.py` para importar e usar).
+com a mesma assinatura usada no visualizador principal. Por padrão ela
+delega para o motor de referência em `search_core.dijkstra` (heap binário
+com remoção preguiçosa). Para fazer a atividade, substitua o corpo de
+`run_dijkstra` pela sua implementação.
 
 Contratos e retornos idem a `astar_impl.py`.
 """
 
-def run_dijkstra(draw, grid, start, end):
-    """Implementar aqui o algoritmo de Dijkstra.
+from search_core import dijkstra
+
 
-    Placeholder: lança NotImplementedError para lembrar o aluno de
-    implementar.
-    """
-    raise NotImplementedError("Implemente Dijkstra em dijkstra_impl.py -> run_dijkstra")
+def run_dijkstra(draw, grid, start, end):
+    """Dijkstra de referência (substitua pela sua implementação na atividade)."""
+    return dijkstra(grid, start, end, draw=draw) is not None
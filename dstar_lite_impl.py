@@ -0,0 +1,183 @@
+"""
+dstar_lite_impl.py
+
+Replanejamento incremental com D* Lite (Koenig & Likhachev).
+
+Depois que existe um caminho, mudanças de poucos obstáculos (ex.: pinceladas
+com `apply_brush`) não exigem refazer a busca inteira: o planejador guarda
+`g` e `rhs` de cada célula visitada e, ao receber as células alteradas,
+corrige apenas a parte afetada da árvore de busca. A busca parte do objetivo
+(`end`) em direção ao início, então o início também pode se mover
+(`move_start`) sem perder o que já foi calculado.
+
+Usa o mesmo grid 4-direções de `search_core.neighbor_steps` (custo 1 por passo)
+e lê os obstáculos direto de `grid.cells`.
+"""
+
+import heapq
+import math
+
+from grid_model import OBSTACLE
+
+INF = math.inf
+
+
+class DStarLite:
+    """Planejador D* Lite sobre um `Grid` (4 direções, custo uniforme).
+
+    Uso:
+
+        planner = DStarLite(grid, start, end)
+        path = planner.plan()                 # primeiro plano completo
+        path = planner.update_cells(changed)  # após mudar obstáculos
+
+    `stats['expanded']` acumula as expansões; `last_expanded` guarda as do
+    último (re)planejamento.
+    """
+    def __init__(self, grid, start, end):
+        self.grid = grid
+        self.start = start.index
+        self.goal = end.index
+        self._last_start = self.start
+        self.km = 0
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self._heap = []
+        self._queued = {}
+        self.stats = {'expanded': 0, 'updates': 0, 'replans': 0}
+        self.last_expanded = 0
+        self._push(self.goal)
+
+    # --- estrutura auxiliar ---
+    def _h(self, a, b):
+        cols = self.grid.cols
+        ar, ac = divmod(a, cols)
+        br, bc = divmod(b, cols)
+        return abs(ar - br) + abs(ac - bc)
+
+    def _key(self, u):
+        m = min(self.g.get(u, INF), self.rhs.get(u, INF))
+        return (m + self._h(self.start, u) + self.km, m)
+
+    def _push(self, u):
+        key = self._key(u)
+        self._queued[u] = key
+        heapq.heappush(self._heap, (key[0], key[1], u))
+
+    def _top(self):
+        heap = self._heap
+        queued = self._queued
+        # remoção preguiçosa: descarta entradas desatualizadas do topo
+        while heap:
+            k1, k2, u = heap[0]
+            if queued.get(u) == (k1, k2):
+                return (k1, k2), u
+            heapq.heappop(heap)
+        return (INF, INF), None
+
+    def _neighbors(self, u):
+        rows, cols = self.grid.rows, self.grid.cols
+        row, col = divmod(u, cols)
+        if row < rows - 1:
+            yield u + cols
+        if row > 0:
+            yield u - cols
+        if col < cols - 1:
+            yield u + 1
+        if col > 0:
+            yield u - 1
+
+    def _update_vertex(self, u):
+        cells = self.grid.cells
+        self.stats['updates'] += 1
+        if u != self.goal:
+            best = INF
+            if cells[u] != OBSTACLE:
+                g = self.g
+                for s in self._neighbors(u):
+                    if cells[s] != OBSTACLE:
+                        cost = g.get(s, INF) + 1
+                        if cost < best:
+                            best = cost
+            self.rhs[u] = best
+        self._queued.pop(u, None)
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u)
+
+    # --- API ---
+    def compute(self):
+        """Processa a fila até o caminho do início estar consistente."""
+        g, rhs = self.g, self.rhs
+        start = self.start
+        expanded = 0
+        while True:
+            k_old, u = self._top()
+            if u is None:
+                break
+            if not (k_old < self._key(start) or rhs.get(start, INF) != g.get(start, INF)):
+                break
+            expanded += 1
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u)
+                continue
+            heapq.heappop(self._heap)
+            del self._queued[u]
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                for s in self._neighbors(u):
+                    self._update_vertex(s)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for s in self._neighbors(u):
+                    self._update_vertex(s)
+        self.last_expanded = expanded
+        self.stats['expanded'] += expanded
+        self.stats['replans'] += 1
+
+    def path(self):
+        """Caminho atual (índices de início a fim) ou None se não houver."""
+        g = self.g
+        cells = self.grid.cells
+        current = self.start
+        if g.get(current, INF) == INF and current != self.goal:
+            return None
+        path = [current]
+        limit = self.grid.rows * self.grid.cols
+        while current != self.goal:
+            best, nxt = INF, None
+            for s in self._neighbors(current):
+                if cells[s] != OBSTACLE and g.get(s, INF) + 1 < best:
+                    best, nxt = g[s] + 1, s
+            if nxt is None or len(path) > limit:
+                return None
+            current = nxt
+            path.append(current)
+        return path
+
+    def plan(self):
+        """Calcula (ou completa) o plano e retorna o caminho."""
+        self.compute()
+        return self.path()
+
+    def update_cells(self, changed):
+        """Informa células cujo estado de obstáculo mudou e replaneja.
+
+        Só os vértices afetados (as células e seus vizinhos) voltam para a
+        fila; o restante da árvore de busca é reaproveitado.
+        """
+        touched = set()
+        for u in changed:
+            touched.add(u)
+            touched.update(self._neighbors(u))
+        for u in touched:
+            self._update_vertex(u)
+        return self.plan()
+
+    def move_start(self, node):
+        """Move o início (ex.: agente andando) mantendo o plano calculado."""
+        self.km += self._h(self._last_start, node.index)
+        self._last_start = node.index
+        self.start = node.index
+        return self.plan()
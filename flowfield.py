@@ -0,0 +1,130 @@
+"""
+flowfield.py
+
+Campos de distância / fluxo enraizados no objetivo.
+
+Quando muitas unidades vão para o mesmo `end`, rodar um A* por unidade
+repete quase o mesmo trabalho. Aqui uma única expansão em ondas (BFS) a
+partir do objetivo, vetorizada com numpy sobre a máscara de adjacência do
+grid (`grid.adj`), calcula para todas as células:
+
+- `dist`: número de passos até o objetivo (-1 = inalcançável);
+- `next`: índice da próxima célula no caminho (-1 = nenhuma).
+
+Qualquer início obtém seu caminho seguindo `next`, em O(tamanho do caminho).
+`flow_field(grid, target)` guarda os campos calculados por grid e só os
+refaz quando os obstáculos mudam (`grid.obstacle_version`).
+
+Mesmo grid 4-direções de custo 1 de `search_core.neighbor_steps`.
+"""
+
+import weakref
+
+import numpy as np
+
+from grid_model import DOWN, EVENT_SHIFT, LEFT, OBSTACLE, PATH, RIGHT, UP
+
+# campos guardados por grid (o usado há mais tempo sai quando lota)
+CACHE_PER_GRID = 8
+_cache = weakref.WeakKeyDictionary()
+
+
+class FlowField:
+    """Distâncias e próximo passo de cada célula até `target`."""
+    def __init__(self, grid, target):
+        self.grid = grid
+        self.target = target
+        self.version = grid.obstacle_version
+        self.dist, self.next = _wavefront(grid, target)
+        self.reachable = int(np.count_nonzero(self.dist >= 0))
+
+    @property
+    def stale(self):
+        """True se os obstáculos mudaram depois do cálculo."""
+        return self.version != self.grid.obstacle_version
+
+    def distance(self, index):
+        d = int(self.dist[index])
+        return d if d >= 0 else None
+
+    def path_from(self, index):
+        """Caminho (lista de índices) de `index` até o objetivo, ou None."""
+        if self.dist[index] < 0:
+            return None
+        nxt = self.next
+        path = [index]
+        while index != self.target:
+            index = int(nxt[index])
+            path.append(index)
+        return path
+
+
+def _wavefront(grid, target):
+    rows, cols = grid.rows, grid.cols
+    size = rows * cols
+    adj = np.frombuffer(grid.adj, dtype=np.uint8)
+    moves = ((DOWN, cols), (UP, -cols), (RIGHT, 1), (LEFT, -1))
+    dist = np.full(size, -1, dtype=np.int32)
+    nxt = np.full(size, -1, dtype=np.int32)
+    if grid.cells[target] == OBSTACLE:
+        return dist, nxt
+
+    # ondas: cada nível vem dos vizinhos livres ainda não visitados do anterior
+    dist[target] = 0
+    frontier = np.array([target], dtype=np.int32)
+    level = 0
+    while frontier.size:
+        level += 1
+        mask = adj[frontier]
+        reached = np.concatenate([frontier[(mask & bit) != 0] + offset for bit, offset in moves])
+        reached = np.unique(reached[dist[reached] < 0])
+        dist[reached] = level
+        frontier = reached
+
+    # próximo passo: primeiro vizinho (baixo, cima, direita, esquerda) um nível abaixo
+    cells = np.flatnonzero(dist > 0)
+    for bit, offset in moves:
+        pending = cells[(nxt[cells] < 0) & ((adj[cells] & bit) != 0)]
+        neighbor = pending + offset
+        ok = dist[neighbor] == dist[pending] - 1
+        nxt[pending[ok]] = neighbor[ok]
+    return dist, nxt
+
+
+def flow_field(grid, target):
+    """Campo até `target` (índice), reaproveitado enquanto os obstáculos não mudarem."""
+    fields = _cache.get(grid)
+    if fields is None:
+        fields = _cache[grid] = {}
+    field = fields.pop(target, None)
+    if field is None or field.stale:
+        field = FlowField(grid, target)
+    fields[target] = field
+    if len(fields) > CACHE_PER_GRID:
+        del fields[next(iter(fields))]
+    return field
+
+
+def iter_flow(grid, start, end, stats=None):
+    """Gerador de eventos: caminho de `start` seguindo o campo de `end`.
+
+    `stats['expanded']` recebe o número de células alcançadas pelo campo
+    (zero quando o campo veio do cache).
+    """
+    cached = _cache.get(grid, {}).get(end.index)
+    fresh = cached is None or cached.stale
+    field = flow_field(grid, end.index)
+    path = field.path_from(start.index)
+    if stats is not None:
+        if fresh:
+            stats['expanded'] += field.reachable
+        stats['cost'] = field.distance(start.index)
+    if path is None:
+        return None
+    parent = grid.parent
+    parent[path[0]] = -1
+    for a, b in zip(path, path[1:]):
+        parent[b] = a
+    for i in path[1:-1]:
+        yield i << EVENT_SHIFT | PATH
+    return path
@@ -0,0 +1,107 @@
+"""
+frameclock.py
+
+Relógio de quadros para laços de eventos do pygame que ficam parados
+quando não há nada para mostrar.
+
+`FrameClock.wait(busy)` é chamado no topo de cada volta do laço e devolve os
+eventos pendentes:
+
+- `busy=True` (animação em andamento, células para repintar, algo mudou na
+  volta anterior): espera o próximo quadro com `pygame.time.Clock.tick`,
+  limitando a taxa a `fps`;
+- `busy=False`: bloqueia em `pygame.event.wait` até chegar um evento (ou
+  `idle_ms` passarem), sem consumir CPU.
+
+O relógio mede a taxa de quadros desenhados (`frame()` a cada quadro) e o uso
+de CPU do processo nos trechos ocupados e ociosos; `stats()` devolve esses
+números e `label()` os resume para a tela.
+"""
+
+import time
+from collections import deque
+
+import pygame
+
+DEFAULT_FPS = 60
+# acorda o laço ocioso de tempos em tempos mesmo sem eventos (atualiza as medidas)
+IDLE_WAKE_MS = 1000
+# janela (segundos) da taxa de quadros medida
+FPS_WINDOW = 1.0
+
+
+class FrameClock:
+    """Limita a taxa de quadros e bloqueia o laço quando ele está ocioso."""
+    def __init__(self, fps=DEFAULT_FPS, idle_ms=IDLE_WAKE_MS):
+        self.fps = fps
+        self.idle_ms = idle_ms
+        self.clock = pygame.time.Clock()
+        self.frames = 0
+        self.wakeups = 0
+        self._frame_times = deque()
+        # (CPU, parede) acumulados nas voltas ocupadas e nas ociosas
+        self.busy_cpu = self.busy_wall = 0.0
+        self.idle_cpu = self.idle_wall = 0.0
+        self._busy = True
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+
+    def wait(self, busy):
+        """Espera o próximo quadro (`busy`) ou o próximo evento e retorna os eventos."""
+        self._account()
+        self._busy = busy
+        self.wakeups += 1
+        if busy:
+            self.clock.tick(self.fps)
+            return pygame.event.get()
+        first = pygame.event.wait(self.idle_ms)
+        events = pygame.event.get()
+        if first.type != pygame.NOEVENT:
+            events.insert(0, first)
+        # o próximo tick não deve descontar o tempo parado
+        self.clock.tick()
+        return events
+
+    def _account(self):
+        # atribui o tempo desde a última espera ao estado (ocupado/ocioso) daquela volta
+        cpu, wall = time.process_time(), time.perf_counter()
+        if self._busy:
+            self.busy_cpu += cpu - self._cpu
+            self.busy_wall += wall - self._wall
+        else:
+            self.idle_cpu += cpu - self._cpu
+            self.idle_wall += wall - self._wall
+        self._cpu, self._wall = cpu, wall
+
+    def frame(self):
+        """Registra um quadro desenhado."""
+        now = time.perf_counter()
+        self.frames += 1
+        times = self._frame_times
+        times.append(now)
+        while times and now - times[0] > FPS_WINDOW:
+            times.popleft()
+
+    @property
+    def measured_fps(self):
+        times = self._frame_times
+        if times and time.perf_counter() - times[-1] > FPS_WINDOW:
+            return 0.0
+        return len(times) / FPS_WINDOW
+
+    def stats(self):
+        def percent(cpu, wall):
+            return round(100.0 * cpu / wall, 2) if wall > 0 else 0.0
+        return {
+            'fps': self.measured_fps,
+            'frames': self.frames,
+            'wakeups': self.wakeups,
+            'busy_cpu_percent': percent(self.busy_cpu, self.busy_wall),
+            'idle_cpu_percent': percent(self.idle_cpu, self.idle_wall),
+            'idle_seconds': round(self.idle_wall, 3),
+        }
+
+    def label(self):
+        s = self.stats()
+        return (f"laço: {s['fps']:.0f} quadros/s, CPU ocupado {s['busy_cpu_percent']:.0f}%, "
+                f"ocioso {s['idle_cpu_percent']:.1f}%")
@@ -0,0 +1,466 @@
+"""
+generators.py
+
+Geradores de mapas com semente explícita, escritos em bloco no grid.
+
+Cada gerador recebe `(rows, cols, seed)` e devolve um `bytearray` de estados
+(EMPTY/OBSTACLE) do tamanho do grid; `generate(grid, kind, seed)` grava o
+resultado de uma vez com `grid.load_cells` (sem um `Node` por célula). A
+mesma semente sempre gera o mesmo mapa.
+
+Labirintos (células livres nas coordenadas ímpares, como `generate_maze`):
+
+- `backtracker`: busca em profundidade aleatória (corredores longos);
+- `kruskal`: arestas em ordem aleatória (árvore montada por Borůvka
+  vetorizado, a mesma que o union-find aceitaria nessa ordem);
+- `wilson`: árvore geradora uniforme por passeios aleatórios sem laços
+  (passeios longos em blocos numpy).
+
+Mapas abertos (vetorizados com numpy):
+
+- `caves`: cavernas por autômato celular;
+- `random`: obstáculos independentes com uma densidade dada;
+- `rooms`: salas retangulares ligadas por corredores em L.
+
+Cada gerador é escrito como um construtor que entrega as células em trechos
+(`CHUNK`), na ordem em que são abertas. `iter_generate` transforma esses
+trechos em eventos `índice << EVENT_SHIFT | estado` enquanto o mapa é
+construído, para ser animado quadro a quadro por um `playback.SearchPlayer`
+sem bloquear o laço de eventos.
+"""
+
+import functools
+import random
+from array import array
+
+import numpy as np
+
+from grid_model import EMPTY, EVENT_SHIFT, OBSTACLE
+
+# células entregues por trecho: limita o trabalho entre dois quadros da animação
+CHUNK = 1 << 14
+# passos de um passeio do Wilson feitos em Python antes de continuar em blocos numpy
+SHORT_WALK = 256
+
+
+def _streamed(build):
+    """Transforma o construtor `build` num gerador de mapas.
+
+    `build(rows, cols, seed, **params)` é um gerador: produz, na ordem de
+    construção, trechos de índices de células (vazio quando só trabalhou) e
+    retorna o `bytearray` pronto. A função resultante consome os trechos,
+    guardando-os em `trace` se dado; `função.steps` é o próprio `build`,
+    usado por `iter_generate`.
+    """
+    @functools.wraps(build)
+    def generator(rows, cols, seed=None, trace=None, **params):
+        steps = build(rows, cols, seed, **params)
+        while True:
+            try:
+                chunk = next(steps)
+            except StopIteration as stop:
+                return stop.value
+            if trace is not None:
+                trace.extend(np.asarray(chunk, dtype=np.int64).tolist())
+    generator.steps = build
+    return generator
+
+
+def _lattice(rows, cols):
+    # nós do labirinto nas coordenadas ímpares (1, 3, ...) até a última linha/coluna
+    return rows // 2, cols // 2
+
+
+def _walls(rows, cols):
+    return bytearray([OBSTACLE]) * (rows * cols)
+
+
+def _chunks(indices):
+    for k in range(0, len(indices), CHUNK):
+        yield indices[k:k + CHUNK]
+
+
+def _to_grid(nodes, cols, w, pad=0):
+    # índice no grid de nós de um reticulado `w` de largura com borda de `pad` nós
+    nodes = np.asarray(nodes, dtype=np.int64)
+    width = w + 2 * pad
+    i, j = nodes // width - pad, nodes % width - pad
+    return (2 * i + 1) * cols + 2 * j + 1
+
+
+def _carve(cells, cols, w, src, dst, pad=0, both=False):
+    """Abre no grid, para cada aresta `src[k] -> dst[k]` do reticulado, a
+    parede entre os dois nós e o nó `dst[k]` (em bloco); retorna as células
+    abertas, na ordem.
+
+    Com `both`, `src[k]` também é aberto (arestas sem orientação, como no
+    Kruskal). Com `pad`, os índices são de um reticulado com borda de `pad` nós.
+    """
+    a, b = _to_grid(src, cols, w, pad), _to_grid(dst, cols, w, pad)
+    walls = (a + b) >> 1
+    view = np.frombuffer(cells, dtype=np.uint8)
+    view[walls] = EMPTY
+    view[b] = EMPTY
+    steps = (walls, b)
+    if both:
+        view[a] = EMPTY
+        steps = (a, walls, b)
+    return np.column_stack(steps).ravel()
+
+
+def _open_root(cells, cols, w, root, pad=0):
+    first = _to_grid([root], cols, w, pad)
+    cells[int(first[0])] = EMPTY
+    return first
+
+
+@_streamed
+def backtracker(rows, cols, seed=None):
+    """Labirinto perfeito por busca em profundidade aleatória (iterativa)."""
+    h, w = _lattice(rows, cols)
+    cells = _walls(rows, cols)
+    if h == 0 or w == 0:
+        return cells
+    rand = random.Random(seed).random
+    # reticulado com borda já "visitada": dispensa testes de limite
+    width = w + 2
+    visited = bytearray([1]) * ((h + 2) * width)
+    for i in range(1, h + 1):
+        visited[i * width + 1:i * width + 1 + w] = bytes(w)
+    root = width + 1
+    visited[root] = 1
+    yield _open_root(cells, cols, w, root, pad=1)
+    src, dst = [], []
+    stack = [root]
+    nbrs = [0, 0, 0, 0]
+    while stack:
+        u = stack[-1]
+        n = 0
+        if not visited[u - width]:
+            nbrs[n] = u - width
+            n += 1
+        if not visited[u + width]:
+            nbrs[n] = u + width
+            n += 1
+        if not visited[u - 1]:
+            nbrs[n] = u - 1
+            n += 1
+        if not visited[u + 1]:
+            nbrs[n] = u + 1
+            n += 1
+        if not n:
+            stack.pop()
+            continue
+        v = nbrs[int(rand() * n)]
+        visited[v] = 1
+        src.append(u)
+        dst.append(v)
+        stack.append(v)
+        if len(src) == CHUNK:
+            yield _carve(cells, cols, w, src, dst, pad=1)
+            src, dst = [], []
+    yield _carve(cells, cols, w, src, dst, pad=1)
+    return cells
+
+
+@_streamed
+def kruskal(rows, cols, seed=None):
+    """Labirinto perfeito pelo algoritmo de Kruskal.
+
+    As arestas embaralhadas formam uma ordem total, e a árvore que o Kruskal
+    aceita nessa ordem é a árvore geradora mínima com esses pesos. Ela é
+    montada por Borůvka vetorizado: a cada rodada cada componente escolhe
+    sua aresta de menor ordem e as componentes ligadas são fundidas por
+    salto de ponteiros, em O(log n) rodadas sobre arrays. As arestas são
+    abertas na ordem em que o Kruskal as aceitaria.
+    """
+    h, w = _lattice(rows, cols)
+    cells = _walls(rows, cols)
+    if h == 0 or w == 0:
+        return cells
+    # arestas do reticulado: código 2u (para a direita) e 2u + 1 (para baixo)
+    right = np.flatnonzero((np.arange(h * w) % w) < w - 1) * 2
+    down = np.arange((h - 1) * w) * 2 + 1
+    edges = np.concatenate([right, down])
+    np.random.default_rng(seed).shuffle(edges)
+
+    n = h * w
+    u = edges >> 1
+    v = np.where(edges & 1, u + w, u + 1)
+    # ordem de cada aresta; os arrays ficam sempre em ordem crescente dela
+    rank = np.arange(len(edges))
+    comp = np.arange(n)
+    accepted = np.zeros(len(edges), dtype=bool)
+    yield ()
+    while len(rank):
+        cu, cv = comp[u], comp[v]
+        outer = cu != cv
+        if not outer.all():
+            u, v, rank, cu, cv = u[outer], v[outer], rank[outer], cu[outer], cv[outer]
+            if not len(rank):
+                break
+        # aresta de menor ordem (menor posição nos arrays) de cada componente
+        size = len(rank)
+        position = np.arange(size)
+        best = np.full(n, size)
+        np.minimum.at(best, cu, position)
+        np.minimum.at(best, cv, position)
+        roots = np.flatnonzero(best < size)
+        e = best[roots]
+        other = np.where(cu[e] == roots, cv[e], cu[e])
+        accepted[rank[e]] = True
+        # cada componente aponta para a vizinha; num par que se escolheu, a menor fica raiz
+        link = np.arange(n)
+        link[roots] = other
+        mutual = (link[other] == roots) & (roots < other)
+        link[roots[mutual]] = roots[mutual]
+        while True:
+            jumped = link[link]
+            if np.array_equal(jumped, link):
+                break
+            link = jumped
+        comp = link[comp]
+        yield ()
+    codes = edges[accepted]
+    yield _open_root(cells, cols, w, 0)
+    for part in _chunks(codes):
+        src = part >> 1
+        dst = np.where(part & 1, src + w, src + 1)
+        yield _carve(cells, cols, w, src, dst, both=True)
+    return cells
+
+
+def _offsets(rng, moves):
+    # deslocamentos aleatórios sorteados em blocos
+    while True:
+        yield from moves[rng.integers(0, 4, 1 << 16)].tolist()
+
+
+def _fold(x, n):
+    # reflete a coordenada de um passeio sem limites para 0..n-1; um passo
+    # para fora da borda vira um passo parado, que o apagamento de laços ignora
+    x = x % (2 * n)
+    return np.where(x < n, x, 2 * n - 1 - x)
+
+
+def _long_walk(rng, u, tree, nxt, last, h, w):
+    """Continua em blocos numpy o passeio do Wilson parado em `u`.
+
+    Cada bloco sorteia os passos de uma vez e acumula as coordenadas
+    (refletidas nas bordas); `nxt` recebe a última saída de cada nó até o
+    primeiro nó da árvore. `last` é um rascunho do tamanho do reticulado,
+    todo -1 na entrada e na saída. Gera `()` entre blocos e retorna o nó
+    atingido.
+    """
+    width = w + 2
+    size = 1024
+    while True:
+        i, j = divmod(u, width)
+        d = rng.integers(0, 4, size)
+        r = _fold(i - 1 + np.cumsum((d == 1).astype(np.int64) - (d == 0)), h)
+        c = _fold(j - 1 + np.cumsum((d == 3).astype(np.int64) - (d == 2)), w)
+        walk = (r + 1) * width + c + 1
+        hit = tree[walk] == 1
+        reached = bool(hit.any())
+        if reached:
+            walk = walk[:int(hit.argmax()) + 1]
+        walk = np.concatenate(([u], walk))
+        moved = walk[1:] != walk[:-1]
+        a, b = walk[:-1][moved], walk[1:][moved]
+        # a última saída de cada nó vale (é ela que sobra depois de apagar os laços)
+        order = np.arange(len(a))
+        np.maximum.at(last, a, order)
+        final = last[a] == order
+        nxt[a[final]] = b[final]
+        last[a] = -1
+        u = int(walk[-1])
+        if reached:
+            return u
+        size = min(size * 2, 1 << 20)
+        yield ()
+
+
+@_streamed
+def wilson(rows, cols, seed=None):
+    """Labirinto uniforme (árvore geradora uniforme) pelo algoritmo de Wilson.
+
+    Passeios curtos rodam em Python; os que passam de `SHORT_WALK` passos
+    continuam em blocos vetorizados (`_long_walk`), onde está quase todo o
+    trabalho no começo, quando a árvore ainda é pequena.
+    """
+    h, w = _lattice(rows, cols)
+    cells = _walls(rows, cols)
+    if h == 0 or w == 0:
+        return cells
+    rng = np.random.default_rng(seed)
+    width = w + 2
+    # borda marcada como fora do reticulado (2) para o passeio não sair dele
+    in_tree = bytearray([2]) * ((h + 2) * width)
+    for i in range(1, h + 1):
+        in_tree[i * width + 1:i * width + 1 + w] = bytes(w)
+    tree = np.frombuffer(in_tree, dtype=np.uint8)
+    nodes = rng.permutation(np.flatnonzero(tree == 0)).tolist()
+    # saída de cada nó no passeio atual (a última sobrescreve: apaga os laços)
+    nxt = array('q', bytes(8 * len(in_tree)))
+    nxt_view = np.frombuffer(nxt, dtype=np.int64)
+    last = np.full(len(in_tree), -1)
+    root = nodes[0]
+    in_tree[root] = 1
+    yield _open_root(cells, cols, w, root, pad=1)
+    step = _offsets(rng, np.array((-width, width, -1, 1)))
+    added = []
+    for start in nodes[1:]:
+        if in_tree[start]:
+            continue
+        u = start
+        n = 0
+        for offset in step:
+            v = u + offset
+            state = in_tree[v]
+            if state == 2:
+                continue
+            nxt[u] = v
+            u = v
+            if state:
+                break
+            n += 1
+            if n == SHORT_WALK:
+                yield from _long_walk(rng, u, tree, nxt_view, last, h, w)
+                break
+        # refaz o passeio seguindo as últimas saídas (caminho sem laços)
+        u = start
+        while in_tree[u] != 1:
+            in_tree[u] = 1
+            added.append(u)
+            u = nxt[u]
+        if len(added) >= CHUNK:
+            yield _attach(cells, cols, w, nxt_view, added)
+            added = []
+    yield _attach(cells, cols, w, nxt_view, added)
+    return cells
+
+
+def _attach(cells, cols, w, nxt, added):
+    # cada nó novo é aberto a partir da sua saída (já na árvore ou no mesmo passeio)
+    added = np.asarray(added, dtype=np.int64)
+    return _carve(cells, cols, w, nxt[added], added, pad=1)
+
+
+@_streamed
+def caves(rows, cols, seed=None, fill=0.45, steps=5):
+    """Cavernas por autômato celular (regra 4-5 sobre a vizinhança de 8).
+
+    Começa com `fill` de paredes aleatórias; a cada passo uma célula vira
+    parede se tiver 5 ou mais paredes entre ela e suas 8 vizinhas (fora do
+    grid conta como parede).
+    """
+    rng = np.random.default_rng(seed)
+    wall = rng.random((rows, cols)) < fill
+    for _ in range(steps):
+        padded = np.pad(wall, 1, constant_values=True).astype(np.uint8)
+        count = sum(padded[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+                    for dr in (-1, 0, 1) for dc in (-1, 0, 1))
+        wall = count >= 5
+        yield ()
+    return (yield from _to_cells(wall))
+
+
+@_streamed
+def random_density(rows, cols, seed=None, density=0.3):
+    """Obstáculos independentes: cada célula é parede com probabilidade `density`."""
+    wall = np.random.default_rng(seed).random((rows, cols)) < density
+    return (yield from _to_cells(wall))
+
+
+def _open(wall, r0, c0, rh, rw, cols):
+    # abre o retângulo; retorna, em ordem de leitura, as células que ainda eram parede
+    block = wall[r0:r0 + rh, c0:c0 + rw]
+    r, c = np.nonzero(block)
+    block[...] = False
+    return (r + r0) * cols + c + c0
+
+
+@_streamed
+def rooms(rows, cols, seed=None, attempts=None, min_size=3, max_size=None):
+    """Salas retangulares sem sobreposição ligadas por corredores em L.
+
+    Cada sala nova é ligada à anterior (na ordem de criação), então todas
+    ficam conectadas. As células são abertas sala por sala, corredor por
+    corredor.
+    """
+    rng = np.random.default_rng(seed)
+    wall = np.ones((rows, cols), dtype=bool)
+    if max_size is None:
+        max_size = max(min_size, min(12, min(rows, cols) // 4))
+    if attempts is None:
+        attempts = max(8, rows * cols // (max_size * max_size))
+    placed = []
+    for _ in range(attempts):
+        rh = int(rng.integers(min_size, max_size + 1))
+        rw = int(rng.integers(min_size, max_size + 1))
+        if rh >= rows - 1 or rw >= cols - 1:
+            continue
+        r0 = int(rng.integers(1, rows - rh))
+        c0 = int(rng.integers(1, cols - rw))
+        # exige uma parede entre salas
+        if not wall[r0 - 1:r0 + rh + 1, c0 - 1:c0 + rw + 1].all():
+            continue
+        yield _open(wall, r0, c0, rh, rw, cols)
+        center = (r0 + rh // 2, c0 + rw // 2)
+        if placed:
+            (pr, pc), (cr, cc) = placed[-1], center
+            if rng.random() < 0.5:
+                yield _open(wall, min(pr, cr), pc, abs(pr - cr) + 1, 1, cols)
+                yield _open(wall, cr, min(pc, cc), 1, abs(pc - cc) + 1, cols)
+            else:
+                yield _open(wall, pr, min(pc, cc), 1, abs(pc - cc) + 1, cols)
+                yield _open(wall, min(pr, cr), cc, abs(pr - cr) + 1, 1, cols)
+        placed.append(center)
+    return bytearray(np.where(wall, OBSTACLE, EMPTY).astype(np.uint8).tobytes())
+
+
+def _to_cells(wall):
+    # mapas abertos: paredes surgem em ordem de leitura (linha a linha)
+    yield from _chunks(np.flatnonzero(wall))
+    return bytearray(np.where(wall, OBSTACLE, EMPTY).astype(np.uint8).tobytes())
+
+
+GENERATORS = {
+    'backtracker': backtracker,
+    'kruskal': kruskal,
+    'wilson': wilson,
+    'caves': caves,
+    'random': random_density,
+    'rooms': rooms,
+}
+# labirintos começam todo parede e são "escavados"; os demais começam vazios
+CARVED = frozenset(('backtracker', 'kruskal', 'wilson', 'rooms'))
+
+
+def generate(grid, kind='backtracker', seed=None, **params):
+    """Gera o mapa `kind` e grava no grid de uma vez; retorna o grid."""
+    grid.load_cells(GENERATORS[kind](grid.rows, grid.cols, seed, **params))
+    return grid
+
+
+def iter_generate(grid, kind='backtracker', seed=None, **params):
+    """Gera o mapa como eventos na ordem de construção (para animar).
+
+    Labirintos e salas: o grid vira todo parede de uma vez e as células são
+    abertas uma a uma. Cavernas e obstáculos aleatórios: o grid é limpo e as
+    paredes aparecem linha a linha. Os eventos saem à medida que o gerador
+    avança, trecho a trecho; enquanto ele só calcula, gera `None` e o quadro
+    segue. Ao final o grid é idêntico ao de `generate` com a mesma semente.
+    """
+    steps = GENERATORS[kind].steps(grid.rows, grid.cols, seed, **params)
+    if kind in CARVED:
+        grid.load_cells(_walls(grid.rows, grid.cols))
+        code = EMPTY
+    else:
+        grid.load_cells(bytearray(grid.rows * grid.cols))
+        code = OBSTACLE
+    for chunk in steps:
+        if not len(chunk):
+            yield None
+            continue
+        yield from (np.asarray(chunk, dtype=np.int64) << EVENT_SHIFT | code).tolist()
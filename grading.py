@@ -0,0 +1,517 @@
+"""
+grading.py
+
+Correção em lote das entregas dos alunos (`run_astar` / `run_dijkstra`), sem janela.
+
+A pasta de entregas tem uma subpasta por aluno com `astar_impl.py` e/ou
+`dijkstra_impl.py` (os mesmos arquivos da atividade):
+
+    entregas/
+        ana/astar_impl.py
+        ana/dijkstra_impl.py
+        bruno/astar_impl.py
+
+Cada arquivo roda num processo separado contra um corpus de cenários com
+semente — os mapas de `benchmark.scenarios` (campo aberto, obstáculos
+aleatórios, labirintos, geradores) mais casos sem caminho — com um `draw` que
+não faz nada. Em cada teste:
+
+- o caminho (lista devolvida, cadeia de pais ou, sem pais, as células que a
+  entrega marcou com `make_path()`, percorridas do início ao fim) precisa
+  começar no início, terminar no fim, andar entre vizinhos em 4 direções e
+  não passar por obstáculos; "sem caminho" precisa bater com a referência;
+- o custo é comparado ao do motor de referência (`search_core.iter_astar` /
+  `iter_dijkstra`): `ok` se ótimo, `suboptimal` se válido porém mais longo;
+- expansões (células fechadas) e tempo de CPU são relatados em relação aos
+  da referência no mesmo cenário.
+
+Cada teste tem tempo limite (`--timeout`) e cada processo um limite de
+memória (`--memory-mb`, onde há `resource`: Linux/macOS). Um teste que passa
+do tempo ou derruba o processo é registrado (`timeout` / `crash`) e um
+processo novo continua a partir do teste seguinte. Até `--workers` entregas
+rodam ao mesmo tempo.
+
+Exemplos:
+
+    python grading.py entregas --out testes.jsonl --csv notas.csv
+    python grading.py entregas --preset full --workers 8 --timeout 20
+"""
+
+import argparse
+import csv
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from collections import deque, namedtuple
+from multiprocessing.connection import wait
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmark import PRESETS, build_scenario, scenarios
+from grid_model import CLOSED, END, OBSTACLE, PATH, START, Grid, Node
+from search_core import iter_astar, iter_dijkstra, new_stats, path_from_parents, run_events
+
+# algoritmo -> (arquivo da entrega, função, gerador de referência)
+ASSIGNMENTS = {
+    'astar': ('astar_impl.py', 'run_astar', iter_astar),
+    'dijkstra': ('dijkstra_impl.py', 'run_dijkstra', iter_dijkstra),
+}
+
+# tempo limite de cada teste (s) e memória que cada processo pode alocar além da inicial (MB)
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MEMORY_MB = 1024
+
+# resultado de um teste (na ordem das colunas)
+STATUSES = ('ok', 'suboptimal', 'invalid', 'error', 'timeout', 'crash', 'load_error')
+# campos do resumo por entrega (CSV)
+SUMMARY_FIELDS = ('student', 'algo', 'tests', 'score') + STATUSES + ('expanded_ratio', 'time_ratio')
+
+Submission = namedtuple('Submission', 'student algo path func')
+
+
+def find_submissions(root, algos=tuple(ASSIGNMENTS)):
+    """Entregas em `root`: uma por (subpasta, algoritmo) com o arquivo da atividade.
+
+    Se `root` já contém os arquivos, é tratada como a entrega de um aluno só.
+    """
+    folders = [root] if any(os.path.exists(os.path.join(root, ASSIGNMENTS[a][0])) for a in algos) else \
+        [os.path.join(root, name) for name in sorted(os.listdir(root))
+         if os.path.isdir(os.path.join(root, name))]
+    found = []
+    for folder in folders:
+        student = os.path.basename(os.path.normpath(folder))
+        for algo in algos:
+            filename, func, _ = ASSIGNMENTS[algo]
+            path = os.path.join(folder, filename)
+            if os.path.exists(path):
+                found.append(Submission(student, algo, os.path.abspath(path), func))
+    return found
+
+
+# --- Corpus ---
+
+def _blocked_case(size):
+    # campo aberto com o fim emparedado no canto: nenhum caminho
+    cells = bytearray(size * size)
+    end = size * size - 1
+    cells[end - 1] = OBSTACLE
+    cells[end - size] = OBSTACLE
+    return bytes(cells), 0, end
+
+
+def _fresh_grid(size, cells):
+    grid = Grid(size, size, 1)
+    grid.dirty = None
+    grid.load_cells(cells)
+    return grid
+
+
+def _reference(test, search):
+    grid = _fresh_grid(test['size'], test['cells'])
+    start, end = Node(grid, test['start']), Node(grid, test['end'])
+    start.make_start()
+    end.make_end()
+    stats = new_stats()
+    t0 = time.process_time()
+    path = run_events(search(grid, start, end, stats=stats), grid)
+    cpu = time.process_time() - t0
+    return {'found': path is not None, 'cost': stats['cost'], 'expanded': stats['expanded'],
+            'cpu_ms': round(cpu * 1000.0, 3)}
+
+
+def build_tests(sizes, kinds, densities, seeds, algos=tuple(ASSIGNMENTS)):
+    """Corpus de testes: cenários do benchmark mais um caso sem caminho por tamanho.
+
+    Cada teste traz os estados do mapa, início, fim e o resultado da
+    referência de cada algoritmo em `reference`.
+    """
+    tests = []
+    for scenario in scenarios(sizes, kinds, densities, seeds):
+        cells, start, end = build_scenario(scenario)
+        tests.append(dict(scenario, cells=cells, start=start, end=end))
+    for size in sizes:
+        cells, start, end = _blocked_case(size)
+        tests.append({'scenario': f"blocked-{size}", 'kind': 'blocked', 'size': size, 'density': 0.0,
+                      'seed': 0, 'cells': cells, 'start': start, 'end': end})
+    for test in tests:
+        test['reference'] = {algo: _reference(test, ASSIGNMENTS[algo][2]) for algo in algos}
+    return tests
+
+
+# --- Execução de um teste (no processo da entrega) ---
+
+def check_path(cells, size, path, start, end):
+    """Motivo pelo qual `path` não é um caminho válido de `start` a `end`, ou None."""
+    if not path:
+        return "caminho vazio"
+    if path[0] != start or path[-1] != end:
+        return "o caminho não vai do início ao fim"
+    for a, b in zip(path, path[1:]):
+        if not (0 <= b < size * size):
+            return f"célula {b} fora do grid"
+        ar, ac = divmod(a, size)
+        br, bc = divmod(b, size)
+        if abs(ar - br) + abs(ac - bc) != 1:
+            return f"passo entre células não vizinhas ({ar},{ac}) -> ({br},{bc})"
+        if cells[b] == OBSTACLE:
+            return f"o caminho passa pelo obstáculo ({br},{bc})"
+    return None
+
+
+def path_from_marks(grid, start, end):
+    """Caminho do início ao fim pelas células marcadas como caminho, ou None.
+
+    Para entregas que guardam os pais fora do nó (ex.: um dicionário
+    `came_from`) e só pintam o caminho com `make_path()`: busca em largura
+    de `start` a `end` andando apenas por células PATH/START/END.
+    """
+    cells, cols = grid.cells, grid.cols
+    marked = (PATH, START, END)
+    source, target = start.index, end.index
+    parent = {source: -1}
+    queue = deque([source])
+    while queue:
+        i = queue.popleft()
+        if i == target:
+            path = []
+            while i != -1:
+                path.append(i)
+                i = parent[i]
+            return path[::-1]
+        r, c = divmod(i, cols)
+        for n, ok in ((i - cols, r > 0), (i + cols, r < grid.rows - 1), (i - 1, c > 0), (i + 1, c < cols - 1)):
+            if ok and n not in parent and cells[n] in marked:
+                parent[n] = i
+                queue.append(n)
+    return None
+
+
+def run_test(func, test):
+    """Roda `func(draw, grid, start, end)` num teste e mede o resultado (sem compará-lo)."""
+    size = test['size']
+    grid = _fresh_grid(size, test['cells'])
+    start, end = Node(grid, test['start']), Node(grid, test['end'])
+    start.make_start()
+    end.make_end()
+    t0 = time.process_time()
+    try:
+        result = func(lambda: None, grid, start, end)
+    except Exception as exc:
+        return {'error': f"{type(exc).__name__}: {exc}", 'cpu_ms': round((time.process_time() - t0) * 1000.0, 3)}
+    cpu = time.process_time() - t0
+    record = {'found': bool(result), 'expanded': grid.counts[CLOSED], 'cpu_ms': round(cpu * 1000.0, 3)}
+    if isinstance(result, list):
+        # alguns alunos devolvem o caminho (índices ou nós) em vez de True
+        path = [getattr(node, 'index', node) for node in result]
+    else:
+        path = None
+        if result:
+            # sem cadeia de pais, vale o caminho pintado com make_path()
+            path = path_from_parents(grid, start, end) or path_from_marks(grid, start, end)
+    if result:
+        problem = check_path(test['cells'], size, path, test['start'], test['end']) \
+            if path is not None else "retornou True sem cadeia de pais nem caminho marcado até o início"
+        record['problem'] = problem
+        record['cost'] = None if problem else len(path) - 1
+    return record
+
+
+def _limit_memory(megabytes):
+    # limita o espaço de endereçamento a `megabytes` além do que o processo já usa
+    if resource is None or not megabytes:
+        return
+    try:
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        current = 0
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = current + megabytes * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def load_submission(path, func_name):
+    """Importa o arquivo da entrega (com a pasta dela no `sys.path`) e retorna a função."""
+    folder = os.path.dirname(path)
+    sys.path.insert(0, folder)
+    name = f"entrega_{abs(hash(path))}_{os.path.splitext(os.path.basename(path))[0]}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, func_name)
+
+
+def _grade_child(conn, submission, tests, first, memory_mb):
+    # saída dos alunos (prints de depuração) não polui o relatório
+    sys.stdout = open(os.devnull, 'w')
+    _limit_memory(memory_mb)
+    try:
+        func = load_submission(submission.path, submission.func)
+    except BaseException as exc:
+        conn.send(('load_error', f"{type(exc).__name__}: {exc}", traceback.format_exc()))
+        return
+    for i in range(first, len(tests)):
+        conn.send(('start', i))
+        try:
+            record = run_test(func, tests[i])
+        except MemoryError:
+            record = {'error': "MemoryError: passou do limite de memória"}
+        conn.send(('result', i, record))
+    conn.send(('done',))
+    conn.close()
+
+
+# --- Avaliação ---
+
+def _ratio(value, reference):
+    if value is None or not reference:
+        return None
+    return round(value / reference, 4)
+
+
+def score(submission, test, measured):
+    """Registro final de um teste: situação, custo e razões em relação à referência."""
+    ref = test['reference'][submission.algo]
+    record = {
+        'student': submission.student,
+        'algo': submission.algo,
+        'scenario': test['scenario'],
+        'status': None,
+        'found': measured.get('found'),
+        'expected_found': ref['found'],
+        'cost': measured.get('cost'),
+        'ref_cost': ref['cost'],
+        'expanded': measured.get('expanded'),
+        'ref_expanded': ref['expanded'],
+        'expanded_ratio': _ratio(measured.get('expanded'), ref['expanded']),
+        'cpu_ms': measured.get('cpu_ms'),
+        'ref_cpu_ms': ref['cpu_ms'],
+        'time_ratio': _ratio(measured.get('cpu_ms'), ref['cpu_ms']),
+        'detail': None,
+    }
+    if 'status' in measured:
+        record['status'] = measured['status']
+        record['detail'] = measured.get('detail')
+    elif 'error' in measured:
+        record['status'] = 'error'
+        record['detail'] = measured['error']
+    elif measured['found'] != ref['found']:
+        record['status'] = 'invalid'
+        record['detail'] = "encontrou caminho onde não há" if measured['found'] else \
+            "não encontrou caminho existente"
+    elif measured.get('problem'):
+        record['status'] = 'invalid'
+        record['detail'] = measured['problem']
+    elif ref['found'] and measured['cost'] > ref['cost']:
+        record['status'] = 'suboptimal'
+        record['detail'] = f"custo {measured['cost']} > ótimo {ref['cost']:g}"
+    else:
+        record['status'] = 'ok'
+    return record
+
+
+class _Job:
+    """Uma entrega em andamento: próximo teste, processo atual, teste em execução e desde quando."""
+    def __init__(self, submission):
+        self.submission = submission
+        self.next = 0
+        self.process = None
+        self.conn = None
+        self.current = None
+        self.started = None
+
+
+def grade(submissions, tests, workers=None, timeout=DEFAULT_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB):
+    """Roda todas as entregas em todos os testes e gera os registros à medida que ficam prontos.
+
+    Até `workers` processos (None = núcleos da máquina) rodam ao mesmo tempo,
+    cada um com uma entrega. Registros de uma mesma entrega saem na ordem
+    dos testes.
+    """
+    workers = workers or os.cpu_count() or 1
+    pending = deque(_Job(submission) for submission in submissions)
+    running = {}
+
+    def launch(job):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        job.process = multiprocessing.Process(
+            target=_grade_child, args=(sender, job.submission, tests, job.next, memory_mb), daemon=True)
+        job.process.start()
+        sender.close()
+        job.conn = receiver
+        job.current = None
+        running[receiver] = job
+
+    def stop(job):
+        running.pop(job.conn, None)
+        job.conn.close()
+        if job.process.is_alive():
+            job.process.kill()
+        job.process.join()
+
+    def resume_after(job, index):
+        # processo perdido no teste `index`: outro continua do seguinte
+        stop(job)
+        job.next = index + 1
+        if job.next < len(tests):
+            pending.appendleft(job)
+
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                launch(pending.popleft())
+            for conn in wait(list(running), timeout=0.05):
+                job = running[conn]
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    stop(job)
+                    crash = {'status': 'crash', 'detail': f"o processo terminou (código {job.process.exitcode})"}
+                    if job.current is None:
+                        # morreu fora de um teste (ex.: ao carregar a entrega): perde os restantes
+                        for test in tests[job.next:]:
+                            yield score(job.submission, test, crash)
+                    else:
+                        yield score(job.submission, tests[job.current], crash)
+                        resume_after(job, job.current)
+                    continue
+                kind = message[0]
+                if kind == 'start':
+                    job.current = message[1]
+                    job.started = time.perf_counter()
+                elif kind == 'result':
+                    _, index, measured = message
+                    job.current = None
+                    job.next = index + 1
+                    yield score(job.submission, tests[index], measured)
+                elif kind == 'load_error':
+                    stop(job)
+                    for test in tests[job.next:]:
+                        yield score(job.submission, test, {'status': 'load_error', 'detail': message[1]})
+                else:
+                    stop(job)
+            now = time.perf_counter()
+            for job in list(running.values()):
+                if job.current is not None and now - job.started > timeout:
+                    index = job.current
+                    yield score(job.submission, tests[index], {
+                        'status': 'timeout', 'detail': f"passou de {timeout:g} s"})
+                    resume_after(job, index)
+    finally:
+        for job in list(running.values()):
+            stop(job)
+
+
+def _geomean(values):
+    values = [v for v in values if v]
+    return round(math.exp(sum(math.log(v) for v in values) / len(values)), 4) if values else None
+
+
+def summarize(records):
+    """Resumo por (aluno, algoritmo): contagem de cada situação, nota e razões médias.
+
+    `score` é a fração de testes `ok`; as razões (média geométrica) usam só os
+    testes `ok` e `suboptimal`.
+    """
+    groups = {}
+    for r in records:
+        groups.setdefault((r['student'], r['algo']), []).append(r)
+    rows = []
+    for (student, algo), group in sorted(groups.items()):
+        row = {'student': student, 'algo': algo, 'tests': len(group)}
+        for status in STATUSES:
+            row[status] = sum(r['status'] == status for r in group)
+        row['score'] = round(row['ok'] / len(group), 4)
+        valid = [r for r in group if r['status'] in ('ok', 'suboptimal')]
+        row['expanded_ratio'] = _geomean(r['expanded_ratio'] for r in valid)
+        row['time_ratio'] = _geomean(r['time_ratio'] for r in valid)
+        rows.append(row)
+    return rows
+
+
+def _int_list(text):
+    return [int(x) for x in text.split(',') if x]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corrige em lote as entregas de A* e Dijkstra.")
+    parser.add_argument('submissions', help="pasta com uma subpasta por aluno")
+    parser.add_argument('--algos', default=','.join(ASSIGNMENTS), help="algoritmos: astar,dijkstra")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='quick')
+    parser.add_argument('--sizes', type=_int_list, help="tamanhos dos mapas, ex.: 40,200")
+    parser.add_argument('--seeds', type=_int_list, help="sementes, ex.: 1,2,3")
+    parser.add_argument('--workers', type=int, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="limite por teste (s)")
+    parser.add_argument('--memory-mb', type=int, default=DEFAULT_MEMORY_MB,
+                        help="memória por processo além da inicial (MB; 0 = sem limite)")
+    parser.add_argument('--out', help="registros de cada teste (JSON Lines)")
+    parser.add_argument('--csv', help="resumo por entrega (CSV)")
+    args = parser.parse_args(argv)
+
+    algos = [a for a in args.algos.split(',') if a]
+    unknown = [a for a in algos if a not in ASSIGNMENTS]
+    if unknown:
+        parser.error(f"algoritmos desconhecidos: {', '.join(unknown)}")
+    submissions = find_submissions(args.submissions, algos)
+    if not submissions:
+        parser.error(f"nenhuma entrega em {args.submissions}")
+    preset = PRESETS[args.preset]
+    t0 = time.perf_counter()
+    tests = build_tests(args.sizes or preset['sizes'], preset['kinds'], preset['densities'],
+                        args.seeds or preset['seeds'], algos)
+    print(f"{len(submissions)} entregas x {len(tests)} testes (referência em "
+          f"{time.perf_counter() - t0:.1f} s)", file=sys.stderr)
+
+    records = []
+    reported = set()
+    out = open(args.out, 'w', encoding='utf-8') if args.out else None
+    try:
+        for record in grade(submissions, tests, args.workers, args.timeout, args.memory_mb):
+            records.append(record)
+            if out is not None:
+                out.write(json.dumps(record) + '\n')
+            if record['status'] == 'load_error':
+                # a entrega nem carregou: uma linha basta
+                key = record['student'], record['algo']
+                if key in reported:
+                    continue
+                reported.add(key)
+            if record['status'] != 'ok':
+                print(f"{record['student']:<16} {record['algo']:<9} {record['scenario']:<22} "
+                      f"{record['status']}: {record['detail']}", file=sys.stderr)
+    finally:
+        if out is not None:
+            out.close()
+
+    rows = summarize(records)
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def show(value):
+        return '-' if value is None else f"{value:.2f}"
+    print(f"{'aluno':<16} {'algo':<9} {'nota':>5} {'ok':>4} {'subót':>5} {'inval':>5} "
+          f"{'erro':>4} {'tempo':>5} {'queda':>5}  {'exp/ref':>7} {'cpu/ref':>7}")
+    for row in rows:
+        print(f"{row['student']:<16} {row['algo']:<9} {row['score']:>5.2f} {row['ok']:>4} "
+              f"{row['suboptimal']:>5} {row['invalid']:>5} {row['error'] + row['load_error']:>4} "
+              f"{row['timeout']:>5} {row['crash']:>5}  {show(row['expanded_ratio']):>7} "
+              f"{show(row['time_ratio']):>7}")
+    print(f"{len(records)} testes em {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,493 @@
+"""
+grid_model.py
+
+Núcleo do grid, sem dependência de pygame: códigos de estado, `Grid`
+(armazenamento compacto), `Node` (visão leve de uma célula) e as operações
+de edição usadas pelo visualizador (`make_grid`, `generate_maze`,
+`apply_brush`, `clear_algorithm_marks`) e pelos scripts sem janela.
+
+Pode ser importado em testes, workers e servidores sem display — o pygame só
+é carregado se algum `Node.draw` for de fato chamado.
+"""
+
+from array import array
+
+import numpy as np
+
+# --- Estados das células ---
+# Cada célula guarda um código inteiro pequeno (1 byte) em vez de uma string.
+# OPEN_BACK/CLOSED_BACK: fronteira da busca bidirecional que parte do fim
+EMPTY, OBSTACLE, START, END, OPEN, CLOSED, PATH, OPEN_BACK, CLOSED_BACK = range(9)
+STATE_NAMES = ('empty', 'obstacle', 'start', 'end', 'open', 'closed', 'path',
+               'open_back', 'closed_back')
+STATE_CODES = {name: code for code, name in enumerate(STATE_NAMES)}
+
+# Eventos de busca: um inteiro `índice << EVENT_SHIFT | código do estado`
+EVENT_SHIFT = 4
+EVENT_MASK = (1 << EVENT_SHIFT) - 1
+
+# Adjacência: um bit por direção indica que a célula vizinha existe e está livre
+DOWN, UP, RIGHT, LEFT = 1, 2, 4, 8
+DOWN_RIGHT, DOWN_LEFT, UP_RIGHT, UP_LEFT = 16, 32, 64, 128
+# (dr, dc, bit na célula, bit correspondente na vizinha apontando de volta)
+DIRECTIONS = (
+    (1, 0, DOWN, UP), (-1, 0, UP, DOWN), (0, 1, RIGHT, LEFT), (0, -1, LEFT, RIGHT),
+    (1, 1, DOWN_RIGHT, UP_LEFT), (1, -1, DOWN_LEFT, UP_RIGHT),
+    (-1, 1, UP_RIGHT, DOWN_LEFT), (-1, -1, UP_LEFT, DOWN_RIGHT),
+)
+
+
+def adjacency_from_free(free):
+    """Máscaras de adjacência (uint8) de um bloco 2D de células livres (bool/0-1).
+
+    Vizinhas fora do bloco contam como bloqueadas; para um pedaço de um grid
+    maior, passe o pedaço com uma borda de 1 célula e descarte a borda.
+    """
+    free = np.asarray(free).astype(np.uint8)
+    adj = np.zeros(free.shape, dtype=np.uint8)
+    adj[:-1, :] |= free[1:, :] * DOWN
+    adj[1:, :] |= free[:-1, :] * UP
+    adj[:, :-1] |= free[:, 1:] * RIGHT
+    adj[:, 1:] |= free[:, :-1] * LEFT
+    adj[:-1, :-1] |= free[1:, 1:] * DOWN_RIGHT
+    adj[:-1, 1:] |= free[1:, :-1] * DOWN_LEFT
+    adj[1:, :-1] |= free[:-1, 1:] * UP_RIGHT
+    adj[1:, 1:] |= free[:-1, :-1] * UP_LEFT
+    return adj
+
+
+# Hash Zobrist do layout de obstáculos: cada célula tem uma chave pseudoaleatória
+# de 64 bits e o hash é o XOR das chaves das células com obstáculo. As chaves
+# vêm do índice (splitmix64), sem tabela de 8 bytes por célula.
+_MASK64 = (1 << 64) - 1
+# células por lote no cálculo vetorizado (limita a memória temporária)
+_HASH_CHUNK = 1 << 20
+
+
+def zobrist_key(index):
+    """Chave Zobrist (inteiro de 64 bits) da célula `index`."""
+    z = (index + 1) * 0x9E3779B97F4A7C15 & _MASK64
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EB & _MASK64
+    return z ^ (z >> 31)
+
+
+def zobrist_hash(indices):
+    """XOR das chaves Zobrist de um array de índices (mesmo resultado de `zobrist_key`)."""
+    indices = np.asarray(indices, dtype=np.uint64)
+    h = np.uint64(0)
+    for i in range(0, len(indices), _HASH_CHUNK):
+        z = indices[i:i + _HASH_CHUNK] + np.uint64(1)
+        z *= np.uint64(0x9E3779B97F4A7C15)
+        z ^= z >> np.uint64(30)
+        z *= np.uint64(0xBF58476D1CE4E5B9)
+        z ^= z >> np.uint64(27)
+        z *= np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+        h ^= np.bitwise_xor.reduce(z)
+    return int(h)
+
+
+def layout_hash(cells):
+    """Hash Zobrist do layout de obstáculos de um array de estados (bytes/bytearray/numpy)."""
+    states = np.frombuffer(cells, dtype=np.uint8) if not isinstance(cells, np.ndarray) else cells.ravel()
+    return zobrist_hash(np.flatnonzero(states == OBSTACLE))
+
+
+class Grid:
+    """Grid compacto: estados num bytearray contíguo e pais num array de inteiros.
+
+    As células são endereçadas por índice linear (`row * cols + col`). Os
+    objetos `Node` são criados sob demanda como visões leves sobre esse
+    armazenamento, então `grid[row][col]` continua funcionando como antes.
+
+    `cells` e `adj` permitem usar um armazenamento já pronto, sem cópia (ex.:
+    visões de um bloco de memória compartilhada); com `adj`, a adjacência é
+    aceita como está e não é recalculada.
+    """
+    def __init__(self, rows, cols, gap, cells=None, adj=None):
+        self.rows = rows
+        self.cols = cols
+        self.gap = gap
+        size = rows * cols
+        # estado de cada célula (códigos EMPTY..PATH)
+        self.cells = bytearray(size) if cells is None else cells
+        # índice do pai de cada célula (-1 = sem pai)
+        self.parent = array('i', [-1]) * size
+        # máscara de vizinhos livres de cada célula (bits DOWN..UP_LEFT),
+        # mantida localmente a cada mudança de obstáculo
+        if adj is None:
+            self.adj = bytearray(size)
+            self.rebuild_adjacency()
+        else:
+            self.adj = adj
+        # incrementado a cada mudança de obstáculo (invalida caches derivados)
+        self.obstacle_version = 0
+        # hash Zobrist dos obstáculos, mantido a cada mudança: layouts iguais têm o
+        # mesmo hash (chave de `pathcache`), ao contrário de `obstacle_version`
+        self.layout_hash = 0
+        # células alteradas desde o último quadro (consumido pelo renderizador);
+        # None desativa o registro
+        self.dirty = set()
+        self.full_redraw = False
+        # quantas vezes cada estado foi atribuído (ex.: counts[CLOSED] = expansões)
+        self.counts = [0] * len(STATE_NAMES)
+        # se for uma lista, cada mudança de estado é registrada como evento
+        self.log = None
+
+    @property
+    def total_rows(self):
+        return self.rows
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.rows
+        if not 0 <= row < self.rows:
+            raise IndexError('grid row index out of range')
+        return GridRow(self, row)
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield GridRow(self, row)
+
+    def node(self, row, col):
+        """Retorna a visão `Node` da célula (row, col)."""
+        return Node(self, row * self.cols + col)
+
+    def node_at(self, index):
+        """Retorna a visão `Node` da célula de índice linear `index`."""
+        return Node(self, index)
+
+    def set_state(self, index, code):
+        """Altera o estado de uma célula e a registra para repintura."""
+        cells = self.cells
+        if (cells[index] == OBSTACLE) != (code == OBSTACLE):
+            self._update_adjacency(index, code != OBSTACLE)
+            self.obstacle_version += 1
+            self.layout_hash ^= zobrist_key(index)
+        cells[index] = code
+        self.counts[code] += 1
+        if self.dirty is not None:
+            self.dirty.add(index)
+        if self.log is not None:
+            self.log.append(index << EVENT_SHIFT | code)
+
+    def _update_adjacency(self, index, free):
+        # ajusta só o bit que cada uma das (até 8) vizinhas usa para apontar para `index`
+        rows, cols = self.rows, self.cols
+        adj = self.adj
+        row, col = divmod(index, cols)
+        for dr, dc, _, back in DIRECTIONS:
+            r, c = row + dr, col + dc
+            if 0 <= r < rows and 0 <= c < cols:
+                j = r * cols + c
+                if free:
+                    adj[j] |= back
+                else:
+                    adj[j] &= ~back & 0xFF
+
+    def rebuild_adjacency(self):
+        """Recalcula a máscara de vizinhos do grid inteiro (após escritas em bloco)."""
+        free = (np.frombuffer(self.cells, dtype=np.uint8) != OBSTACLE).reshape(self.rows, self.cols)
+        self.adj[:] = adjacency_from_free(free).tobytes()
+
+    def read_block(self, r0, r1, c0, c1):
+        """Estados das linhas `r0:r1` e colunas `c0:c1` como array numpy 2D."""
+        states = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.rows, self.cols)
+        return states[r0:r1, c0:c1]
+
+    def load_cells(self, data):
+        """Substitui todos os estados de uma vez (ex.: grid carregado) e atualiza a adjacência."""
+        self.cells[:] = data
+        self.rebuild_adjacency()
+        self.obstacle_version += 1
+        self.layout_hash = layout_hash(self.cells)
+        self.full_redraw = True
+
+    def clear_marks(self):
+        """Volta para EMPTY as células em estados de busca (>= OPEN) e zera seus pais."""
+        states = np.frombuffer(self.cells, dtype=np.uint8)
+        marked = np.flatnonzero(states >= OPEN)
+        if not len(marked):
+            return
+        states[marked] = EMPTY
+        np.frombuffer(self.parent, dtype=np.int32)[marked] = -1
+        if self.dirty is not None:
+            if len(marked) > len(states) // 8:
+                self.full_redraw = True
+            else:
+                self.dirty.update(marked.tolist())
+
+    def neighbor_indices(self, index):
+        """Índices dos vizinhos livres em 4 direções (baixo, cima, direita, esquerda)."""
+        m = self.adj[index]
+        cols = self.cols
+        out = []
+        if m & DOWN:
+            out.append(index + cols)
+        if m & UP:
+            out.append(index - cols)
+        if m & RIGHT:
+            out.append(index + 1)
+        if m & LEFT:
+            out.append(index - 1)
+        return out
+
+
+class GridRow:
+    """Visão de uma linha do grid (permite `grid[row][col]`)."""
+    __slots__ = ('grid', 'row')
+
+    def __init__(self, grid, row):
+        self.grid = grid
+        self.row = row
+
+    def __len__(self):
+        return self.grid.cols
+
+    def __getitem__(self, col):
+        cols = self.grid.cols
+        if col < 0:
+            col += cols
+        if not 0 <= col < cols:
+            raise IndexError('grid column index out of range')
+        return Node(self.grid, self.row * cols + col)
+
+    def __iter__(self):
+        grid = self.grid
+        base = self.row * grid.cols
+        for index in range(base, base + grid.cols):
+            yield Node(grid, index)
+
+
+class Node:
+    """Representa uma célula no grid (visão leve sobre o armazenamento do `Grid`)."""
+    __slots__ = ('grid', 'index')
+
+    def __init__(self, grid, index):
+        self.grid = grid
+        self.index = index
+
+    def __eq__(self, other):
+        return (isinstance(other, Node) and self.index == other.index
+                and self.grid is other.grid)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.index)
+
+    def __repr__(self):
+        return f"Node({self.row}, {self.col}, {self.state!r})"
+
+    @property
+    def row(self):
+        return self.index // self.grid.cols
+
+    @property
+    def col(self):
+        return self.index % self.grid.cols
+
+    # x = pixel horizontal (col * width), y = pixel vertical (row * width)
+    @property
+    def x(self):
+        return self.col * self.grid.gap
+
+    @property
+    def y(self):
+        return self.row * self.grid.gap
+
+    @property
+    def width(self):
+        return self.grid.gap
+
+    @property
+    def total_rows(self):
+        return self.grid.rows
+
+    # state: 'empty','obstacle','start','end','open','closed','path'
+    @property
+    def state(self):
+        return STATE_NAMES[self.grid.cells[self.index]]
+
+    @state.setter
+    def state(self, name):
+        self.grid.set_state(self.index, STATE_CODES[name])
+
+    @property
+    def parent(self):
+        p = self.grid.parent[self.index]
+        return Node(self.grid, p) if p >= 0 else None
+
+    @parent.setter
+    def parent(self, node):
+        self.grid.parent[self.index] = node.index if node is not None else -1
+
+    @property
+    def neighbors(self):
+        # calculado na hora a partir da adjacência mantida pelo grid
+        grid = self.grid
+        return [Node(grid, i) for i in grid.neighbor_indices(self.index)]
+
+    def get_pos(self):
+        return self.row, self.col
+
+    def is_obstacle(self):
+        return self.grid.cells[self.index] == OBSTACLE
+
+    def is_start(self):
+        return self.grid.cells[self.index] == START
+
+    def is_end(self):
+        return self.grid.cells[self.index] == END
+
+    def is_path(self):
+        return self.grid.cells[self.index] == PATH
+
+    def is_open(self):
+        return self.grid.cells[self.index] == OPEN
+
+    def is_closed(self):
+        return self.grid.cells[self.index] == CLOSED
+
+    def reset(self):
+        self.grid.set_state(self.index, EMPTY)
+        self.grid.parent[self.index] = -1
+
+    def make_start(self):
+        self.grid.set_state(self.index, START)
+
+    def make_closed(self):
+        self.grid.set_state(self.index, CLOSED)
+
+    def make_open(self):
+        self.grid.set_state(self.index, OPEN)
+
+    def make_obstacle(self):
+        self.grid.set_state(self.index, OBSTACLE)
+
+    def make_end(self):
+        self.grid.set_state(self.index, END)
+
+    def make_path(self):
+        self.grid.set_state(self.index, PATH)
+
+    def draw(self, win):
+        # o desenho depende do pygame: o visualizador só é importado quando usado
+        from pathfinder import draw_node
+        draw_node(win, self)
+
+    def update_neighbors(self, grid):
+        """Mantido por compatibilidade: os vizinhos (4 direções, sem obstáculos)
+        já são atualizados pelo grid a cada mudança de obstáculo."""
+
+
+def make_grid(rows, width, cols=None):
+    cols = cols or rows
+    gap = max(1, width // max(rows, cols))
+    return Grid(rows, cols, gap)
+
+
+def generate_maze(grid, rows, seed=None):
+    """Gera um labirinto perfeito (backtracker, busca em profundidade) no grid.
+
+    O labirinto ocupa o quadrado `rows` x `rows` a partir do canto; o resto do
+    grid fica como está. É gerado em bloco por `generators.backtracker` e
+    gravado de uma vez com `load_cells`; a mesma `seed` gera o mesmo labirinto
+    (None = aleatório). `rows` ímpar dá a borda completa.
+    """
+    from generators import backtracker
+
+    maze = np.frombuffer(backtracker(rows, rows, seed), dtype=np.uint8).reshape(rows, rows)
+    cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(grid.rows, grid.cols).copy()
+    cells[:rows, :rows] = maze[:grid.rows, :grid.cols]
+    grid.load_cells(cells.tobytes())
+
+
+def apply_brush(grid, rows, center_row, center_col, brush, make_obstacle=True):
+    """Aplica o pincel (quadrado de tamanho `brush`) centrado em (center_row, center_col).
+
+    Se `make_obstacle` for True, desenha obstáculos; caso contrário, reseta as células.
+    Não sobrescreve os nós start/end. Retorna os índices das células que
+    passaram a ser (ou deixaram de ser) obstáculo. O pincel é recortado nas
+    bordas do grid (`rows` fica por compatibilidade).
+    """
+    changed = []
+    radius = brush // 2
+    for dr in range(-radius, radius + 1):
+        for dc in range(-radius, radius + 1):
+            r = center_row + dr
+            c = center_col + dc
+            if 0 <= r < grid.rows and 0 <= c < grid.cols:
+                node = grid[r][c]
+                if node.is_start() or node.is_end():
+                    continue
+                if node.is_obstacle() != make_obstacle:
+                    changed.append(node.index)
+                if make_obstacle:
+                    node.make_obstacle()
+                else:
+                    node.reset()
+    return changed
+
+
+def clear_algorithm_marks(grid):
+    """Limpa as marcações temporárias de algoritmo (open/closed/path, das duas fronteiras).
+
+    Mantém obstáculos, start e end. Feito em bloco sobre o array de estados,
+    sem criar um `Node` por célula (veja `Grid.clear_marks`).
+    """
+    grid.clear_marks()
+
+
+# Caracteres do formato texto: '.' livre, '#'/'@' obstáculo, 'I'/'S' início, 'F'/'E' fim
+ASCII_CODES = {'.': EMPTY, '#': OBSTACLE, '@': OBSTACLE, 'I': START, 'S': START, 'F': END, 'E': END}
+ASCII_CHARS = {EMPTY: '.', OBSTACLE: '#', START: 'I', END: 'F'}
+
+
+def load_ascii_grid(path, width=800):
+    """Carrega um grid em formato texto (uma linha por linha do grid).
+
+    Retorna `(grid, start, end)`; `start`/`end` são None se o arquivo não
+    marcar as células 'I' e 'F'. Linhas menores que a maior são completadas
+    com células livres.
+    """
+    with open(path, encoding='utf-8') as f:
+        lines = [line.rstrip('\r\n') for line in f if line.strip()]
+    if not lines:
+        raise ValueError(f"grid vazio: {path}")
+    rows = len(lines)
+    cols = max(len(line) for line in lines)
+    grid = Grid(rows, cols, max(1, width // max(rows, cols)))
+    cells = bytearray(rows * cols)
+    start = end = None
+    for r, line in enumerate(lines):
+        for c, ch in enumerate(line):
+            code = ASCII_CODES.get(ch)
+            if code is None:
+                raise ValueError(f"caractere inválido {ch!r} em {path}:{r + 1}")
+            if code == EMPTY:
+                continue
+            index = r * cols + c
+            cells[index] = code
+            if code == START:
+                start = Node(grid, index)
+            elif code == END:
+                end = Node(grid, index)
+    grid.load_cells(cells)
+    return grid, start, end
+
+
+def save_ascii_grid(grid, path):
+    """Salva obstáculos, início e fim no formato texto de `load_ascii_grid`."""
+    cells = grid.cells
+    cols = grid.cols
+    with open(path, 'w', encoding='utf-8') as f:
+        for r in range(grid.rows):
+            base = r * cols
+            f.write(''.join(ASCII_CHARS.get(cells[i], '.') for i in range(base, base + cols)))
+            f.write('\n')
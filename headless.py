@@ -0,0 +1,170 @@
+"""
+headless.py
+
+Executa uma busca sem abrir janela (CI, servidores, scripts).
+
+Carrega um grid de arquivo (texto, `.grid` binário ou `.map` do MovingAI;
+veja `mapfile.load_map`) ou gera um (vazio, obstáculos aleatórios, labirinto
+ou um gerador de `generators`), roda o algoritmo escolhido com um `draw` que
+não faz nada e imprime as métricas da execução (`instrument.RunMetrics`):
+tamanho do caminho, expansões, pico da fronteira, tempo de CPU e de parede.
+`--metrics` acrescenta a execução a um arquivo JSON Lines.
+
+Exemplos:
+
+    python headless.py --algo dumb --rows 101 --maze --seed 7
+    python headless.py --algo astar --rows 301 --generator caves --seed 3
+    python headless.py --algo astar --load mapa.txt --json
+    python headless.py --algo dijkstra --rows 201 --maze --metrics execucoes.jsonl
+    python headless.py --algo astar --rows 401 --generator rooms --seed 4 --trace maps/salas.trace
+    python headless.py --algo astar --load maps/arena.map --start 3,5 --end 40,30
+"""
+
+import argparse
+import importlib
+import json
+import random
+import sys
+import time
+
+from generators import GENERATORS, generate
+from grid_model import Grid, Node, OBSTACLE, generate_maze
+from instrument import append_jsonl, measure
+from mapfile import load_map
+from search_core import path_from_parents
+from searchtrace import SearchTrace
+
+# nome na linha de comando -> (módulo, função) com a assinatura (draw, grid, start, end)
+ALGORITHMS = {
+    'dumb': ('search_core', 'dumb_search'),
+    'astar': ('astar_impl', 'run_astar'),
+    'dijkstra': ('dijkstra_impl', 'run_dijkstra'),
+}
+
+
+def load_algorithm(name):
+    module_name, func_name = ALGORITHMS[name]
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def no_draw():
+    """`draw` vazio: a busca roda sem visualização."""
+
+
+def build_grid(rows, cols, maze=False, density=0.0, seed=None, generator=None):
+    """Cria um grid sem janela: vazio, com obstáculos aleatórios, labirinto
+    ou um mapa de `generators` (`generator` = nome em `generators.GENERATORS`).
+    """
+    grid = Grid(rows, cols, 1)
+    grid.dirty = None
+    rng = random.Random(seed)
+    if generator:
+        generate(grid, generator, seed)
+    elif maze:
+        generate_maze(grid, min(rows, cols), seed)
+    elif density > 0:
+        cells = bytearray(rows * cols)
+        for i in range(rows * cols):
+            if rng.random() < density:
+                cells[i] = OBSTACLE
+        grid.load_cells(cells)
+    return grid
+
+
+def _parse_cell(text):
+    row, col = text.split(',')
+    return int(row), int(col)
+
+
+def _free_cell(grid, indices):
+    for i in indices:
+        if grid.cells[i] != OBSTACLE:
+            return Node(grid, i)
+    return None
+
+
+def run(grid, start, end, algo='dumb', trace=None):
+    """Roda `algo` no grid e retorna um dicionário com as métricas da execução
+    (campos de `instrument.FIELDS` mais o tempo de parede).
+
+    Com `trace` (caminho de arquivo), grava também a busca como trace
+    (`searchtrace`), para ser reaberta no visualizador.
+    """
+    func = load_algorithm(algo)
+    start.make_start()
+    end.make_end()
+    base = bytes(grid.cells) if trace else None
+    # `measure` acrescenta a este log as mudanças de estado da busca
+    log = grid.log = [] if trace else None
+    t0 = time.perf_counter()
+    found, metrics = measure(func, grid, start, end, no_draw, algo)
+    elapsed = time.perf_counter() - t0
+    grid.log = None
+    result = metrics.as_dict()
+    result['wall_time_ms'] = round(elapsed * 1000.0, 3)
+    if trace:
+        path = path_from_parents(grid, start, end) if found else None
+        SearchTrace.record(base, grid.rows, grid.cols, start, end, log, path,
+                           {'algo': algo, 'metrics': result}).save(trace)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa uma busca do MatemáticA* Dijkstra sem janela.")
+    parser.add_argument('--algo', choices=sorted(ALGORITHMS), default='dumb')
+    parser.add_argument('--load', help="arquivo de grid: .grid, .map do MovingAI ou texto ('.', '#', 'I', 'F')")
+    parser.add_argument('--rows', type=int, default=40)
+    parser.add_argument('--cols', type=int, help="colunas (padrão: igual a --rows)")
+    parser.add_argument('--maze', action='store_true', help="gera um labirinto (backtracker)")
+    parser.add_argument('--density', type=float, default=0.0, help="fração de obstáculos aleatórios")
+    parser.add_argument('--generator', choices=sorted(GENERATORS), help="gera o mapa com generators.py")
+    parser.add_argument('--seed', type=int, help="semente do gerador")
+    parser.add_argument('--start', type=_parse_cell, help="célula inicial 'linha,coluna'")
+    parser.add_argument('--end', type=_parse_cell, help="célula final 'linha,coluna'")
+    parser.add_argument('--json', action='store_true', help="imprime o resultado em JSON")
+    parser.add_argument('--metrics', metavar='ARQUIVO.jsonl',
+                        help="acrescenta as métricas da execução ao arquivo (JSON Lines)")
+    parser.add_argument('--trace', metavar='ARQUIVO.trace',
+                        help="grava a busca (eventos, mapa e contadores) para reabrir no visualizador")
+    args = parser.parse_args(argv)
+
+    if args.load:
+        grid, start, end = load_map(args.load)
+        grid.dirty = None
+    else:
+        grid = build_grid(args.rows, args.cols or args.rows, args.maze, args.density, args.seed,
+                          args.generator)
+        start = end = None
+    if args.start:
+        start = grid.node(*args.start)
+    if args.end:
+        end = grid.node(*args.end)
+    size = grid.rows * grid.cols
+    start = start or _free_cell(grid, range(size))
+    end = end or _free_cell(grid, range(size - 1, -1, -1))
+    if start is None or end is None or start == end:
+        parser.error("não foi possível escolher início e fim distintos")
+
+    try:
+        result = run(grid, start, end, args.algo, args.trace)
+    except NotImplementedError as exc:
+        print(f"{args.algo}: {exc}", file=sys.stderr)
+        return 2
+
+    if args.metrics:
+        append_jsonl(args.metrics, [result])
+    if args.json:
+        print(json.dumps(result))
+    else:
+        length = result['path_length'] if result['found'] else '-'
+        print(f"algoritmo: {result['algo']}")
+        print(f"grid: {result['rows']}x{result['cols']}")
+        print(f"caminho encontrado: {'sim' if result['found'] else 'não'}")
+        print(f"tamanho do caminho: {length}")
+        print(f"expansões: {result['expanded']} (pico da fronteira: {result['peak_frontier']})")
+        print(f"tempo: {result['wall_time_ms']:.3f} ms (CPU da busca: {result['search_cpu_ms']:.3f} ms)")
+    return 0 if result['found'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,478 @@
+"""
+hpa_impl.py
+
+Busca hierárquica (HPA*, Botea, Müller & Schaeffer) para mapas grandes.
+
+O grid é dividido em clusters quadrados de `cluster_size` células. Em cada
+borda entre dois clusters vizinhos, os trechos contínuos livres dos dois
+lados viram entradas (uma no meio do trecho, ou duas nas pontas se o trecho
+for largo). Dentro de cada cluster são pré-calculadas as distâncias entre
+suas entradas, em paralelo num pool de processos quando há muitos clusters.
+Isso forma um grafo abstrato bem menor que o grid:
+
+- uma consulta liga início e fim às entradas dos seus clusters, roda A*
+  no grafo abstrato e só então refina cada aresta em células (sob demanda,
+  segmento por segmento);
+- quando obstáculos mudam (`update_cells`, ex.: após `apply_brush`), só os
+  clusters tocados são recalculados — e o vizinho de uma borda apenas se as
+  entradas dessa borda mudarem.
+
+Mesmo grid 4-direções de custo 1 de `search_core.neighbor_steps`. O caminho
+é válido e encontrado sempre que existir, mas pode ser um pouco mais longo
+que o ótimo (tipicamente poucos por cento), como em todo HPA*.
+"""
+
+import heapq
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from grid_model import CLOSED, DOWN, END, EVENT_SHIFT, LEFT, OBSTACLE, OPEN, PATH, RIGHT, UP
+from search_core import new_stats, run_events
+
+# trechos de borda a partir desta largura ganham duas entradas (nas pontas)
+WIDE_ENTRANCE = 6
+# abaixo deste número de clusters o cálculo é feito no próprio processo
+PARALLEL_MIN_CLUSTERS = 64
+
+
+def _block_neighbors(block, h, w):
+    """Lista de vizinhos livres (4 direções) de cada célula de um bloco `h x w`."""
+    free = [code != OBSTACLE for code in block]
+    nbrs = []
+    for u in range(h * w):
+        r, c = divmod(u, w)
+        out = []
+        if free[u]:
+            if r + 1 < h and free[u + w]:
+                out.append(u + w)
+            if r > 0 and free[u - w]:
+                out.append(u - w)
+            if c + 1 < w and free[u + 1]:
+                out.append(u + 1)
+            if c > 0 and free[u - 1]:
+                out.append(u - 1)
+        nbrs.append(out)
+    return nbrs
+
+
+def _bfs(nbrs, source):
+    """Distâncias (BFS) a partir de `source` no bloco; -1 = inalcançável."""
+    dist = [-1] * len(nbrs)
+    dist[source] = 0
+    queue = [source]
+    for u in queue:
+        d = dist[u] + 1
+        for v in nbrs[u]:
+            if dist[v] < 0:
+                dist[v] = d
+                queue.append(v)
+    return dist
+
+
+def _cluster_edges(job):
+    """Distâncias entre as entradas de um cluster (roda nos processos do pool).
+
+    `job` é `(cid, block, h, w, sources)` com o bloco de estados do cluster e
+    as entradas em coordenadas locais; retorna `(cid, {(a, b): custo})`.
+    """
+    cid, block, h, w, sources = job
+    edges = {}
+    if len(sources) < 2:
+        return cid, edges
+    nbrs = _block_neighbors(block, h, w)
+    for k, a in enumerate(sources[:-1]):
+        dist = _bfs(nbrs, a)
+        for b in sources[k + 1:]:
+            if dist[b] > 0:
+                edges[(a, b)] = dist[b]
+    return cid, edges
+
+
+class HPAStar:
+    """Grafo abstrato HPA* sobre um `Grid`.
+
+    Uso:
+
+        hpa = HPAStar(grid, cluster_size=16)   # pré-cálculo (paralelo)
+        path = hpa.find_path(start, end)       # lista de índices ou None
+        hpa.update_cells(changed)              # após mudar obstáculos
+
+    `workers` é o número de processos do pré-cálculo (None = núcleos da
+    máquina, 1 = sem pool). `stats` acumula clusters recalculados e consultas.
+    """
+    def __init__(self, grid, cluster_size=16, workers=None):
+        self.grid = grid
+        self.size = max(2, cluster_size)
+        self.workers = workers
+        self.cluster_rows = -(-grid.rows // self.size)
+        self.cluster_cols = -(-grid.cols // self.size)
+        # borda ('h' | 'v', cr, cc) -> lista de pares (célula deste lado, do outro)
+        self.transitions = {}
+        # cluster -> {(a, b): custo} entre entradas (índices globais, a < b)
+        self.intra = {}
+        # grafo abstrato: entrada -> {vizinha: custo}
+        self.graph = {}
+        self.stats = {'clusters': self.cluster_rows * self.cluster_cols, 'recomputed': 0,
+                      'queries': 0, 'build_ms': 0.0}
+        self.build()
+
+    # --- geometria dos clusters ---
+    def cluster_of(self, index):
+        r, c = divmod(index, self.grid.cols)
+        return (r // self.size) * self.cluster_cols + c // self.size
+
+    def _bounds(self, cid):
+        cr, cc = divmod(cid, self.cluster_cols)
+        r0, c0 = cr * self.size, cc * self.size
+        return r0, c0, min(r0 + self.size, self.grid.rows), min(c0 + self.size, self.grid.cols)
+
+    def _borders(self, cid):
+        """Bordas do cluster com seus vizinhos de baixo, cima, direita e esquerda."""
+        cr, cc = divmod(cid, self.cluster_cols)
+        out = []
+        if cr + 1 < self.cluster_rows:
+            out.append(('h', cr, cc))
+        if cr > 0:
+            out.append(('h', cr - 1, cc))
+        if cc + 1 < self.cluster_cols:
+            out.append(('v', cr, cc))
+        if cc > 0:
+            out.append(('v', cr, cc - 1))
+        return out
+
+    def _border_clusters(self, border):
+        kind, cr, cc = border
+        cid = cr * self.cluster_cols + cc
+        return cid, cid + (self.cluster_cols if kind == 'h' else 1)
+
+    def _scan_border(self, border):
+        """Pares de células (lado de cá, lado de lá) que viram entradas na borda."""
+        kind, cr, cc = border
+        cols = self.grid.cols
+        cells = self.grid.cells
+        if kind == 'h':
+            r = (cr + 1) * self.size - 1
+            lo, hi = cc * self.size, min((cc + 1) * self.size, cols)
+            first, step, across = r * cols, 1, cols
+        else:
+            c = (cc + 1) * self.size - 1
+            lo, hi = cr * self.size, min((cr + 1) * self.size, self.grid.rows)
+            first, step, across = c, cols, 1
+        pairs = []
+        run_start = None
+        for k in range(lo, hi + 1):
+            i = first + k * step
+            open_pair = k < hi and cells[i] != OBSTACLE and cells[i + across] != OBSTACLE
+            if open_pair and run_start is None:
+                run_start = k
+            elif not open_pair and run_start is not None:
+                end = k - 1
+                if end - run_start + 1 >= WIDE_ENTRANCE:
+                    spots = (run_start, end)
+                else:
+                    spots = ((run_start + end) // 2,)
+                for s in spots:
+                    a = first + s * step
+                    pairs.append((a, a + across))
+                run_start = None
+        return pairs
+
+    def entrances(self, cid):
+        """Entradas do cluster (índices globais, ordenados)."""
+        out = set()
+        for border in self._borders(cid):
+            near, _ = self._border_clusters(border)
+            side = 0 if near == cid else 1
+            for pair in self.transitions.get(border, ()):
+                out.add(pair[side])
+        return sorted(out)
+
+    # --- grafo abstrato ---
+    def _link(self, a, b, cost):
+        self.graph.setdefault(a, {})[b] = cost
+        self.graph.setdefault(b, {})[a] = cost
+
+    def _unlink(self, a, b):
+        for u, v in ((a, b), (b, a)):
+            edges = self.graph.get(u)
+            if edges is not None:
+                edges.pop(v, None)
+                if not edges:
+                    del self.graph[u]
+
+    def _set_border(self, border, pairs):
+        for a, b in self.transitions.get(border, ()):
+            self._unlink(a, b)
+        self.transitions[border] = pairs
+        for a, b in pairs:
+            self._link(a, b, 1)
+
+    def _job(self, cid):
+        r0, c0, r1, c1 = self._bounds(cid)
+        cols = self.grid.cols
+        cells = self.grid.cells
+        w = c1 - c0
+        block = b''.join(cells[r * cols + c0:r * cols + c1] for r in range(r0, r1))
+        local = [(i // cols - r0) * w + i % cols - c0 for i in self.entrances(cid)]
+        return cid, block, r1 - r0, w, local
+
+    def _recompute(self, cids):
+        """Recalcula as arestas internas dos clusters (em paralelo se forem muitos)."""
+        jobs = [self._job(cid) for cid in cids]
+        workers = self.workers or os.cpu_count() or 1
+        # processos daemon (ex.: workers de um Pool) não podem criar outro pool
+        if multiprocessing.current_process().daemon:
+            workers = 1
+        if workers > 1 and len(jobs) >= PARALLEL_MIN_CLUSTERS:
+            chunk = max(1, len(jobs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_cluster_edges, jobs, chunksize=chunk))
+        else:
+            results = [_cluster_edges(job) for job in jobs]
+        cols = self.grid.cols
+        for cid, local_edges in results:
+            for a, b in self.intra.get(cid, ()):
+                self._unlink(a, b)
+            r0, c0, _, c1 = self._bounds(cid)
+            w = c1 - c0
+            edges = {}
+            for (la, lb), cost in local_edges.items():
+                a = (r0 + la // w) * cols + c0 + la % w
+                b = (r0 + lb // w) * cols + c0 + lb % w
+                edges[(a, b)] = cost
+                self._link(a, b, cost)
+            self.intra[cid] = edges
+        self.stats['recomputed'] += len(results)
+
+    def build(self):
+        """Pré-calcula entradas e distâncias de todos os clusters."""
+        t0 = time.perf_counter()
+        self.transitions.clear()
+        self.intra.clear()
+        self.graph.clear()
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                if cr + 1 < self.cluster_rows:
+                    self._set_border(('h', cr, cc), self._scan_border(('h', cr, cc)))
+                if cc + 1 < self.cluster_cols:
+                    self._set_border(('v', cr, cc), self._scan_border(('v', cr, cc)))
+        self._recompute(range(self.cluster_rows * self.cluster_cols))
+        self.stats['build_ms'] = round((time.perf_counter() - t0) * 1000.0, 3)
+
+    def update_cells(self, changed):
+        """Informa células cujo estado de obstáculo mudou.
+
+        Recalcula só os clusters que contêm essas células; uma borda tocada é
+        reexaminada e, se suas entradas mudarem, o cluster do outro lado
+        também é recalculado. Retorna o conjunto de clusters recalculados.
+        """
+        size = self.size
+        cols = self.grid.cols
+        dirty = set()
+        borders = set()
+        for i in changed:
+            r, c = divmod(i, cols)
+            cr, cc = r // size, c // size
+            dirty.add(cr * self.cluster_cols + cc)
+            # só células na primeira/última linha ou coluna do cluster tocam bordas
+            if r % size == size - 1 and cr + 1 < self.cluster_rows:
+                borders.add(('h', cr, cc))
+            if r % size == 0 and cr > 0:
+                borders.add(('h', cr - 1, cc))
+            if c % size == size - 1 and cc + 1 < self.cluster_cols:
+                borders.add(('v', cr, cc))
+            if c % size == 0 and cc > 0:
+                borders.add(('v', cr, cc - 1))
+        for border in borders:
+            pairs = self._scan_border(border)
+            if pairs != self.transitions.get(border):
+                self._set_border(border, pairs)
+                dirty.update(self._border_clusters(border))
+        if dirty:
+            self._recompute(sorted(dirty))
+        return dirty
+
+    # --- consulta ---
+    def _local_dists(self, index):
+        """Distâncias de `index` até as células do seu cluster (BFS local)."""
+        cid = self.cluster_of(index)
+        _, block, h, w, _ = self._job(cid)
+        r0, c0, _, _ = self._bounds(cid)
+        cols = self.grid.cols
+        dist = _bfs(_block_neighbors(block, h, w), (index // cols - r0) * w + index % cols - c0)
+
+        def to(target):
+            d = dist[(target // cols - r0) * w + target % cols - c0]
+            return d if d >= 0 else None
+        return cid, to
+
+    def iter_search(self, start, end, stats=None):
+        """Gerador de eventos: entradas abertas/fechadas no grafo abstrato e o caminho.
+
+        Retorna o caminho em células (lista de índices) ou None.
+        """
+        if stats is None:
+            stats = new_stats()
+        self.stats['queries'] += 1
+        cells = self.grid.cells
+        cols = self.grid.cols
+        source, target = start.index, end.index
+        if cells[source] == OBSTACLE or cells[target] == OBSTACLE:
+            return None
+
+        # liga início e fim às entradas dos seus clusters (arestas temporárias)
+        s_cid, s_to = self._local_dists(source)
+        t_cid, t_to = self._local_dists(target)
+        extra = {source: {}}
+        for e in self.entrances(s_cid):
+            d = s_to(e)
+            if d is not None and e != source:
+                extra[source][e] = d
+        into_target = {}
+        for e in self.entrances(t_cid):
+            d = t_to(e)
+            if d is not None and e != target:
+                into_target[e] = d
+        if s_cid == t_cid:
+            d = s_to(target)
+            if d is not None:
+                extra[source][target] = d
+
+        tr, tc = divmod(target, cols)
+
+        def h(i):
+            r, c = divmod(i, cols)
+            return abs(r - tr) + abs(c - tc)
+
+        graph = self.graph
+        g = {source: 0}
+        came = {source: -1}
+        closed = set()
+        seq = 0
+        heap = [(h(source), 0, 0, source)]
+        pushes = 1
+        pops = stale = expanded = 0
+        peak = 1
+        found = False
+        while heap:
+            current = heapq.heappop(heap)[3]
+            pops += 1
+            if current in closed:
+                stale += 1
+                continue
+            closed.add(current)
+            if current == target:
+                found = True
+                break
+            expanded += 1
+            if current != source:
+                yield current << EVENT_SHIFT | CLOSED
+            g_current = g[current]
+            neighbors = list(graph.get(current, {}).items())
+            if current in extra:
+                neighbors.extend(extra[current].items())
+            if current in into_target:
+                neighbors.append((target, into_target[current]))
+            for nxt, cost in neighbors:
+                if nxt in closed:
+                    continue
+                tentative = g_current + cost
+                if tentative < g.get(nxt, math.inf):
+                    g[nxt] = tentative
+                    came[nxt] = current
+                    seq += 1
+                    heapq.heappush(heap, (tentative + h(nxt), -tentative, seq, nxt))
+                    pushes += 1
+                    if cells[nxt] != END:
+                        yield nxt << EVENT_SHIFT | OPEN
+            if len(heap) > peak:
+                peak = len(heap)
+
+        stats['expanded'] += expanded
+        stats['pushes'] += pushes
+        stats['pops'] += pops
+        stats['stale'] += stale
+        stats['peak_heap'] = max(stats['peak_heap'], peak)
+        if not found:
+            return None
+        stats['cost'] = g[target]
+
+        abstract = [target]
+        while came[abstract[-1]] != -1:
+            abstract.append(came[abstract[-1]])
+        abstract.reverse()
+        path = [source]
+        for segment in self.refine(abstract):
+            for i in segment:
+                if i != target:
+                    yield i << EVENT_SHIFT | PATH
+            path.extend(segment)
+        return path
+
+    def refine(self, abstract):
+        """Expande o caminho abstrato em células, um segmento por vez (preguiçoso).
+
+        Cada segmento é a lista de células após o nó abstrato anterior até o
+        próximo (inclusive).
+        """
+        for a, b in zip(abstract, abstract[1:]):
+            cid = self.cluster_of(a)
+            if cid != self.cluster_of(b):
+                # aresta entre clusters: as duas células são vizinhas
+                yield [b]
+            else:
+                yield self._cluster_path(a, b, cid)
+
+    def _cluster_path(self, a, b, cid):
+        """Menor caminho de `a` a `b` sem sair do cluster (BFS sobre `grid.adj`)."""
+        r0, c0, r1, c1 = self._bounds(cid)
+        cols = self.grid.cols
+        adj = self.grid.adj
+        came = {a: -1}
+        queue = [a]
+        for u in queue:
+            if u == b:
+                break
+            m = adj[u]
+            r, c = divmod(u, cols)
+            for bit, nxt, ok in ((DOWN, u + cols, r + 1 < r1), (UP, u - cols, r > r0),
+                                 (RIGHT, u + 1, c + 1 < c1), (LEFT, u - 1, c > c0)):
+                if ok and m & bit and nxt not in came:
+                    came[nxt] = u
+                    queue.append(nxt)
+        segment = []
+        node = b
+        while node != a:
+            segment.append(node)
+            node = came[node]
+        segment.reverse()
+        return segment
+
+    def find_path(self, start, end, stats=None):
+        """Consulta sem eventos; retorna o caminho (lista de índices) ou None."""
+        events = self.iter_search(start, end, stats)
+        while True:
+            try:
+                next(events)
+            except StopIteration as stop:
+                return stop.value
+
+
+def iter_hpa(grid, start, end, cluster_size=16, stats=None, planner=None):
+    """Gerador de eventos do HPA*; reaproveita `planner` se for dado."""
+    if planner is None:
+        planner = HPAStar(grid, cluster_size)
+    return (yield from planner.iter_search(start, end, stats))
+
+
+def hpa(grid, start, end, cluster_size=16, draw=None, stats=None):
+    """Constrói o grafo, roda a consulta aplicando os eventos e retorna o caminho."""
+    return run_events(iter_hpa(grid, start, end, cluster_size, stats), grid, draw)
+
+
+def run_hpa(draw, grid, start, end):
+    """HPA* com a mesma assinatura de `run_astar`."""
+    return hpa(grid, start, end, draw=draw) is not None
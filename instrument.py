@@ -0,0 +1,230 @@
+"""
+instrument.py
+
+Métricas por execução de busca, para o visualizador e para scripts.
+
+`RunMetrics` junta, numa execução: nós expandidos (fechados) e abertos,
+pushes/pops do heap, pico da fronteira, tamanho e custo do caminho, tempo de
+CPU da busca, tempo de CPU do desenho, quadros desenhados e chamadas a
+`draw()`.
+
+Os contadores de nós vêm das transições de estado do grid (`grid.counts`,
+incrementado por `Grid.set_state`, por onde passam `make_open`,
+`make_closed`, `make_path`, ...). Por isso valem igualmente para os motores
+de referência (geradores de eventos) e para as funções `run_astar` /
+`run_dijkstra` dos alunos. Quando o motor preenche `stats`
+(`search_core.new_stats`), pushes, pops, pico do heap e custo vêm dele; nas
+funções dos alunos, pushes/pops são estimados pelas aberturas/fechamentos e
+o pico da fronteira é reconstruído a partir das transições registradas.
+
+`measure(func, grid, start, end, draw)` roda uma função `(draw, grid, start,
+end)` sem janela separando o tempo gasto dentro de `draw()` do tempo da busca.
+`append_jsonl` grava métricas em JSON Lines.
+"""
+
+import json
+import time
+
+from grid_model import CLOSED, CLOSED_BACK, EVENT_MASK, EVENT_SHIFT, OPEN, OPEN_BACK, PATH
+from search_core import path_cost, path_from_parents
+
+# campos exportados (ordem das chaves no JSON)
+FIELDS = ('algo', 'rows', 'cols', 'found', 'expanded', 'opened', 'pushes', 'pops', 'peak_frontier',
+          'path_length', 'cost', 'search_cpu_ms', 'render_cpu_ms', 'frames', 'draw_calls', 'finished_at')
+
+_FRONTIER = (OPEN, OPEN_BACK)
+
+
+class RunMetrics:
+    """Contadores e tempos de uma execução de busca.
+
+    Crie antes da busca começar (os contadores de estado do grid são
+    tomados como ponto de partida) e chame `finish` com o resultado.
+    `stats` é o dicionário de contadores do motor, se houver; `start`/`end`
+    permitem ler o caminho de `grid.parent` quando a busca devolve só um
+    booleano.
+    """
+    def __init__(self, algo, grid, stats=None, start=None, end=None):
+        self.algo = algo
+        self.grid = grid
+        self.stats = stats
+        self.start = start
+        self.end = end
+        self._counts = list(grid.counts)
+        # contadores congelados em `finish` (buscas seguintes continuam a contar no grid)
+        self._final = None
+        self.search_cpu = 0.0
+        self.render_cpu = 0.0
+        self.frames = 0
+        self.draw_calls = 0
+        # True quando a busca já rodou inteira (gravada); a reprodução não conta como busca
+        self.recorded = False
+        self.peak_frontier = None
+        self.found = None
+        self.path_length = None
+        self.cost = None
+        self.finished_at = None
+
+    def _delta(self, *codes):
+        counts = self._final or self.grid.counts
+        return sum(counts[c] - self._counts[c] for c in codes)
+
+    @property
+    def expanded(self):
+        return self._delta(CLOSED, CLOSED_BACK)
+
+    @property
+    def opened(self):
+        return self._delta(*_FRONTIER)
+
+    # os motores só preenchem `stats` ao terminar; até lá, estimativas pelas transições
+    @property
+    def pushes(self):
+        stats = self.stats
+        return stats['pushes'] if self.done and stats and 'pushes' in stats else self.opened
+
+    @property
+    def pops(self):
+        stats = self.stats
+        return stats['pops'] if self.done and stats and 'pops' in stats else self.expanded
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    def add_search(self, seconds):
+        self.search_cpu += seconds
+
+    def add_frame(self, seconds):
+        """Registra um quadro desenhado durante a execução e seu tempo de CPU."""
+        self.render_cpu += seconds
+        self.frames += 1
+
+    def wrap_draw(self, draw):
+        """`draw` que conta as chamadas e soma seu tempo ao desenho (não à busca)."""
+        clock = time.process_time
+
+        def counted():
+            t0 = clock()
+            try:
+                return draw()
+            finally:
+                self.draw_calls += 1
+                self.render_cpu += clock() - t0
+        return counted
+
+    def observe_log(self, events, cells=None):
+        """Pico da fronteira reconstruído das transições `events` a partir dos estados `cells`.
+
+        Sem `cells`, nenhuma célula é considerada aberta antes das transições.
+        """
+        state = {}
+        frontier = peak = 0
+        for event in events:
+            index, code = event >> EVENT_SHIFT, event & EVENT_MASK
+            old = state.get(index)
+            if old is None:
+                old = cells[index] if cells is not None else None
+            frontier += (code in _FRONTIER) - (old in _FRONTIER)
+            if frontier > peak:
+                peak = frontier
+            state[index] = code
+        self.peak_frontier = peak
+
+    def finish(self, result):
+        """Fecha a execução com o valor devolvido pela busca.
+
+        `result` é a lista de índices do caminho (motores) ou um booleano
+        (funções `(draw, grid, start, end)`); nesse caso o caminho é lido de
+        `grid.parent` a partir de `start`/`end`, se informados.
+        """
+        stats = self.stats
+        self._final = list(self.grid.counts)
+        path = result if isinstance(result, list) else None
+        if path is None and result and self.start is not None and self.end is not None:
+            path = path_from_parents(self.grid, self.start, self.end)
+        self.found = bool(result)
+        if path is not None:
+            self.path_length = len(path) - 1
+            self.cost = path_cost(self.grid, path)
+        elif self.found:
+            # sem cadeia de pais: conta as células marcadas como caminho
+            self.path_length = self._delta(PATH) + 1
+        if stats:
+            if stats.get('cost') is not None:
+                self.cost = stats['cost']
+            if 'peak_heap' in stats:
+                self.peak_frontier = stats['peak_heap']
+        self.finished_at = time.time()
+
+    def as_dict(self):
+        values = {
+            'algo': self.algo,
+            'rows': self.grid.rows,
+            'cols': self.grid.cols,
+            'found': self.found,
+            'expanded': self.expanded,
+            'opened': self.opened,
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'peak_frontier': self.peak_frontier,
+            'path_length': self.path_length,
+            'cost': round(self.cost, 6) if self.cost is not None else None,
+            'search_cpu_ms': round(self.search_cpu * 1000.0, 3),
+            'render_cpu_ms': round(self.render_cpu * 1000.0, 3),
+            'frames': self.frames,
+            'draw_calls': self.draw_calls,
+            'finished_at': self.finished_at,
+        }
+        return {key: values[key] for key in FIELDS}
+
+    def lines(self):
+        """Linhas de texto para a sobreposição do visualizador."""
+        def show(value):
+            return '-' if value is None else value
+        state = 'rodando' if not self.done else ('caminho' if self.found else 'sem caminho')
+        cost = f"{self.cost:.2f}" if self.cost is not None else '-'
+        return [
+            f"{self.algo} ({state})",
+            f"expandidos: {self.expanded}   abertos: {self.opened}",
+            f"pushes: {self.pushes}   pops: {self.pops}",
+            f"pico da fronteira: {show(self.peak_frontier)}",
+            f"caminho: {show(self.path_length)} passos   custo: {cost}",
+            f"CPU busca: {self.search_cpu * 1000.0:.1f} ms   desenho: {self.render_cpu * 1000.0:.1f} ms",
+            f"quadros: {self.frames}   draw(): {self.draw_calls}",
+        ]
+
+
+def measure(func, grid, start, end, draw=None, algo=None):
+    """Roda `func(draw, grid, start, end)` e retorna `(resultado, RunMetrics)`.
+
+    O tempo dentro de `draw()` (se informado) é contado como desenho e
+    descontado do tempo da busca; as transições de estado são registradas
+    para reconstruir o pico da fronteira.
+    """
+    metrics = RunMetrics(algo or getattr(func, '__name__', 'busca'), grid, start=start, end=end)
+    wrapped = metrics.wrap_draw(draw or (lambda: None))
+    # estados anteriores só de grids densos (um grid em blocos não é copiado inteiro)
+    snapshot = bytes(grid.cells) if isinstance(grid.cells, bytearray) else None
+    log = []
+    previous_log = grid.log
+    grid.log = log
+    t0 = time.process_time()
+    try:
+        result = func(wrapped, grid, start, end)
+    finally:
+        grid.log = previous_log
+        if previous_log is not None:
+            previous_log.extend(log)
+        metrics.add_search(time.process_time() - t0 - metrics.render_cpu)
+    metrics.observe_log(log, snapshot)
+    metrics.finish(result)
+    return result, metrics
+
+
+def append_jsonl(path, runs):
+    """Acrescenta as métricas (`RunMetrics` ou dicionários) ao arquivo JSON Lines."""
+    with open(path, 'a', encoding='utf-8') as f:
+        for run in runs:
+            record = run.as_dict() if isinstance(run, RunMetrics) else run
+            f.write(json.dumps(record) + '\n')
@@ -0,0 +1,276 @@
+"""
+jps_impl.py
+
+Jump Point Search (JPS) para grids de custo uniforme, em 4 e 8 direções.
+
+Em vez de empurrar no heap cada vizinho (como o A*), o JPS "salta" em linha
+reta a partir de cada nó até encontrar um ponto de salto: o objetivo ou uma
+célula com vizinho forçado (onde um obstáculo obriga a mudar de direção).
+Só esses pontos entram no heap, então em salas abertas ele expande ordens de
+grandeza menos nós que o A* e encontra o mesmo custo ótimo.
+
+Regras usadas (mesmo grid de `search_core.neighbor_steps`):
+- 4 direções: movimentos ortogonais de custo 1;
+- 8 direções: diagonais de custo sqrt(2), sem cortar quinas (a diagonal só
+  é permitida se as duas células ortogonais estiverem livres).
+
+`run_jps(draw, grid, start, end)` tem a mesma assinatura de `run_astar`;
+`iter_jps` emite os eventos de busca (pontos de salto abertos/fechados e o
+caminho completo) para o visualizador.
+"""
+
+import heapq
+import math
+
+from grid_model import CLOSED, END, EVENT_SHIFT, OBSTACLE, OPEN, PATH
+from search_core import SQRT2, new_stats, run_events
+
+
+def _sign(x):
+    return (x > 0) - (x < 0)
+
+
+def iter_jps(grid, start, end, diagonal=False, stats=None):
+    """Gerador de eventos do JPS; retorna o caminho (todas as células) ou None."""
+    if stats is None:
+        stats = new_stats()
+    rows, cols = grid.rows, grid.cols
+    cells = grid.cells
+    parent = grid.parent
+    source, target = start.index, end.index
+    tr, tc = divmod(target, cols)
+    scanned = 0
+
+    def free(r, c):
+        return 0 <= r < rows and 0 <= c < cols and cells[r * cols + c] != OBSTACLE
+
+    # --- saltos (iterativos; devolvem o índice do ponto de salto ou -1) ---
+
+    def jump_straight8(r, c, dr, dc):
+        nonlocal scanned
+        while True:
+            if not free(r, c):
+                return -1
+            scanned += 1
+            i = r * cols + c
+            if i == target:
+                return i
+            if dc:
+                if (free(r - 1, c) and not free(r - 1, c - dc)) or \
+                        (free(r + 1, c) and not free(r + 1, c - dc)):
+                    return i
+            else:
+                if (free(r, c - 1) and not free(r - dr, c - 1)) or \
+                        (free(r, c + 1) and not free(r - dr, c + 1)):
+                    return i
+            r += dr
+            c += dc
+
+    def jump8(r, c, dr, dc):
+        nonlocal scanned
+        if not (dr and dc):
+            return jump_straight8(r, c, dr, dc)
+        while True:
+            if not free(r, c):
+                return -1
+            scanned += 1
+            i = r * cols + c
+            if i == target:
+                return i
+            # um salto reto (horizontal ou vertical) a partir daqui encontra algo
+            if jump_straight8(r, c + dc, 0, dc) >= 0 or jump_straight8(r + dr, c, dr, 0) >= 0:
+                return i
+            if free(r, c + dc) and free(r + dr, c):
+                r += dr
+                c += dc
+            else:
+                return -1
+
+    def jump4(r, c, dr, dc):
+        nonlocal scanned
+        while True:
+            if not free(r, c):
+                return -1
+            scanned += 1
+            i = r * cols + c
+            if i == target:
+                return i
+            if dc:
+                if (free(r - 1, c) and not free(r - 1, c - dc)) or \
+                        (free(r + 1, c) and not free(r + 1, c - dc)):
+                    return i
+            else:
+                if (free(r, c - 1) and not free(r - dr, c - 1)) or \
+                        (free(r, c + 1) and not free(r - dr, c + 1)):
+                    return i
+                # andando na vertical, procura pontos de salto horizontais
+                if jump4(r, c + 1, 0, 1) >= 0 or jump4(r, c - 1, 0, -1) >= 0:
+                    return i
+            r += dr
+            c += dc
+
+    # --- vizinhos podados (direções a explorar a partir de um nó) ---
+
+    def directions8(r, c, p):
+        if p < 0:
+            dirs = []
+            for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                if free(r + dr, c + dc):
+                    dirs.append((dr, dc))
+            for dr, dc in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+                if free(r + dr, c) and free(r, c + dc):
+                    dirs.append((dr, dc))
+            return dirs
+        pr, pc = divmod(p, cols)
+        dr, dc = _sign(r - pr), _sign(c - pc)
+        dirs = []
+        if dr and dc:
+            vertical = free(r + dr, c)
+            horizontal = free(r, c + dc)
+            if vertical:
+                dirs.append((dr, 0))
+            if horizontal:
+                dirs.append((0, dc))
+            if vertical and horizontal:
+                dirs.append((dr, dc))
+        elif dc:
+            nxt = free(r, c + dc)
+            up = free(r - 1, c)
+            down = free(r + 1, c)
+            if nxt:
+                dirs.append((0, dc))
+                if up:
+                    dirs.append((-1, dc))
+                if down:
+                    dirs.append((1, dc))
+            if up:
+                dirs.append((-1, 0))
+            if down:
+                dirs.append((1, 0))
+        else:
+            nxt = free(r + dr, c)
+            left = free(r, c - 1)
+            right = free(r, c + 1)
+            if nxt:
+                dirs.append((dr, 0))
+                if left:
+                    dirs.append((dr, -1))
+                if right:
+                    dirs.append((dr, 1))
+            if left:
+                dirs.append((0, -1))
+            if right:
+                dirs.append((0, 1))
+        return dirs
+
+    def directions4(r, c, p):
+        if p < 0:
+            return [(dr, dc) for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1)) if free(r + dr, c + dc)]
+        pr, pc = divmod(p, cols)
+        dr, dc = _sign(r - pr), _sign(c - pc)
+        if dc:
+            candidates = ((-1, 0), (1, 0), (0, dc))
+        else:
+            candidates = ((0, -1), (0, 1), (dr, 0))
+        return [(a, b) for a, b in candidates if free(r + a, c + b)]
+
+    if diagonal:
+        jump, directions = jump8, directions8
+
+        def dist(dr, dc):
+            if dr > dc:
+                dr, dc = dc, dr
+            return dc + (SQRT2 - 1.0) * dr
+    else:
+        jump, directions = jump4, directions4
+
+        def dist(dr, dc):
+            return dr + dc
+
+    def h(i):
+        r, c = divmod(i, cols)
+        return dist(abs(r - tr), abs(c - tc))
+
+    # --- A* sobre os pontos de salto ---
+    g = {source: 0}
+    closed = set()
+    parent[source] = -1
+    seq = 0
+    heap = [(h(source), 0, 0, source)]
+    pushes = 1
+    pops = stale = expanded = 0
+    peak = 1
+    found = False
+
+    while heap:
+        current = heapq.heappop(heap)[3]
+        pops += 1
+        if current in closed:
+            stale += 1
+            continue
+        closed.add(current)
+        if current == target:
+            found = True
+            break
+
+        expanded += 1
+        if current != source:
+            yield current << EVENT_SHIFT | CLOSED
+        r, c = divmod(current, cols)
+        g_current = g[current]
+        for dr, dc in directions(r, c, parent[current]):
+            jp = jump(r + dr, c + dc, dr, dc)
+            if jp < 0 or jp in closed:
+                continue
+            jr, jc = divmod(jp, cols)
+            tentative = g_current + dist(abs(jr - r), abs(jc - c))
+            if tentative < g.get(jp, math.inf):
+                g[jp] = tentative
+                parent[jp] = current
+                seq += 1
+                heapq.heappush(heap, (tentative + h(jp), -tentative, seq, jp))
+                pushes += 1
+                if cells[jp] != END:
+                    yield jp << EVENT_SHIFT | OPEN
+        if len(heap) > peak:
+            peak = len(heap)
+
+    stats['expanded'] += expanded
+    stats['pushes'] += pushes
+    stats['pops'] += pops
+    stats['stale'] += stale
+    stats['peak_heap'] = max(stats['peak_heap'], peak)
+    stats['scanned'] = stats.get('scanned', 0) + scanned
+    if not found:
+        return None
+    stats['cost'] = g[target]
+
+    # expande os segmentos entre pontos de salto (retas ou diagonais) em células
+    jumps = [target]
+    node = parent[target]
+    while node != -1:
+        jumps.append(node)
+        node = parent[node]
+    jumps.reverse()
+    path = [source]
+    for a, b in zip(jumps, jumps[1:]):
+        ar, ac = divmod(a, cols)
+        br, bc = divmod(b, cols)
+        dr, dc = _sign(br - ar), _sign(bc - ac)
+        step = dr * cols + dc
+        for _ in range(max(abs(br - ar), abs(bc - ac))):
+            a += step
+            path.append(a)
+    for i in path[1:-1]:
+        yield i << EVENT_SHIFT | PATH
+    return path
+
+
+def jps(grid, start, end, diagonal=False, draw=None, stats=None):
+    """Roda `iter_jps` aplicando os eventos no grid; retorna o caminho ou None."""
+    return run_events(iter_jps(grid, start, end, diagonal, stats), grid, draw)
+
+
+def run_jps(draw, grid, start, end, diagonal=False):
+    """Jump Point Search com a mesma assinatura de `run_astar`."""
+    return jps(grid, start, end, diagonal, draw=draw) is not None
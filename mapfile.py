@@ -0,0 +1,179 @@
+"""
+mapfile.py
+
+Arquivos de mapa: formato binário compacto do projeto e importação dos
+conjuntos de benchmark MovingAI (`.map` / `.scen`).
+
+Formato `.grid` (little-endian):
+
+- cabeçalho de 32 bytes: `b'MADG'`, versão (uint16), 2 bytes livres,
+  linhas e colunas (uint32), índices de início e fim (int64, -1 = nenhum);
+- um bit por célula (1 = obstáculo), em ordem de leitura, empacotado com
+  `numpy.packbits` (8 células por byte).
+
+A carga é uma única leitura do arquivo seguida de `numpy.unpackbits`, sem
+interpretar célula por célula; um grid de 2000x2000 ocupa ~500 KB.
+
+MovingAI (https://movingai.com/benchmarks/formats.html): o `.map` traz um
+cabeçalho (`type`, `height`, `width`, `map`) e uma linha de texto por linha
+do grid ('.', 'G' e 'S' são livres; '@', 'O', 'T' e 'W' são obstáculos). O
+`.scen` lista consultas `balde mapa largura altura x0 y0 x1 y1 ótimo`, com
+`x` = coluna, `y` = linha e custo ótimo em 8 direções (diagonal = sqrt(2),
+sem cortar quinas — o mesmo `diagonal=True` de `search_core`).
+"""
+
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from grid_model import END, OBSTACLE, START, Grid, Node, load_ascii_grid
+
+MAGIC = b'MADG'
+VERSION = 1
+HEADER = struct.Struct('<4sH2xIIqq')
+
+# caracteres livres do formato MovingAI (todos os outros conhecidos são obstáculos)
+MOVINGAI_FREE = b'.GS'
+MOVINGAI_BLOCKED = b'@OTW'
+
+Scenario = namedtuple('Scenario', 'bucket map_name width height start_col start_row goal_col goal_row optimal')
+
+
+def _node_index(node):
+    if node is None:
+        return -1
+    return node if isinstance(node, int) else node.index
+
+
+def save_grid(grid, path, start=None, end=None):
+    """Salva obstáculos, início e fim no formato binário `.grid`.
+
+    `start`/`end` (nós ou índices) são procurados nas células START/END do
+    grid quando não são informados.
+    """
+    cells = grid.read_block(0, grid.rows, 0, grid.cols).ravel()
+    if start is None:
+        found = np.flatnonzero(cells == START)
+        start = int(found[0]) if found.size else None
+    if end is None:
+        found = np.flatnonzero(cells == END)
+        end = int(found[0]) if found.size else None
+    header = HEADER.pack(MAGIC, VERSION, grid.rows, grid.cols, _node_index(start), _node_index(end))
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(np.packbits(cells == OBSTACLE).tobytes())
+
+
+def load_grid(path, width=800):
+    """Carrega um `.grid`; retorna `(grid, start, end)` (None se não marcados)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f"arquivo de grid truncado: {path}")
+    magic, version, rows, cols, start, end = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"não é um arquivo .grid: {path}")
+    if version != VERSION:
+        raise ValueError(f"versão {version} do formato .grid não suportada: {path}")
+    size = rows * cols
+    if len(data) < HEADER.size + (size + 7) // 8:
+        raise ValueError(f"arquivo de grid truncado: {path}")
+    bits = np.frombuffer(data, dtype=np.uint8, offset=HEADER.size)
+    cells = np.unpackbits(bits, count=size) * np.uint8(OBSTACLE)
+    return _make_grid(rows, cols, cells, start, end, width)
+
+
+def _make_grid(rows, cols, cells, start, end, width):
+    """Monta o grid a partir do array de estados, marcando início e fim."""
+    grid = Grid(rows, cols, max(1, width // max(rows, cols, 1)))
+    for index, code in ((start, START), (end, END)):
+        if 0 <= index < rows * cols:
+            cells[index] = code
+    grid.load_cells(cells.tobytes())
+    start = Node(grid, start) if 0 <= start < rows * cols else None
+    end = Node(grid, end) if 0 <= end < rows * cols else None
+    return grid, start, end
+
+
+def load_movingai_map(path, width=800):
+    """Carrega um `.map` do MovingAI; retorna `(grid, None, None)`."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    lines = data.replace(b'\r', b'').split(b'\n')
+    header = {}
+    for i, line in enumerate(lines):
+        if line.strip() == b'map':
+            body = lines[i + 1:]
+            break
+        key, _, value = line.decode('ascii').partition(' ')
+        header[key] = value.strip()
+    else:
+        raise ValueError(f"mapa MovingAI sem a linha 'map': {path}")
+    try:
+        rows, cols = int(header['height']), int(header['width'])
+    except (KeyError, ValueError):
+        raise ValueError(f"cabeçalho MovingAI inválido (height/width): {path}") from None
+
+    body = [line.rstrip() for line in body[:rows]]
+    if len(body) < rows or any(len(line) != cols for line in body):
+        raise ValueError(f"mapa MovingAI não tem {rows} linhas de {cols} caracteres: {path}")
+    chars = np.frombuffer(b''.join(body), dtype=np.uint8)
+    table = np.full(256, 255, dtype=np.uint8)
+    table[np.frombuffer(MOVINGAI_FREE, dtype=np.uint8)] = 0
+    table[np.frombuffer(MOVINGAI_BLOCKED, dtype=np.uint8)] = OBSTACLE
+    cells = table[chars]
+    bad = np.flatnonzero(cells == 255)
+    if bad.size:
+        r, c = divmod(int(bad[0]), cols)
+        raise ValueError(f"caractere inválido {chr(chars[bad[0]])!r} em {path} (linha {r}, coluna {c})")
+    return _make_grid(rows, cols, cells, -1, -1, width)
+
+
+def read_scen(path):
+    """Lê um `.scen` do MovingAI e retorna a lista de `Scenario`."""
+    scenarios = []
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields or fields[0] == 'version':
+                continue
+            if len(fields) != 9:
+                raise ValueError(f"linha de cenário inválida em {path}:{number}")
+            bucket, name, *coords, optimal = fields
+            scenarios.append(Scenario(int(bucket), name, *map(int, coords), float(optimal)))
+    return scenarios
+
+
+def scenario_queries(scenarios, cols):
+    """Pares de índices `(início, fim)` dos cenários num grid com `cols` colunas."""
+    return [(s.start_row * cols + s.start_col, s.goal_row * cols + s.goal_col) for s in scenarios]
+
+
+def scenario_map_path(scen_path, scenario):
+    """Caminho do `.map` de um cenário (procurado ao lado do `.scen`)."""
+    return os.path.join(os.path.dirname(scen_path), os.path.basename(scenario.map_name))
+
+
+def load_tiled(path, width=800):
+    """Abre um `.tgrid` (`tiled_grid.TiledGrid`, blocos sob demanda); retorna `(grid, None, None)`."""
+    from tiled_grid import TiledGrid
+    grid = TiledGrid(path)
+    grid.gap = max(1, width // max(grid.rows, grid.cols))
+    return grid, None, None
+
+
+# extensões reconhecidas por load_map
+LOADERS = {
+    '.grid': load_grid,
+    '.map': load_movingai_map,
+    '.tgrid': load_tiled,
+    '.txt': load_ascii_grid,
+}
+
+
+def load_map(path, width=800):
+    """Carrega qualquer formato suportado pela extensão (texto se desconhecida)."""
+    loader = LOADERS.get(os.path.splitext(path)[1].lower(), load_ascii_grid)
+    return loader(path, width)
@@ -0,0 +1,135 @@
+"""
+pathcache.py
+
+Cache de caminhos por (layout de obstáculos, início, fim, algoritmo).
+
+Rodar de novo a mesma consulta num grid que não mudou (A e depois A de
+novo, A depois de `R`, um script que repete pares) refaz a busca inteira.
+`PathCache` guarda o caminho de cada consulta com a chave
+
+    (grid.layout_hash, linhas, colunas, início, fim, algoritmo)
+
+onde `layout_hash` é o hash Zobrist dos obstáculos, mantido pelo próprio
+grid a cada mudança (`set_state`, `load_cells`; portanto `make_obstacle`,
+`reset`, `apply_brush`, `generate_maze` e os geradores). Desenhar e apagar o
+mesmo obstáculo volta ao hash anterior, e as entradas antigas voltam a
+valer.
+
+As entradas saem na ordem LRU quando passam de `capacity` consultas ou de
+`max_cells` células de caminho somadas. `stats()` informa acertos, faltas e
+despejos. Consultas sem caminho também são guardadas (caminho vazio).
+
+`iter_cached` transforma um caminho guardado em eventos `PATH` para o
+`playback.SearchPlayer`, então um acerto é reproduzido na hora, sem busca.
+"""
+
+from array import array
+from collections import OrderedDict
+
+from grid_model import EVENT_SHIFT, PATH
+
+DEFAULT_CAPACITY = 256
+# soma dos tamanhos dos caminhos guardados (4 bytes por célula)
+DEFAULT_MAX_CELLS = 1 << 20
+
+_NO_PATH = array('i')
+
+
+def _index(node):
+    return node if isinstance(node, int) else node.index
+
+
+class PathCache:
+    """Cache LRU de caminhos com contadores de acertos e faltas."""
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_cells=DEFAULT_MAX_CELLS):
+        self.capacity = capacity
+        self.max_cells = max_cells
+        self.entries = OrderedDict()
+        self.cells = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(grid, start, end, algo):
+        """Chave da consulta: `start`/`end` são nós ou índices; `algo` é um nome."""
+        return grid.layout_hash, grid.rows, grid.cols, _index(start), _index(end), algo
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Caminho guardado (array de índices; vazio = sem caminho) ou None se faltar."""
+        path = self.entries.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def put(self, key, path):
+        """Guarda o caminho (lista de índices ou None = sem caminho) da consulta `key`."""
+        path = array('i', path) if path else _NO_PATH
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.cells -= len(old)
+        if len(path) > self.max_cells:
+            return
+        self.entries[key] = path
+        self.cells += len(path)
+        while len(self.entries) > self.capacity or self.cells > self.max_cells:
+            _, dropped = self.entries.popitem(last=False)
+            self.cells -= len(dropped)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.cells = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'cells': self.cells,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def iter_cached(grid, path):
+    """Gerador de eventos: marca o caminho guardado (e seus pais) sem buscar.
+
+    Retorna o caminho como lista, ou None se a consulta não tinha caminho.
+    """
+    if not path:
+        return None
+    parent = grid.parent
+    parent[path[0]] = -1
+    for a, b in zip(path, path[1:]):
+        parent[b] = a
+    for i in path[1:-1]:
+        yield i << EVENT_SHIFT | PATH
+    return list(path)
+
+
+def cached_search(cache, grid, start, end, algo, search):
+    """Caminho da consulta pelo cache; numa falta, roda `search()` e guarda o resultado.
+
+    `search` não recebe argumentos e retorna a lista de índices do caminho
+    (ou None). Retorna `(caminho ou None, True se veio do cache)`.
+    """
+    key = cache.key(grid, start, end, algo)
+    path = cache.get(key)
+    if path is not None:
+        return (list(path) if path else None), True
+    path = search()
+    # a busca não pode ter mudado obstáculos, senão a chave não vale mais
+    if grid.layout_hash == key[0]:
+        cache.put(key, path)
+    return path, False
@@ -1,19 +1,82 @@
 import pygame
+import argparse
 import random
-import time
-import sys
 import os
+import time
 
-# Tentamos usar winsound para sons no Windows; se não disponível, usamos pygame.mixer como fallback
-try:
-    import winsound
-    _HAS_WINSOUND = True
-except Exception:
-    _HAS_WINSOUND = False
+from grid_model import EMPTY, START, END, PATH, make_grid, apply_brush, clear_algorithm_marks
+from astar_impl import run_astar
+from audio import SoundBoard, pre_init as audio_pre_init
+from dijkstra_impl import run_dijkstra
+from dstar_lite_impl import DStarLite
+from flowfield import flow_field
+from frameclock import FrameClock
+from generators import GENERATORS, iter_generate
+from hpa_impl import HPAStar
+from instrument import RunMetrics, append_jsonl
+from jps_impl import iter_jps
+from mapfile import LOADERS, load_map, read_scen, save_grid
+from pathcache import PathCache, iter_cached
+from playback import DEFAULT_SPEED, SearchPlayer, next_speed, speed_label
+from renderer import GridRenderer, field_overlay
+from search_core import (
+    iter_bidir_astar, iter_bidir_dijkstra, iter_dumb_search, new_stats, path_from_parents,
+)
+from search_worker import SearchTimeout, iter_search_worker
+from searchtrace import EXTENSION as TRACE_EXTENSION, SearchTrace, TracePlayer
+from viewport import Viewport
+
+# Reexportados para o código dos alunos, que importa o grid de `pathfinder`
+# (`from pathfinder import Node`), onde esses nomes ficavam antes de irem para
+# `grid_model` e `search_core`.
+from grid_model import Grid, GridRow, Node, generate_maze  # noqa: F401
+from search_core import dumb_search  # noqa: F401
 
 WIDTH = 800
-WINDOW = pygame.display.set_mode((WIDTH, WIDTH))
-pygame.display.set_caption("MatemáticA* Dijkstra")
+# tamanho do grid aberto pelo menu (linhas x colunas; `--rows`/`--cols` na linha de comando)
+GRID_ROWS = 40
+GRID_COLS = 40
+# quadros por segundo do grid (a busca avança um lote de eventos por quadro)
+FPS = 60
+# tempo máximo (s) de uma busca dos alunos (A/D) antes de ser interrompida
+SEARCH_TIMEOUT = 30.0
+# quadros por segundo do menu e por quanto tempo o título pulsa após a última interação
+MENU_FPS = 30
+TITLE_PULSE_SECONDS = 8
+# A janela só é criada em get_window(): importar este módulo não abre display.
+WINDOW = None
+
+# mapas salvos pela tecla S e carregados (em ordem alfabética) pela tecla O
+MAPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'maps')
+
+# extensões de mapa abertas pela tecla O: `.tgrid` (`tiled_grid.TiledGrid`) fica de fora,
+# porque campo de fluxo, HPA* e o processo das buscas dos alunos precisam de um `Grid`
+# comum e copiá-lo leria o arquivo inteiro; use `headless.py` ou `tiled_grid.py`
+GUI_MAP_EXTENSIONS = tuple(ext for ext in LOADERS if ext != '.tgrid')
+
+# métricas das execuções exportadas pela tecla E (JSON Lines, acrescentadas ao fim)
+METRICS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'execucoes.jsonl')
+
+# caminhos já calculados por (layout de obstáculos, início, fim, algoritmo):
+# repetir uma consulta num grid que não mudou reproduz o caminho na hora
+PATH_CACHE = PathCache()
+
+# efeitos sonoros, criados junto com a janela (`--mute` começa sem som; tecla N alterna)
+SOUNDS = None
+MUTED = False
+
+
+def get_window():
+    """Cria (na primeira chamada) e retorna a janela principal."""
+    global WINDOW, SOUNDS
+    if WINDOW is None:
+        audio_pre_init()
+        pygame.init()
+        SOUNDS = SoundBoard(muted=MUTED)
+        WINDOW = pygame.display.set_mode((WIDTH, WIDTH))
+        pygame.display.set_caption("MatemáticA* Dijkstra")
+    return WINDOW
+
 
 # --- Cores ---
 RED = (255, 0, 0)
@@ -27,155 +90,22 @@ GREY = (128, 128, 128)
 
 
 
-class Node:
-    """Representa uma célula no grid."""
-    def __init__(self, row, col, width, total_rows):
-        self.row = row
-        self.col = col
-        # x = pixel horizontal (col * width), y = pixel vertical (row * width)
-        self.x = col * width
-        self.y = row * width
-        # state: 'empty','obstacle','start','end','open','closed','path'
-        self.state = 'empty'
-        self.neighbors = []
-        self.width = width
-        self.total_rows = total_rows
-        self.parent = None
-
-    def get_pos(self):
-        return self.row, self.col
-
-    def is_obstacle(self):
-        return self.state == 'obstacle'
-
-    def is_start(self):
-        return self.state == 'start'
-
-    def is_end(self):
-        return self.state == 'end'
-
-    def is_path(self):
-        return self.state == 'path'
-
-    def is_open(self):
-        return self.state == 'open'
-
-    def is_closed(self):
-        return self.state == 'closed'
-
-    def reset(self):
-        self.state = 'empty'
-        self.parent = None
-
-    def make_start(self):
-        self.state = 'start'
-
-    def make_closed(self):
-        self.state = 'closed'
-
-    def make_open(self):
-        self.state = 'open'
-
-    def make_obstacle(self):
-        self.state = 'obstacle'
-
-    def make_end(self):
-        self.state = 'end'
-
-    def make_path(self):
-        self.state = 'path'
-
-    def draw(self, win):
-        # Recalcula posição/size baseado no tamanho atual da janela
-        surf = pygame.display.get_surface()
-        if surf is not None:
-            actual_width = surf.get_width()
-        else:
-            actual_width = WIDTH
-        gap = actual_width // self.total_rows
-        x = self.col * gap
-        y = self.row * gap
-        size = gap
-
-        # Seleciona cores segundo o tema atual
-        theme = THEMES.get(CURRENT_THEME, THEMES['default'])
-        color_map = {
-            'empty': WHITE,
-            'obstacle': theme['obstacle'],
-            'start': theme['start'],
-            'end': theme['end'],
-            'open': theme['open'],
-            'closed': theme['closed'],
-            'path': theme['path'],
-        }
-        color = color_map.get(self.state, WHITE)
-        pygame.draw.rect(win, color, (x, y, size, size))
-
-        # Desenha letra para início/fim (I = Início, F = Fim)
-        if self.state in ('start', 'end'):
-            try:
-                font_size = max(12, size // 2)
-                font = pygame.font.SysFont(None, font_size)
-                letter = 'I' if self.state == 'start' else 'F'
-                txt = font.render(letter, True, BLACK)
-                txt_rect = txt.get_rect(center=(x + size//2, y + size//2))
-                win.blit(txt, txt_rect)
-            except Exception:
-                pass
-
-    def update_neighbors(self, grid):
-        """Atualiza lista de vizinhos 4-direções (ignora obstáculos)."""
-        self.neighbors = []
-        # baixo
-        if self.row < self.total_rows - 1 and not grid[self.row + 1][self.col].is_obstacle():
-            self.neighbors.append(grid[self.row + 1][self.col])
-        # cima
-        if self.row > 0 and not grid[self.row - 1][self.col].is_obstacle():
-            self.neighbors.append(grid[self.row - 1][self.col])
-        # direita
-        if self.col < self.total_rows - 1 and not grid[self.row][self.col + 1].is_obstacle():
-            self.neighbors.append(grid[self.row][self.col + 1])
-        # esquerda
-        if self.col > 0 and not grid[self.row][self.col - 1].is_obstacle():
-            self.neighbors.append(grid[self.row][self.col - 1])
-
-
 def play_click_sound():
-    """Toca um som curto de clique. Usa winsound no Windows quando disponível."""
-    try:
-        if _HAS_WINSOUND:
-            # frequência, duração(ms)
-            winsound.Beep(800, 60)
-        else:
-            # fallback simples usando pygame.mixer (se inicializado)
-            if pygame.mixer.get_init() is None:
-                pygame.mixer.init()
-            # gera um pequeno tom sintetizado (curto) - se não funcionar, ignora
-            arr = pygame.sndarray.make_sound(
-                (pygame.surfarray.array2d(pygame.Surface((1, 1))) * 0).astype('int16')
-            )
-            arr.play()
-    except Exception:
-        # Se tudo falhar, não atrapalha a execução
-        pass
+    """Toca um som curto de clique (sem esperar o som terminar)."""
+    if SOUNDS is not None:
+        SOUNDS.play('click')
 
 
 def play_hover_sound():
     """Som curto ao posicionar o cursor sobre um botão."""
-    try:
-        if _HAS_WINSOUND:
-            winsound.Beep(1000, 35)
-    except Exception:
-        pass
+    if SOUNDS is not None:
+        SOUNDS.play('hover')
 
 
 def play_error_sound():
     """Som de aviso/erro."""
-    try:
-        if _HAS_WINSOUND:
-            winsound.Beep(480, 120)
-    except Exception:
-        pass
+    if SOUNDS is not None:
+        SOUNDS.play('error')
 
 
 # Temas de cor por algoritmo
@@ -203,6 +133,41 @@ THEMES = {
         'open': (0, 180, 0),
         'closed': (200, 80, 80),
         'path': (255, 140, 0),
+    },
+    'jps': {
+        'start': PURPLE,
+        'end': ORANGE,
+        'obstacle': BLACK,
+        'open': (240, 200, 0),
+        'closed': (90, 90, 220),
+        'path': (220, 0, 120),
+    },
+    'dstar': {
+        'start': PURPLE,
+        'end': ORANGE,
+        'obstacle': BLACK,
+        'open': (120, 200, 120),
+        'closed': (200, 120, 120),
+        'path': (0, 160, 120),
+    },
+    'hpa': {
+        'start': PURPLE,
+        'end': ORANGE,
+        'obstacle': BLACK,
+        'open': (255, 180, 120),
+        'closed': (120, 60, 160),
+        'path': (0, 140, 200),
+    },
+    # busca bidirecional: verdes a partir do início, azuis a partir do fim
+    'bidir': {
+        'start': PURPLE,
+        'end': ORANGE,
+        'obstacle': BLACK,
+        'open': (140, 230, 140),
+        'closed': (30, 150, 60),
+        'open_back': (150, 200, 255),
+        'closed_back': (50, 90, 210),
+        'path': (255, 140, 0),
     }
 }
 
@@ -210,6 +175,23 @@ THEMES = {
 CURRENT_THEME = 'default'
 
 
+def theme_palette(name):
+    """Cores do tema indexadas pelo código de estado (EMPTY..CLOSED_BACK).
+
+    Temas sem cores próprias para a fronteira de trás (busca bidirecional)
+    usam as do tema 'bidir'.
+    """
+    theme = THEMES.get(name, THEMES['default'])
+    back = THEMES['bidir']
+    return (WHITE, theme['obstacle'], theme['start'], theme['end'],
+            theme['open'], theme['closed'], theme['path'],
+            theme.get('open_back', back['open_back']), theme.get('closed_back', back['closed_back']))
+
+
+# Renderizador compartilhado (células sujas + paleta do tema; I = Início, F = Fim)
+RENDERER = GridRenderer(labels={START: 'I', END: 'F'})
+
+
 def set_theme(name: str):
     global CURRENT_THEME
     if name in THEMES:
@@ -218,102 +200,144 @@ def set_theme(name: str):
         CURRENT_THEME = 'default'
 
 
-def make_grid(rows, width):
-    grid = []
-    gap = width // rows
-    for i in range(rows):
-        grid.append([])
-        for j in range(rows):
-            node = Node(i, j, gap, rows)
-            grid[i].append(node)
-    return grid
+def draw(win, grid, rows=None, width=None, view=None):
+    # repinta apenas as células alteradas (ou tudo, quando necessário) dentro da câmera;
+    # `rows`/`width` ficam por compatibilidade (sem `view`, o grid inteiro na janela)
+    rects = RENDERER.render(win, grid, theme_palette(CURRENT_THEME), view)
+    if rects:
+        pygame.display.update(rects)
 
 
-def draw_grid_lines(win, rows, width):
-    surf = pygame.display.get_surface()
-    if surf is not None:
-        actual_width = surf.get_width()
-    else:
-        actual_width = width
-    gap = actual_width // rows
-    for i in range(rows):
-        pygame.draw.line(win, GREY, (0, i * gap), (actual_width, i * gap))
-    for j in range(rows):
-        pygame.draw.line(win, GREY, (j * gap, 0), (j * gap, actual_width))
+def draw_node(win, node):
+    """Desenha uma única célula (usado por `Node.draw`), na câmera do último quadro."""
+    rect = RENDERER.paint_cell(win, node.grid, node.index, palette=theme_palette(CURRENT_THEME))
+    if rect is not None:
+        pygame.display.update(rect)
 
 
-def draw(win, grid, rows, width):
-    win.fill(WHITE)
-    # redesenha os nós (Node.draw fará o cálculo baseado no tamanho atual)
-    for row in grid:
-        for node in row:
-            node.draw(win)
-    draw_grid_lines(win, rows, width)
-    pygame.display.update()
+def get_clicked_pos(pos, rows=None, width=None):
+    """Célula `(row, col)` sob o pixel `pos` na câmera do último quadro (None fora do grid)."""
+    view = RENDERER.view
+    if view is None:
+        x, y = pos
+        gap = max(1, WIDTH // (rows or GRID_ROWS))
+        return y // gap, x // gap
+    return view.cell_at(pos)
 
 
-def get_clicked_pos(pos, rows, width):
-    # Usa o tamanho atual da janela para calcular gap (corrige problemas de DPI/rescale)
-    surf = pygame.display.get_surface()
-    if surf is not None:
-        actual_width = surf.get_width()
-    else:
-        actual_width = width
-    gap = actual_width // rows
-    x, y = pos
-    row = y // gap
-    col = x // gap
-    return row, col
+def map_files():
+    """Arquivos de mapa em `MAPS_DIR` (.grid, .map do MovingAI, texto) e traces de busca (.trace)."""
+    try:
+        names = sorted(os.listdir(MAPS_DIR))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(MAPS_DIR, name) for name in names
+            if os.path.splitext(name)[1].lower() in GUI_MAP_EXTENSIONS or name.lower().endswith(TRACE_EXTENSION)]
+
 
+def open_map(path, width):
+    """Carrega um mapa para a janela: `(grid, start, end)`, de qualquer tamanho.
 
-def dumb_search(draw, grid, start, end):
+    Um `.map` do MovingAI usa início e fim do primeiro cenário do `.scen` ao
+    lado dele (`nome.map.scen`), se existir. Um `.tgrid` é recusado com
+    `ValueError` (veja `GUI_MAP_EXTENSIONS`).
     """
-    "Burro e lento": caminhada aleatória com marcação de visitados e backtracking simples.
-    Serve como placeholder enquanto os alunos implementam algoritmos reais em outros arquivos.
+    if os.path.splitext(path)[1].lower() == '.tgrid':
+        raise ValueError(f"{os.path.basename(path)}: formato não aberto pelo visualizador "
+                         "(use headless.py ou tiled_grid.py)")
+    grid, start, end = load_map(path, width)
+    scen = path + '.scen'
+    if start is None and end is None and os.path.exists(scen):
+        scenarios = read_scen(scen)
+        if scenarios:
+            first = scenarios[0]
+            start = grid.node(first.start_row, first.start_col)
+            end = grid.node(first.goal_row, first.goal_col)
+            start.make_start()
+            end.make_end()
+    return grid, start, end
+
+
+def _free_name(prefix, extension):
+    # primeiro `MAPS_DIR/prefixo-NNN.ext` que ainda não existe
+    os.makedirs(MAPS_DIR, exist_ok=True)
+    n = 1
+    while os.path.exists(os.path.join(MAPS_DIR, f"{prefix}-{n:03d}{extension}")):
+        n += 1
+    return os.path.join(MAPS_DIR, f"{prefix}-{n:03d}{extension}")
+
+
+def save_drawing(grid, start, end):
+    """Salva o grid em `MAPS_DIR/desenho-NNN.grid` (primeiro número livre)."""
+    path = _free_name('desenho', '.grid')
+    save_grid(grid, path, start, end)
+    return path
+
+
+def save_trace(grid, finished, start, end, path):
+    """Salva a busca reproduzida por `finished` (gravada com `record=True`) em `MAPS_DIR/busca-NNN.trace`."""
+    meta = {'algo': finished.metrics.algo if finished.metrics is not None else None}
+    if finished.metrics is not None:
+        meta['metrics'] = finished.metrics.as_dict()
+    if finished.stats:
+        meta['stats'] = finished.stats
+    trace = SearchTrace.record(finished.base, grid.rows, grid.cols, start, end, finished.log, path, meta)
+    target = _free_name('busca', TRACE_EXTENSION)
+    trace.save(target)
+    return target
+
+
+def open_trace(path, width):
+    """Carrega um `.trace`: `(trace, grid, start, end)` com o mapa de partida."""
+    trace = SearchTrace.load(path)
+    return (trace, *trace.to_grid(width))
+
+
+def start_search(func, grid, start, end, speed=DEFAULT_SPEED, timeout=SEARCH_TIMEOUT):
+    """Prepara a reprodução de `func(draw, grid, start, end)` quadro a quadro.
+
+    A função roda num processo separado (`search_worker`) e suas mudanças de
+    estado chegam como eventos enquanto ela avança, sem travar a janela; a
+    busca pode ser cancelada (`player.close()`) e é interrompida depois de
+    `timeout` segundos. Se a função ainda não estiver implementada, usa a
+    busca "burra". O jogador leva as métricas da execução (`player.metrics`).
     """
-    # iniciamos a busca
-    visited = set()
-    stack = [start]
-    start.parent = None
-
-    while stack:
-        # Mantém a janela responsiva
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                return False
-
-        current = stack.pop()
-        if current in visited:
-            continue
-        visited.add(current)
+    metrics = RunMetrics(func.__name__, grid, start=start, end=end)
+    events = iter_search_worker(func, grid, start, end, timeout, metrics)
+    return SearchPlayer(_with_fallback(events, grid, start, end, metrics), grid, speed, metrics=metrics,
+                        record=True)
 
-        # Marca nós para visual (aberto/vermelho)
-        if not current.is_start() and not current.is_end():
-            current.make_closed()
 
-        draw()
-        time.sleep(0.01)  # torna a busca visível (intencionalmente lenta)
-
-        if current == end:
-            # Reconstrói caminho ingênuo
-            node = current
-            while node and not node.is_start():
-                node.make_path()
-                node = node.parent
-            return True
-
-        # Atualiza vizinhos e empilha em ordem aleatória
-        current.update_neighbors(grid)
-        neighbors = list(current.neighbors)
-        random.shuffle(neighbors)
-        for n in neighbors:
-            if n not in visited and not n.is_obstacle():
-                n.parent = current
-                n.make_open()
-                stack.append(n)
-
-    return False
+def _with_fallback(events, grid, start, end, metrics):
+    try:
+        return (yield from events)
+    except NotImplementedError:
+        clear_algorithm_marks(grid)
+        metrics.algo = 'dumb_search'
+        metrics.recorded = False
+        return (yield from iter_dumb_search(grid, start, end))
+
+
+def start_engine(events, grid, name, speed=DEFAULT_SPEED, stats=None):
+    """Jogador (com métricas) de um motor de busca que emite eventos e preenche `stats`."""
+    return SearchPlayer(events, grid, speed, stats, RunMetrics(name, grid, stats), record=True)
+
+
+def draw_metrics_panel(win, lines):
+    """Desenha o painel translúcido de métricas no canto superior esquerdo e retorna seu retângulo."""
+    font = RENDERER.font(20)
+    surfaces = [font.render(line, True, WHITE) for line in lines]
+    width = max(s.get_width() for s in surfaces) + 16
+    height = sum(s.get_height() + 2 for s in surfaces) + 12
+    panel = pygame.Surface((width, height), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 170))
+    y = 6
+    for surf in surfaces:
+        panel.blit(surf, (8, y))
+        y += surf.get_height() + 2
+    rect = win.blit(panel, (6, 6))
+    pygame.display.update(rect)
+    return rect
 
 
 class Button:
@@ -350,10 +374,22 @@ def show_tutorial_screen(win):
         "- Clique para definir o nó INÍCIO (primeiro clique) e o nó FIM (segundo clique).",
         "- Depois, clique em outras células para desenhar OBSTÁCULOS.",
         "- Teclas na tela do grid:",
-        "    • 'A' → roda A* (no momento usa um placeholder).",
-        "    • 'D' → roda Dijkstra (placeholder).",
+        "    • 'A' → roda A* (astar_impl.run_astar).",
+        "    • 'D' → roda Dijkstra (dijkstra_impl.run_dijkstra).",
         "    • 'C' → limpa todo o grid.",
         "    • 'R' → limpa apenas o caminho, mantendo obstáculos.",
+        "    • 'J' → Jump Point Search (Shift+J: 8 direções).",
+        "    • 'L' → replaneja o caminho ao vivo enquanto você pinta.",
+        "    • 'H' → busca hierárquica (HPA*) sobre clusters do grid.",
+        "    • Shift+A / Shift+D → A* / Dijkstra bidirecionais (início e fim ao mesmo tempo).",
+        "    • 'F' → mostra o campo de fluxo até o FIM (distâncias e setas).",
+        "    • 'V' → alterna a velocidade da animação da busca; 'Esc' cancela a busca em andamento.",
+        "    • 'N' → liga/desliga os sons (também no menu).",
+        "    • 'T' → salva a última busca como trace (maps/busca-NNN.trace); 'O' reabre com avanço/recuo.",
+        "    • 'I' → painel de métricas (expansões, heap, tempos); 'E' exporta as execuções (JSONL).",
+        "    • 'M' → gera um mapa (animado); 'G' troca o gerador (labirintos, cavernas, salas...).",
+        "    • 'S' → salva o grid em maps/; 'O' → abre o próximo mapa de maps/ (.grid, .map MovingAI).",
+        "    • Roda do mouse ou +/- → zoom; botão do meio (ou Shift+setas) desloca; '0' mostra tudo.",
         "Atividade: implemente os algoritmos em 'astar_impl.py' e 'dijkstra_impl.py'.",
         "Consulte o README para instruções detalhadas e critérios de avaliação."
     ]
@@ -365,9 +401,13 @@ def show_tutorial_screen(win):
     pygame.display.update()
 
 
-def main_app(win, width):
-    ROWS = 40
-    grid = make_grid(ROWS, width)
+def main_app(win, width, rows=None, cols=None):
+    rows = rows or GRID_ROWS
+    cols = cols or GRID_COLS
+    grid = make_grid(rows, width, cols)
+    RENDERER.set_overlay(None)
+    # câmera sobre o grid (zoom e deslocamento); recriada quando o grid muda de tamanho
+    view = Viewport(*win.get_size(), grid.rows, grid.cols)
 
     # Modos de pincel (largura em células, sempre ímpar para centralizar)
     BRUSH_SIZES = [1, 3, 5]
@@ -376,66 +416,231 @@ def main_app(win, width):
     start = None
     end = None
 
+    # área da sobreposição (destaque/pincel) do quadro anterior
+    overlay_rect = None
+
+    # busca em reprodução (aplica alguns eventos por quadro) e sua velocidade
+    player = None
+    speed = DEFAULT_SPEED
+    # limita a taxa de quadros e bloqueia o laço à espera de eventos quando nada muda
+    frames = FrameClock(FPS)
+    busy = True
+    # célula sob o cursor e pincel do último destaque desenhado
+    last_hover = None
+
+    def status(text):
+        # a barra de status cobre o grid: é apagada no próximo quadro
+        RENDERER.invalidate_rect(_draw_status(win, text))
+
+    # replanejamento incremental (D* Lite) enquanto o usuário pinta
+    planner = None
+    live_path = []
+    # grafo hierárquico (HPA*), construído no primeiro 'H' e mantido ao pintar
+    hpa = None
+    # campo de fluxo até o fim mostrado como sobreposição (tecla F) e a câmera em que foi desenhado
+    show_flow = False
+    flow = None
+    flow_view = None
+    # gerador de mapas da tecla M (a tecla G troca) e a geração em andamento
+    map_kinds = list(GENERATORS)
+    map_kind = 0
+    map_player = None
+    map_label = ""
+    # posição do último mapa aberto com a tecla O
+    map_file = -1
+    # métricas: execuções terminadas nesta sessão, painel (tecla I) e sua área no quadro anterior
+    runs = []
+    show_metrics = False
+    metrics_rect = None
+    # chave do cache da busca em andamento (o caminho é guardado quando ela termina)
+    # e a reprodução de um caminho vindo do cache
+    cache_key = None
+    cached_player = None
+    # última busca terminada (jogador com os eventos gravados, início, fim, caminho),
+    # salva como trace pela tecla T, e o trace aberto com O (setas/Home/End/Espaço)
+    last_run = None
+    trace_player = None
+
+    def launch(name, make_player):
+        """Reproduz o caminho do cache para a consulta ou inicia a busca com `make_player()`."""
+        nonlocal cache_key, cached_player, trace_player
+        trace_player = None
+        key = PATH_CACHE.key(grid, start, end, name)
+        path = PATH_CACHE.get(key)
+        if path is not None:
+            cache_key = None
+            cached_player = SearchPlayer(iter_cached(grid, path), grid, None)
+            return cached_player
+        cache_key = key
+        return make_player()
+
+    def remember(finished):
+        # guarda o caminho da busca terminada (cache e trace da tecla T)
+        nonlocal last_run
+        path = finished.result
+        if path and not isinstance(path, list):
+            # funções (draw, grid, start, end) retornam só True: caminho pelos pais
+            path = path_from_parents(grid, start, end)
+        last_run = (finished, start, end, path)
+        # sem cadeia de pais não há caminho para reproduzir do cache
+        reproducible = path is not None or not finished.result
+        if reproducible and cache_key is not None and grid.layout_hash == cache_key[0]:
+            PATH_CACHE.put(cache_key, path)
+
+    def show_live_path(path):
+        nonlocal live_path
+        for i in live_path:
+            if grid.cells[i] == PATH:
+                grid.set_state(i, EMPTY)
+        live_path = path[1:-1] if path else []
+        for i in live_path:
+            grid.set_state(i, PATH)
+
+    def paint(row, col, make_obstacle):
+        changed = apply_brush(grid, grid.rows, row, col, BRUSH_SIZES[brush_index], make_obstacle=make_obstacle)
+        if hpa is not None and changed:
+            hpa.update_cells(changed)
+        if planner is not None:
+            path = planner.update_cells(changed)
+            show_live_path(path)
+            if changed:
+                found = "caminho atualizado" if path else "sem caminho"
+                status(f"Replanejamento: {found} ({planner.last_expanded} expansões)")
+
     run = True
     while run:
-        draw(win, grid, ROWS, width)
+        events = frames.wait(busy)
+        # só movimento do mouse não muda o estado (pintar arrastando marca células sujas)
+        changed = any(event.type != pygame.MOUSEMOTION for event in events)
+        if player is not None and not player.step():
+            stats = player.stats
+            finished, player = player, None
+            if finished.metrics is not None:
+                runs.append(finished.metrics)
+            if finished is map_player:
+                map_player = None
+                status(f"Mapa {map_label} gerado. Defina início e fim.")
+            elif finished.error is not None:
+                play_error_sound()
+                if isinstance(finished.error, SearchTimeout):
+                    status(f"Busca interrompida: passou de {SEARCH_TIMEOUT:g} s.")
+                else:
+                    status(f"Erro na busca: {finished.error}")
+            elif finished is trace_player:
+                status(f"Trace reproduzido até o fim ({finished.trace.steps} eventos); "
+                       f"setas/Home voltam.")
+            elif finished is cached_player:
+                cached_player = None
+                found = "Caminho" if finished.result else "Sem caminho"
+                status(f"{found} reproduzido do cache ({PATH_CACHE.hits} acertos, {PATH_CACHE.misses} faltas).")
+            else:
+                remember(finished)
+                if stats and 'frontier_forward' in stats:
+                    status(f"Execução finalizada. Fronteira do início: {stats['frontier_forward']} "
+                           f"({stats['expanded_forward']} expansões); do fim: {stats['frontier_backward']} "
+                           f"({stats['expanded_backward']} expansões).")
+                elif finished.metrics is not None:
+                    m = finished.metrics
+                    status(f"Execução finalizada: {m.expanded} expandidos, CPU da busca "
+                           f"{m.search_cpu * 1000.0:.1f} ms (I mostra as métricas).")
+                else:
+                    status("Execução finalizada.")
 
-        # Desenha destaque da célula sob o cursor (retângulo translúcido)
-        try:
-            surf = pygame.display.get_surface()
-            if surf is not None:
-                actual_width = surf.get_width()
+        if show_flow:
+            if end is None:
+                show_flow = False
+                flow = None
+                RENDERER.set_overlay(None)
             else:
-                actual_width = width
-            gap = actual_width // ROWS
-            mx, my = pygame.mouse.get_pos()
-            hover_row = my // gap
-            hover_col = mx // gap
-            if 0 <= hover_row < ROWS and 0 <= hover_col < ROWS:
-                theme = THEMES.get(CURRENT_THEME, THEMES['default'])
-                hcolor = theme.get('open', (200, 200, 0))
-
-                # pinta destaque central
-                highlight = pygame.Surface((gap, gap), pygame.SRCALPHA)
-                highlight.fill((hcolor[0], hcolor[1], hcolor[2], 90))
-                win.blit(highlight, (hover_col * gap, hover_row * gap))
-
-                # desenha contorno do pincel (quadrado de brush_size)
-                brush = BRUSH_SIZES[brush_index]
-                radius = brush // 2
-                left = max(0, hover_col - radius)
-                top = max(0, hover_row - radius)
-                right = min(ROWS - 1, hover_col + radius)
-                bottom = min(ROWS - 1, hover_row + radius)
-                outline_rect = pygame.Rect(left * gap, top * gap, (right - left + 1) * gap, (bottom - top + 1) * gap)
-                pygame.draw.rect(win, (0, 0, 0), outline_rect, 2)
-                pygame.display.update(outline_rect)
-        except Exception:
-            pass
-
-        for event in pygame.event.get():
+                # em cache até os obstáculos (ou o fim) mudarem; redesenhado ao mover a câmera
+                field = flow_field(grid, end.index)
+                if field is not flow or view.key != flow_view:
+                    RENDERER.set_overlay(field_overlay(field.dist, field.next, view))
+                    flow_view = view.key
+                if field is not flow:
+                    flow = field
+                    to_start = field.distance(start.index) if start else None
+                    reach = f"início a {to_start} passos" if to_start is not None else "início sem caminho"
+                    status(f"Campo de fluxo: {field.reachable} células alcançáveis; {reach}.")
+
+        # sem animação nem mudanças, só redesenha se o destaque do cursor mudou de célula
+        hover_cell = view.cell_at(pygame.mouse.get_pos())
+        hover = (hover_cell, BRUSH_SIZES[brush_index], CURRENT_THEME, view.key)
+        if busy or changed or hover != last_hover:
+            last_hover = hover
+            RENDERER.invalidate_rect(overlay_rect)
+            RENDERER.invalidate_rect(metrics_rect)
+            overlay_rect = metrics_rect = None
+            cpu = time.process_time()
+            draw(win, grid, view=view)
+            current = player.metrics if player is not None else None
+            if current is not None:
+                current.add_frame(time.process_time() - cpu)
+            if show_metrics:
+                shown = current or (runs[-1] if runs else None)
+                if shown is not None:
+                    cache = PATH_CACHE.stats()
+                    metrics_rect = draw_metrics_panel(win, shown.lines() + [
+                        f"cache de caminhos: {cache['hits']} acertos, {cache['misses']} faltas, "
+                        f"{cache['entries']} entradas",
+                        frames.label()])
+
+            # Desenha destaque da célula sob o cursor (retângulo translúcido)
+            try:
+                if hover_cell is not None:
+                    hover_row, hover_col = hover_cell
+                    theme = THEMES.get(CURRENT_THEME, THEMES['default'])
+                    hcolor = theme.get('open', (200, 200, 0))
+
+                    # pinta destaque central
+                    gap = view.gap
+                    highlight = pygame.Surface((gap, gap), pygame.SRCALPHA)
+                    highlight.fill((hcolor[0], hcolor[1], hcolor[2], 90))
+                    win.blit(highlight, view.pixel(hover_row, hover_col))
+
+                    # desenha contorno do pincel (quadrado de brush_size)
+                    brush = BRUSH_SIZES[brush_index]
+                    radius = brush // 2
+                    left = max(0, hover_col - radius)
+                    top = max(0, hover_row - radius)
+                    right = min(grid.cols - 1, hover_col + radius)
+                    bottom = min(grid.rows - 1, hover_row + radius)
+                    outline_rect = view.cells_rect(top, bottom, left, right)
+                    pygame.draw.rect(win, (0, 0, 0), outline_rect, 2)
+                    pygame.display.update(outline_rect)
+                    overlay_rect = outline_rect
+            except Exception:
+                pass
+            frames.frame()
+
+        for event in events:
             if event.type == pygame.QUIT:
                 return
 
-            # Permite pintar/arrastar mantendo o botão pressionado
+            # Zoom na célula sob o cursor (roda do mouse)
+            if event.type == pygame.MOUSEWHEEL and event.y:
+                if view.zoom(1 if event.y > 0 else -1, pygame.mouse.get_pos()):
+                    status(f"Zoom: {view.label()}")
+
+            # Permite pintar/arrastar mantendo o botão pressionado (o botão do meio desloca a câmera)
             if event.type == pygame.MOUSEMOTION:
                 buttons = event.buttons if hasattr(event, 'buttons') else pygame.mouse.get_pressed()
+                if buttons[1]:
+                    view.pan(*event.rel)
                 if buttons[0]:
-                    pos = event.pos
-                    row, col = get_clicked_pos(pos, ROWS, width)
-                    if 0 <= row < ROWS and 0 <= col < ROWS:
-                        apply_brush(grid, ROWS, row, col, BRUSH_SIZES[brush_index], make_obstacle=True)
+                    cell = view.cell_at(event.pos)
+                    if cell is not None:
+                        paint(*cell, True)
                 if buttons[2]:
-                    pos = event.pos
-                    row, col = get_clicked_pos(pos, ROWS, width)
-                    if 0 <= row < ROWS and 0 <= col < ROWS:
-                        apply_brush(grid, ROWS, row, col, BRUSH_SIZES[brush_index], make_obstacle=False)
+                    cell = view.cell_at(event.pos)
+                    if cell is not None:
+                        paint(*cell, False)
 
             if pygame.mouse.get_pressed()[0]:
-                pos = pygame.mouse.get_pos()
-                row, col = get_clicked_pos(pos, ROWS, width)
-                if row >= ROWS or col >= ROWS:
+                cell = view.cell_at(pygame.mouse.get_pos())
+                if cell is None:
                     continue
+                row, col = cell
                 node = grid[row][col]
                 if not start and node != end:
                     start = node
@@ -445,72 +650,282 @@ def main_app(win, width):
                     end.make_end()
                 elif node != end and node != start:
                     # aplica pincel ao clicar
-                    apply_brush(grid, ROWS, row, col, BRUSH_SIZES[brush_index], make_obstacle=True)
+                    paint(row, col, True)
 
             elif pygame.mouse.get_pressed()[2]:
-                pos = pygame.mouse.get_pos()
-                row, col = get_clicked_pos(pos, ROWS, width)
-                if row >= ROWS or col >= ROWS:
+                cell = view.cell_at(pygame.mouse.get_pos())
+                if cell is None:
                     continue
-                apply_brush(grid, ROWS, row, col, BRUSH_SIZES[brush_index], make_obstacle=False)
+                row, col = cell
+                node = grid[row][col]
+                paint(row, col, False)
                 if node == start:
                     start = None
+                    planner = None
                 if node == end:
                     end = None
+                    planner = None
 
             if event.type == pygame.KEYDOWN:
+                # Shift+A / Shift+D: versões bidirecionais (motores de referência)
+                bidir = bool(event.mod & pygame.KMOD_SHIFT)
                 if event.key == pygame.K_a and start and end:
-                    # prepara vizinhos
-                    for row in grid:
-                        for node in row:
-                            node.update_neighbors(grid)
                     # limpa as marcações de outro algoritmo e define tema para A*
+                    player = None
+                    planner = None
                     clear_algorithm_marks(grid)
-                    set_theme('astar')
                     play_click_sound()
-                    _draw_status(win, "Executando A* (placeholder)...")
-                    dumb_search(lambda: draw(win, grid, ROWS, width), grid, start, end)
-                    _draw_status(win, "Execução finalizada.")
+                    if bidir:
+                        set_theme('bidir')
+                        status("Executando A* bidirecional...")
+                        stats = new_stats()
+                        player = launch('bidir_astar', lambda: start_engine(
+                            iter_bidir_astar(grid, start, end, stats=stats), grid, 'bidir_astar', speed, stats))
+                    else:
+                        set_theme('astar')
+                        status("Executando A*...")
+                        player = launch('run_astar', lambda: start_search(run_astar, grid, start, end, speed))
 
                 if event.key == pygame.K_d and start and end:
-                    for row in grid:
-                        for node in row:
-                            node.update_neighbors(grid)
                     # limpa as marcações de outro algoritmo e define tema para Dijkstra
+                    player = None
+                    planner = None
                     clear_algorithm_marks(grid)
-                    set_theme('dijkstra')
                     play_click_sound()
-                    _draw_status(win, "Executando Dijkstra (placeholder)...")
-                    dumb_search(lambda: draw(win, grid, ROWS, width), grid, start, end)
-                    _draw_status(win, "Execução finalizada.")
+                    if bidir:
+                        set_theme('bidir')
+                        status("Executando Dijkstra bidirecional...")
+                        stats = new_stats()
+                        player = launch('bidir_dijkstra', lambda: start_engine(
+                            iter_bidir_dijkstra(grid, start, end, stats=stats), grid, 'bidir_dijkstra', speed, stats))
+                    else:
+                        set_theme('dijkstra')
+                        status("Executando Dijkstra...")
+                        player = launch('run_dijkstra', lambda: start_search(run_dijkstra, grid, start, end, speed))
+
+                # Jump Point Search: J = 4 direções, Shift+J = 8 direções
+                if event.key == pygame.K_j and start and end:
+                    diagonal = bool(event.mod & pygame.KMOD_SHIFT)
+                    player = None
+                    planner = None
+                    clear_algorithm_marks(grid)
+                    set_theme('jps')
+                    play_click_sound()
+                    status(f"Executando JPS ({8 if diagonal else 4} direções)...")
+                    stats = new_stats()
+                    name = 'jps8' if diagonal else 'jps'
+                    player = launch(name, lambda: start_engine(
+                        iter_jps(grid, start, end, diagonal, stats), grid, name, speed, stats))
+
+                # Busca hierárquica: entradas dos clusters abertas/fechadas e o caminho refinado
+                if event.key == pygame.K_h and start and end:
+                    player = None
+                    planner = None
+                    clear_algorithm_marks(grid)
+                    set_theme('hpa')
+                    play_click_sound()
+                    if hpa is None:
+                        hpa = HPAStar(grid, cluster_size=8)
+                    status(f"Executando HPA* ({hpa.stats['clusters']} clusters)...")
+                    stats = new_stats()
+                    player = launch('hpa', lambda: start_engine(
+                        hpa.iter_search(start, end, stats), grid, 'hpa', speed, stats))
 
                 if event.key == pygame.K_c:
+                    player = None
+                    planner = None
+                    hpa = None
                     start = None
                     end = None
-                    grid = make_grid(ROWS, width)
+                    grid = make_grid(grid.rows, width, grid.cols)
 
                 # Alterna modos de pincel
                 if event.key == pygame.K_b:
                     brush_index = (brush_index + 1) % len(BRUSH_SIZES)
-                    _draw_status(win, f"Tamanho do pincel: {BRUSH_SIZES[brush_index]}x{BRUSH_SIZES[brush_index]}")
+                    status(f"Tamanho do pincel: {BRUSH_SIZES[brush_index]}x{BRUSH_SIZES[brush_index]}")
+
+                # Liga/desliga o replanejamento incremental (D* Lite) ao pintar
+                if event.key == pygame.K_l:
+                    player = None
+                    if planner is not None:
+                        planner = None
+                        live_path = []
+                        status("Replanejamento ao vivo desligado.")
+                    elif start and end:
+                        clear_algorithm_marks(grid)
+                        set_theme('dstar')
+                        planner = DStarLite(grid, start, end)
+                        live_path = []
+                        show_live_path(planner.plan())
+                        status(f"Replanejamento ao vivo ligado ({planner.last_expanded} expansões).")
+
+                # Campo de fluxo até o fim: mapa de calor + setas do próximo passo
+                if event.key == pygame.K_f:
+                    if show_flow:
+                        show_flow = False
+                        flow = None
+                        RENDERER.set_overlay(None)
+                        status("Campo de fluxo desligado.")
+                    elif end:
+                        show_flow = True
+
+                # Liga/desliga os efeitos sonoros
+                if event.key == pygame.K_n and SOUNDS is not None:
+                    SOUNDS.toggle_mute()
+                    status(f"Som: {SOUNDS.label()}.")
+
+                # Alterna a velocidade da busca (eventos por quadro ou instantâneo)
+                if event.key == pygame.K_v:
+                    speed = next_speed(speed)
+                    if player is not None:
+                        player.speed = speed
+                    status(f"Velocidade: {speed_label(speed)}")
 
                 if event.key == pygame.K_r:
-                    for row in grid:
-                        for node in row:
-                            if node.is_open() or node.is_closed() or node.is_path():
-                                node.reset()
-                            if node.is_start():
-                                start = node
-                                start.make_start()
-                            if node.is_end():
-                                end = node
-                                end.make_end()
-                # Gerar labirinto automático
+                    player = None
+                    planner = None
+                    # início e fim não são marcas de busca: continuam no grid
+                    clear_algorithm_marks(grid)
+                # Cancela a busca em andamento (encerra o processo da função dos alunos)
+                if event.key == pygame.K_ESCAPE and player is not None and player is not map_player:
+                    player.close()
+                    player = None
+                    cache_key = None
+                    status("Busca cancelada.")
+
+                # Painel de métricas da execução (atual ou última)
+                if event.key == pygame.K_i:
+                    show_metrics = not show_metrics
+                    if show_metrics and not runs and player is None:
+                        status("Nenhuma execução ainda: rode uma busca para ver as métricas.")
+
+                # Exporta as métricas das execuções desta sessão (JSON Lines)
+                if event.key == pygame.K_e:
+                    if not runs:
+                        status("Nenhuma execução terminada para exportar.")
+                    else:
+                        try:
+                            append_jsonl(METRICS_FILE, runs)
+                        except OSError as exc:
+                            play_error_sound()
+                            status(f"Não foi possível exportar: {exc}")
+                        else:
+                            status(f"{len(runs)} execuções exportadas para {os.path.relpath(METRICS_FILE)}")
+                            runs = []
+
+                # Salva obstáculos, início e fim num arquivo .grid
+                if event.key == pygame.K_s:
+                    try:
+                        path = save_drawing(grid, start, end)
+                    except OSError as exc:
+                        play_error_sound()
+                        status(f"Não foi possível salvar: {exc}")
+                    else:
+                        status(f"Grid salvo em {os.path.relpath(path)}")
+
+                # Salva a última busca como trace (eventos + mapa), reaberto com O
+                if event.key == pygame.K_t:
+                    if last_run is None:
+                        status("Nenhuma busca terminada para salvar (rode A, D, J ou H).")
+                    else:
+                        try:
+                            path = save_trace(grid, *last_run)
+                        except OSError as exc:
+                            play_error_sound()
+                            status(f"Não foi possível salvar: {exc}")
+                        else:
+                            status(f"Trace salvo em {os.path.relpath(path)} "
+                                   f"({last_run[0].applied} eventos, {os.path.getsize(path)} bytes)")
+
+                # Zoom (+/-, no centro da janela), grid inteiro (0) e deslocamento (Shift+setas)
+                if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS,
+                                 pygame.K_MINUS, pygame.K_KP_MINUS):
+                    zoom_in = event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS)
+                    if view.zoom(1 if zoom_in else -1):
+                        status(f"Zoom: {view.label()}")
+                if event.key in (pygame.K_0, pygame.K_KP0):
+                    view.fit()
+                    status(f"Grid inteiro ({grid.rows}x{grid.cols}): {view.label()}")
+                pan_keys = {pygame.K_LEFT: (1, 0), pygame.K_RIGHT: (-1, 0), pygame.K_UP: (0, 1), pygame.K_DOWN: (0, -1)}
+                panning = event.key in pan_keys and bool(event.mod & pygame.KMOD_SHIFT)
+                if panning:
+                    dx, dy = pan_keys[event.key]
+                    view.pan(dx * view.width // 4, dy * view.height // 4)
+
+                # Trace aberto: setas voltam/avançam 5% dos passos, Home/End vão ao início/fim
+                # e Espaço pausa ou continua a reprodução
+                seek_keys = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_HOME, pygame.K_END, pygame.K_SPACE)
+                if event.key in seek_keys and not panning and trace_player is not None and trace_player.grid is grid:
+                    steps = trace_player.trace.steps
+                    jump = max(1, steps // 20)
+                    if event.key == pygame.K_SPACE:
+                        trace_player.paused = not trace_player.paused
+                    else:
+                        target = {pygame.K_LEFT: trace_player.position - jump,
+                                  pygame.K_RIGHT: trace_player.position + jump,
+                                  pygame.K_HOME: 0, pygame.K_END: steps}[event.key]
+                        trace_player.seek(target)
+                    if not trace_player.done:
+                        player = trace_player
+                    paused = " (pausado)" if trace_player.paused else ""
+                    status(f"Trace: passo {trace_player.position} de {steps}{paused}")
+
+                # Abre o próximo mapa da pasta maps/
+                if event.key == pygame.K_o:
+                    files = map_files()
+                    if not files:
+                        status(f"Nenhum mapa em {os.path.relpath(MAPS_DIR)} (S salva o grid atual).")
+                    else:
+                        map_file = (map_file + 1) % len(files)
+                        path = files[map_file]
+                        is_trace = path.lower().endswith(TRACE_EXTENSION)
+                        try:
+                            if is_trace:
+                                trace, loaded, loaded_start, loaded_end = open_trace(path, width)
+                            else:
+                                loaded, loaded_start, loaded_end = open_map(path, width)
+                        except (OSError, ValueError) as exc:
+                            play_error_sound()
+                            status(f"Erro ao abrir {os.path.basename(path)}: {exc}")
+                        else:
+                            player = None
+                            planner = None
+                            hpa = None
+                            live_path = []
+                            grid, start, end = loaded, loaded_start, loaded_end
+                            view = Viewport(*win.get_size(), grid.rows, grid.cols)
+                            if is_trace:
+                                player = trace_player = TracePlayer(trace, grid, speed)
+                                algo = trace.meta.get('algo', '?')
+                                status(f"Trace {os.path.basename(path)} ({algo}, {trace.steps} eventos): "
+                                       f"setas/Home/End navegam, Espaço pausa.")
+                            else:
+                                status(f"Mapa {os.path.basename(path)} ({grid.rows}x{grid.cols}) carregado; "
+                                       f"{view.label()}.")
+
+                # Troca o gerador usado pela tecla M
+                if event.key == pygame.K_g:
+                    map_kind = (map_kind + 1) % len(map_kinds)
+                    status(f"Gerador de mapas: {map_kinds[map_kind]} (M para gerar)")
+
+                # Gera um mapa com semente nova, animado quadro a quadro
                 if event.key == pygame.K_m:
+                    planner = None
+                    hpa = None
+                    live_path = []
+                    start = None
+                    end = None
                     play_click_sound()
-                    _draw_status(win, "Gerando labirinto...")
-                    generate_maze(grid, ROWS)
-                    _draw_status(win, "Labirinto gerado. Defina início e fim.")
+                    kind = map_kinds[map_kind]
+                    seed = random.randrange(1 << 31)
+                    map_label = f"'{kind}' (semente {seed})"
+                    trace_player = None
+                    player = map_player = SearchPlayer(iter_generate(grid, kind, seed), grid, speed)
+                    status(f"Gerando {map_label}...")
+
+        # próximo quadro no ritmo do relógio enquanto houver animação ou algo a repintar
+        # (ou logo após eventos, que podem ter mudado o estado); senão espera eventos
+        busy = player is not None or changed or bool(grid.dirty) or grid.full_redraw
 
 
 def main_menu(win, width):
@@ -532,39 +947,79 @@ def main_menu(win, width):
     exit_btn = Button((center_x - btn_w // 2, 360, btn_w, btn_h), "Sair", lambda: None, font)
 
     status = "Clique em 'Iniciar' para abrir o grid."
-    last_hovered = None
-    title_pulse = 0.0
+    # o título pulsa por alguns segundos após a última interação; depois o menu
+    # fica parado à espera de eventos. Cada passo do pulso é renderizado uma vez.
+    titles = {}
+    pulse_step = 0
     pulse_dir = 1
+    pulse_until = time.monotonic() + TITLE_PULSE_SECONDS
+    title_rect = None
+    frames = FrameClock(MENU_FPS)
+    redraw = True
+
+    def draw_title():
+        nonlocal title_rect
+        surf = titles.get(pulse_step)
+        if surf is None:
+            surf = titles[pulse_step] = pygame.transform.rotozoom(title, 0, 1.0 + pulse_step * 0.025 * 0.03)
+        rect = surf.get_rect(center=(width // 2, 100 + title.get_height() // 2))
+        dirty = rect.union(title_rect) if title_rect else rect
+        win.fill(WHITE, dirty)
+        win.blit(surf, rect)
+        title_rect = rect
+        return dirty
 
     while True:
-        win.fill(WHITE)
-
-        # animação simples no título (pulso)
-        title_pulse += 0.025 * pulse_dir
-        if title_pulse > 0.6:
-            pulse_dir = -1
-        if title_pulse < -0.6:
-            pulse_dir = 1
-        scale = 1.0 + title_pulse * 0.03
-        title_surf = pygame.transform.rotozoom(title, 0, scale)
-        win.blit(title_surf, (width//2 - title_surf.get_width()//2, 100))
+        animating = time.monotonic() < pulse_until
+        events = frames.wait(animating or redraw)
+        if events:
+            pulse_until = time.monotonic() + TITLE_PULSE_SECONDS
 
-        # detecta hover e desenha botões
+        # detecta hover (som e redesenho só quando muda)
         mouse_pos = pygame.mouse.get_pos()
         for btn in (start_btn, tutorial_btn, exit_btn):
             hovered_now = btn.is_hover(mouse_pos)
-            if hovered_now and not btn.hovered:
-                play_hover_sound()
-            btn.hovered = hovered_now
-            btn.draw(win)
+            if hovered_now != btn.hovered:
+                if hovered_now:
+                    play_hover_sound()
+                btn.hovered = hovered_now
+                redraw = True
 
-        _draw_status(win, status)
-        pygame.display.update()
-
-        for event in pygame.event.get():
+        # animação simples no título (pulso)
+        if animating:
+            pulse_step += pulse_dir
+            if pulse_step >= 24:
+                pulse_dir = -1
+            if pulse_step <= -24:
+                pulse_dir = 1
+        elif pulse_step:
+            # volta ao tamanho normal ao parar
+            pulse_step = 0
+            pulse_dir = 1
+            redraw = True
+
+        if redraw:
+            win.fill(WHITE)
+            title_rect = None
+            draw_title()
+            for btn in (start_btn, tutorial_btn, exit_btn):
+                btn.draw(win)
+            _draw_status(win, status)
+            pygame.display.update()
+            frames.frame()
+            redraw = False
+        elif animating:
+            pygame.display.update(draw_title())
+            frames.frame()
+
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 return
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_n and SOUNDS is not None:
+                SOUNDS.toggle_mute()
+                status = f"Som: {SOUNDS.label()}. (N alterna)"
+                redraw = True
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 pos = pygame.mouse.get_pos()
                 if start_btn.is_clicked(pos):
@@ -573,6 +1028,7 @@ def main_menu(win, width):
                     _draw_status(win, status)
                     main_app(win, width)
                     status = "Clique em 'Iniciar' para abrir o grid."
+                    redraw = True
                 # alterna modo de pincel se clicar com Ctrl + botão esquerdo no menu (opcional)
                 elif pygame.key.get_mods() & pygame.KMOD_CTRL:
                     # não faz nada específico aqui — comportamento mantido no grid
@@ -580,22 +1036,21 @@ def main_menu(win, width):
                 elif tutorial_btn.is_clicked(pos):
                     play_click_sound()
                     show_tutorial_screen(win)
-                    # espera o usuário voltar com clique ou tecla
-                    waiting = True
-                    while waiting:
-                        for e in pygame.event.get():
-                            if e.type == pygame.QUIT:
-                                pygame.quit()
-                                return
-                            if e.type == pygame.MOUSEBUTTONDOWN or e.type == pygame.KEYDOWN:
-                                waiting = False
+                    # espera (bloqueado) o usuário voltar com clique ou tecla
+                    while True:
+                        e = pygame.event.wait()
+                        if e.type == pygame.QUIT:
+                            pygame.quit()
+                            return
+                        if e.type == pygame.MOUSEBUTTONDOWN or e.type == pygame.KEYDOWN:
+                            break
+                    redraw = True
                 elif exit_btn.is_clicked(pos):
                     play_click_sound()
                     pygame.quit()
                     return
 
 
-
 def _draw_status(win, text):
     """Desenha uma barra de status na parte inferior com texto em pt-br."""
     font = pygame.font.SysFont(None, 20)
@@ -605,87 +1060,22 @@ def _draw_status(win, text):
     txt = font.render(text, True, BLACK)
     win.blit(txt, (8, WIDTH - 22))
     pygame.display.update(rect)
-
-
-def generate_maze(grid, rows):
-    """Gera um labirinto simples usando algoritmo de backtracker (depth-first).
-
-    A função assume que `rows` é ímpar para um melhor resultado; caso não
-    seja, o algoritmo ainda funciona, mas o labirinto pode ficar diferente.
-    """
-    # Marca todas as células como obstáculos
-    for r in range(rows):
-        for c in range(rows):
-            grid[r][c].make_obstacle()
-
-    # Coordenadas dos caminhos serão as células com índices ímpares
-    start_r, start_c = 1, 1
-    if start_r >= rows or start_c >= rows:
-        return
-
-    stack = [(start_r, start_c)]
-    grid[start_r][start_c].reset()
-
-    directions = [(-2, 0), (2, 0), (0, -2), (0, 2)]
-    import random as _rand
-
-    while stack:
-        r, c = stack[-1]
-        neighbors = []
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            if 0 < nr < rows and 0 < nc < rows and grid[nr][nc].is_obstacle():
-                neighbors.append((nr, nc))
-
-        if neighbors:
-            nr, nc = _rand.choice(neighbors)
-            # Remove parede entre (r,c) e (nr,nc)
-            wall_r = (r + nr) // 2
-            wall_c = (c + nc) // 2
-            grid[wall_r][wall_c].reset()
-            grid[nr][nc].reset()
-            stack.append((nr, nc))
-        else:
-            stack.pop()
-
-
-def apply_brush(grid, rows, center_row, center_col, brush, make_obstacle=True):
-    """Aplica o pincel (quadrado de tamanho `brush`) centrado em (center_row, center_col).
-
-    Se `make_obstacle` for True, desenha obstáculos; caso contrário, reseta as células.
-    Não sobrescreve os nós start/end.
-    """
-    radius = brush // 2
-    for dr in range(-radius, radius + 1):
-        for dc in range(-radius, radius + 1):
-            r = center_row + dr
-            c = center_col + dc
-            if 0 <= r < rows and 0 <= c < rows:
-                node = grid[r][c]
-                if node.is_start() or node.is_end():
-                    continue
-                if make_obstacle:
-                    node.make_obstacle()
-                else:
-                    node.reset()
-
-
-def clear_algorithm_marks(grid):
-    """Limpa as marcações temporárias de algoritmo (open/closed/path).
-
-    Mantém obstáculos, start e end.
-    """
-    for row in grid:
-        for node in row:
-            if node.state in ('open', 'closed', 'path'):
-                node.reset()
-
+    return rect
 
 
 if __name__ == "__main__":
-    # Inicializa pygame e exibe menu
-    pygame.init()
+    parser = argparse.ArgumentParser(description="Visualizador de buscas em grid.")
+    parser.add_argument('--rows', type=int, default=GRID_ROWS, help=f"linhas do grid (padrão {GRID_ROWS})")
+    parser.add_argument('--cols', type=int, help="colunas do grid (padrão: igual a --rows)")
+    parser.add_argument('--mute', action='store_true', help="começa sem som (a tecla N alterna)")
+    args = parser.parse_args()
+    if args.rows < 2 or (args.cols is not None and args.cols < 2):
+        parser.error("o grid precisa de pelo menos 2 linhas e 2 colunas")
+    GRID_ROWS = args.rows
+    GRID_COLS = args.cols or args.rows
+    MUTED = args.mute
+    # Inicializa pygame (em get_window) e exibe menu
     try:
-        main_menu(WINDOW, WIDTH)
+        main_menu(get_window(), WIDTH)
     finally:
         pygame.quit()
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+playback.py
+
+Reprodução de buscas quadro a quadro.
+
+As buscas emitem eventos compactos (`índice << EVENT_SHIFT | estado`, veja
+`search_core`). Em vez de o algoritmo chamar `draw()` e dormir a cada nó, o
+visualizador consome esse fluxo numa taxa de quadros fixa: a cada quadro o
+`SearchPlayer` aplica até `speed` eventos (ou todos, no modo instantâneo),
+respeitando um orçamento de tempo para a janela continuar responsiva.
+
+Funções no formato `draw`-callback (ex.: `run_astar` dos alunos) entram no
+mesmo fluxo via `record_callback_search`: a função roda inteira sem desenhar,
+as mudanças de estado são gravadas e depois reproduzidas como eventos. O
+visualizador usa `search_worker`, que roda a função noutro processo e
+entrega os eventos enquanto ela avança.
+"""
+
+import time
+from array import array
+
+from grid_model import EVENT_MASK, EVENT_SHIFT
+
+# Eventos por quadro; None = instantâneo (limitado só pelo orçamento de tempo)
+SPEEDS = (1, 4, 16, 64, 256, 1024, None)
+DEFAULT_SPEED = 64
+
+
+def speed_label(speed):
+    return "instantâneo" if speed is None else f"{speed} eventos/quadro"
+
+
+def next_speed(speed):
+    """Próxima velocidade da lista `SPEEDS` (circular)."""
+    try:
+        i = SPEEDS.index(speed)
+    except ValueError:
+        return DEFAULT_SPEED
+    return SPEEDS[(i + 1) % len(SPEEDS)]
+
+
+class SearchPlayer:
+    """Aplica no grid os eventos de um gerador de busca, alguns por quadro.
+
+    Quando o gerador termina, `done` vira True e `result` recebe o valor
+    retornado pela busca (o caminho, ou None). `stats`, se informado, é o
+    dicionário de contadores que a busca preenche (veja `search_core.new_stats`).
+    `metrics` (`instrument.RunMetrics`), se informado, recebe o tempo de CPU
+    de cada quadro da busca e é fechado com o resultado.
+
+    Com `record`, os eventos aplicados ficam em `log` (e os estados de
+    partida em `base`), para gravar um trace (`searchtrace`).
+
+    O gerador pode produzir `None` quando ainda não tem eventos (ex.: busca
+    em outro processo, `search_worker`): o quadro termina ali. Uma exceção
+    do gerador encerra a reprodução e fica em `error` (a janela não cai).
+    """
+    # quantos eventos aplicar entre consultas ao relógio
+    CLOCK_EVERY = 64
+
+    def __init__(self, events, grid, speed=DEFAULT_SPEED, stats=None, metrics=None, record=False):
+        self.events = events
+        self.grid = grid
+        self.speed = speed
+        self.stats = stats
+        self.metrics = metrics
+        self.done = False
+        self.result = None
+        self.error = None
+        self.base = bytes(grid.cells) if record else None
+        self.log = array('q') if record else None
+        self.applied = 0
+
+    def step(self, budget=0.012):
+        """Aplica os eventos de um quadro; retorna True enquanto houver eventos.
+
+        `budget` é o tempo máximo (s) gasto neste quadro, qualquer que seja a
+        velocidade escolhida.
+        """
+        if self.done:
+            return False
+        limit = self.speed
+        set_state = self.grid.set_state
+        events = self.events
+        log = self.log
+        deadline = time.perf_counter() + budget
+        cpu = time.process_time()
+        applied = 0
+        try:
+            while limit is None or applied < limit:
+                event = next(events)
+                if event is None:
+                    break
+                set_state(event >> EVENT_SHIFT, event & EVENT_MASK)
+                if log is not None:
+                    log.append(event)
+                applied += 1
+                if applied % self.CLOCK_EVERY == 0 and time.perf_counter() > deadline:
+                    break
+        except StopIteration as stop:
+            self.done = True
+            self.result = stop.value
+        except Exception as exc:
+            self.done = True
+            self.error = exc
+        self.applied += applied
+        if self.metrics is not None:
+            if not self.metrics.recorded:
+                self.metrics.add_search(time.process_time() - cpu)
+            if self.done:
+                self.metrics.finish(self.result)
+        return not self.done
+
+    def close(self):
+        """Interrompe a reprodução e fecha o gerador (cancela a busca que o alimenta)."""
+        self.done = True
+        close = getattr(self.events, 'close', None)
+        if close is not None:
+            close()
+
+    def finish(self):
+        """Aplica todos os eventos restantes de uma vez e retorna o resultado."""
+        while self.step(budget=float('inf')):
+            pass
+        return self.result
+
+
+def record_callback_search(func, grid, start, end, metrics=None):
+    """Roda `func(draw, grid, start, end)` sem desenhar e devolve um gerador de eventos.
+
+    As mudanças de estado feitas pela função são gravadas (`grid.log`) e o grid
+    (estados e contadores) volta ao estado anterior; o gerador reproduz essas
+    mudanças e retorna o valor devolvido por `func`. Exceções de `func` (ex.:
+    `NotImplementedError`) são propagadas com o grid já restaurado.
+
+    Com `metrics` (`instrument.RunMetrics`), o tempo de CPU da função, as
+    chamadas a `draw()` e o pico da fronteira são registrados nele.
+    """
+    snapshot = bytes(grid.cells)
+    counts = list(grid.counts)
+    draw = metrics.wrap_draw(lambda: None) if metrics is not None else (lambda: None)
+    log = []
+    previous_log = grid.log
+    grid.log = log
+    cpu = time.process_time()
+    try:
+        result = func(draw, grid, start, end)
+    finally:
+        cpu = time.process_time() - cpu
+        grid.log = previous_log
+        grid.load_cells(snapshot)
+        grid.counts[:] = counts
+    if metrics is not None:
+        metrics.add_search(cpu - metrics.render_cpu)
+        metrics.observe_log(log, snapshot)
+        metrics.recorded = True
+    return _replay(log, result)
+
+
+def _replay(log, result):
+    yield from log
+    return result
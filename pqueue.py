@@ -0,0 +1,409 @@
+"""
+pqueue.py
+
+Filas de prioridade intercambiáveis para a lista aberta do A* e do Dijkstra.
+
+Os motores de `search_core` inserem entradas `(chave, desempate, sequência,
+índice)` e retiram a de menor chave. Como os custos no grid em 4 direções
+são inteiros pequenos, uma fila por baldes faz menos trabalho que um heap
+por comparação. `make_queue(nome, estratégia)` cria uma das filas de
+`QUEUES`:
+
+- `binary`: heap binário (`heapq`); com `decrease_key`, heap indexado que
+  ajusta a posição da entrada em vez de inserir outra;
+- `pairing`: heap de pareamento (inserção e diminuição de chave em O(1),
+  remoção amortizada em O(log n));
+- `dial`: fila de baldes de Dial, um balde por valor de chave; a remoção só
+  avança um ponteiro sobre os baldes vazios;
+- `radix`: heap radix, baldes pelo bit mais alto em que a chave difere da
+  última removida; cada entrada desce de balde no máximo uma vez por bit.
+
+`dial` e `radix` exigem chaves inteiras e monótonas (nenhuma inserção abaixo
+da última chave removida), o que vale para Dijkstra e A* com heurística
+consistente em 4 direções. Elas ordenam só pela chave: dentro de um mesmo
+valor a ordem é de inserção (`lifo=False`) ou inversa (`lifo=True`), em vez
+do desempate completo das filas por comparação.
+
+Estratégias (`STRATEGIES`):
+
+- `lazy`: uma nova entrada a cada melhoria; as antigas continuam na fila e
+  são descartadas pelo motor ao sair (nó já fechado);
+- `decrease_key`: no máximo uma entrada por nó; melhorar um nó já na fila
+  move a entrada existente (contada em `decreases`).
+
+Toda fila tem `push(entrada)`, `pop()`, `size()` e `counters()`, com os
+contadores próprios da estrutura, copiados para as estatísticas da busca.
+"""
+
+import heapq
+from collections import deque
+from functools import partial
+
+STRATEGIES = ('lazy', 'decrease_key')
+
+
+class BinaryHeap:
+    """Heap binário: `heapq` (lazy) ou heap indexado com diminuição de chave."""
+    name = 'binary'
+    integer_keys = False
+
+    def __init__(self, strategy='lazy', lifo=False):
+        self.strategy = strategy
+        self.heap = []
+        self.decreases = 0
+        self.size = self.heap.__len__
+        if strategy == 'lazy':
+            self.push = partial(heapq.heappush, self.heap)
+            self.pop = partial(heapq.heappop, self.heap)
+        else:
+            # posição de cada índice no heap
+            self.pos = {}
+            self.push = self._push_indexed
+            self.pop = self._pop_indexed
+
+    def counters(self):
+        return {'decreases': self.decreases}
+
+    def _sift_up(self, i):
+        heap, pos = self.heap, self.pos
+        entry = heap[i]
+        while i:
+            up = (i - 1) >> 1
+            above = heap[up]
+            if not entry < above:
+                break
+            heap[i] = above
+            pos[above[3]] = i
+            i = up
+        heap[i] = entry
+        pos[entry[3]] = i
+
+    def _sift_down(self, i):
+        heap, pos = self.heap, self.pos
+        n = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < entry:
+                break
+            heap[i] = heap[child]
+            pos[heap[i][3]] = i
+            i = child
+        heap[i] = entry
+        pos[entry[3]] = i
+
+    def _push_indexed(self, entry):
+        i = self.pos.get(entry[3])
+        if i is None:
+            self.heap.append(entry)
+            self._sift_up(len(self.heap) - 1)
+        elif entry < self.heap[i]:
+            self.decreases += 1
+            self.heap[i] = entry
+            self._sift_up(i)
+
+    def _pop_indexed(self):
+        heap = self.heap
+        top = heap[0]
+        del self.pos[top[3]]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        return top
+
+
+class PairingHeap:
+    """Heap de pareamento; nós são listas `[entrada, filho, irmão, anterior]`."""
+    name = 'pairing'
+    integer_keys = False
+
+    def __init__(self, strategy='lazy', lifo=False):
+        self.strategy = strategy
+        self.root = None
+        self.count = 0
+        self.links = 0
+        self.decreases = 0
+        # nó de cada índice na fila (só com decrease_key)
+        self.nodes = {} if strategy == 'decrease_key' else None
+
+    def size(self):
+        return self.count
+
+    def counters(self):
+        return {'decreases': self.decreases, 'links': self.links}
+
+    def _link(self, a, b):
+        # a raiz de maior chave vira o primeiro filho da outra
+        self.links += 1
+        if b[0] < a[0]:
+            a, b = b, a
+        first = a[1]
+        b[2] = first
+        if first is not None:
+            first[3] = b
+        b[3] = a
+        a[1] = b
+        return a
+
+    def push(self, entry):
+        nodes = self.nodes
+        if nodes is not None:
+            node = nodes.get(entry[3])
+            if node is not None:
+                if entry < node[0]:
+                    self._decrease(node, entry)
+                return
+        node = [entry, None, None, None]
+        if nodes is not None:
+            nodes[entry[3]] = node
+        self.count += 1
+        self.root = node if self.root is None else self._link(self.root, node)
+
+    def _decrease(self, node, entry):
+        self.decreases += 1
+        node[0] = entry
+        if node is self.root:
+            return
+        # separa a subárvore do nó e junta com a raiz
+        prev, after = node[3], node[2]
+        if prev[1] is node:
+            prev[1] = after
+        else:
+            prev[2] = after
+        if after is not None:
+            after[3] = prev
+        node[2] = node[3] = None
+        self.root = self._link(self.root, node)
+
+    def pop(self):
+        root = self.root
+        self.count -= 1
+        if self.nodes is not None:
+            del self.nodes[root[0][3]]
+        # dois passos: pares da esquerda para a direita, depois junta da direita para a esquerda
+        pairs = []
+        child = root[1]
+        while child is not None:
+            second = child[2]
+            child[2] = child[3] = None
+            if second is None:
+                pairs.append(child)
+                break
+            following = second[2]
+            second[2] = second[3] = None
+            pairs.append(self._link(child, second))
+            child = following
+        merged = pairs.pop() if pairs else None
+        while pairs:
+            merged = self._link(pairs.pop(), merged)
+        self.root = merged
+        return root[0]
+
+
+class BucketQueue:
+    """Fila de baldes de Dial: um balde por valor inteiro de chave."""
+    name = 'dial'
+    integer_keys = True
+
+    def __init__(self, strategy='lazy', lifo=False):
+        self.strategy = strategy
+        self.lifo = lifo
+        # balde `i` guarda a chave `base + i`; `current` é o da última remoção
+        self.buckets = []
+        self.base = 0
+        self.current = 0
+        self.last = None
+        self.count = 0
+        self.scanned = 0
+        self.decreases = 0
+        # chave de cada índice na fila (só com decrease_key)
+        self.where = {} if strategy == 'decrease_key' else None
+        if self.where is None:
+            self.push = self._push_lazy
+        if lifo:
+            self._take = list.pop if self.where is None else dict.popitem
+        else:
+            self._take = deque.popleft if self.where is None else _dict_popfirst
+
+    def size(self):
+        return self.count
+
+    def counters(self):
+        return {'decreases': self.decreases, 'scanned': self.scanned}
+
+    def _new_bucket(self):
+        if self.where is not None:
+            return {}
+        return [] if self.lifo else deque()
+
+    def _slot(self, key):
+        # casos raros do push: chave além do último balde ou abaixo do primeiro
+        slot = key - self.base
+        if slot < self.current:
+            if self.last is not None and key < self.last:
+                raise ValueError(f"chave {key} abaixo da última removida: a fila '{self.name}' é monótona")
+            # nada removido ainda: os baldes passam a começar nesta chave
+            shift = self.current - slot
+            self.buckets[:0] = [self._new_bucket() for _ in range(shift)]
+            self.base -= shift
+            self.current = slot = 0
+        buckets = self.buckets
+        while slot >= len(buckets):
+            buckets.append(self._new_bucket())
+        return slot
+
+    def _push_lazy(self, entry):
+        slot = entry[0] - self.base
+        if not self.current <= slot < len(self.buckets):
+            slot = self._slot(entry[0])
+        self.buckets[slot].append(entry)
+        self.count += 1
+
+    def push(self, entry):
+        key, index = entry[0], entry[3]
+        where = self.where
+        old = where.get(index)
+        if old is not None:
+            if key >= old:
+                return
+            del self.buckets[old - self.base][index]
+            self.count -= 1
+            self.decreases += 1
+        slot = key - self.base
+        if not self.current <= slot < len(self.buckets):
+            slot = self._slot(key)
+        where[index] = key
+        self.buckets[slot][index] = entry
+        self.count += 1
+
+    def pop(self):
+        buckets = self.buckets
+        i = self.current
+        while not buckets[i]:
+            i += 1
+        if i != self.current:
+            self.scanned += i - self.current
+            self.current = i
+        self.last = self.base + i
+        self.count -= 1
+        if self.where is not None:
+            index, entry = self._take(buckets[i])
+            del self.where[index]
+            return entry
+        return self._take(buckets[i])
+
+
+def _dict_popfirst(bucket):
+    # par (chave, valor) mais antigo do dicionário, na ordem de inserção
+    index = next(iter(bucket))
+    return index, bucket.pop(index)
+
+
+class RadixHeap:
+    """Heap radix: balde `i` guarda as chaves cujo bit mais alto diferente da última é `i - 1`."""
+    name = 'radix'
+    integer_keys = True
+
+    def __init__(self, strategy='lazy', lifo=False):
+        self.strategy = strategy
+        self.last = 0
+        self.count = 0
+        self.redistributed = 0
+        self.decreases = 0
+        self.lifo = lifo
+        self.where = {} if strategy == 'decrease_key' else None
+        # chaves iguais ficam sempre no mesmo balde, na ordem de inserção (a redistribuição a mantém)
+        if lifo:
+            self._take = list.pop if self.where is None else dict.popitem
+        else:
+            self._take = deque.popleft if self.where is None else _dict_popfirst
+        self.buckets = [self._new_bucket() for _ in range(65)]
+
+    def size(self):
+        return self.count
+
+    def counters(self):
+        return {'decreases': self.decreases, 'redistributed': self.redistributed}
+
+    def _new_bucket(self):
+        if self.where is not None:
+            return {}
+        return [] if self.lifo else deque()
+
+    def _place(self, entry):
+        b = (entry[0] ^ self.last).bit_length()
+        buckets = self.buckets
+        while b >= len(buckets):
+            buckets.append(self._new_bucket())
+        if self.where is not None:
+            buckets[b][entry[3]] = entry
+            self.where[entry[3]] = b
+        else:
+            buckets[b].append(entry)
+
+    def push(self, entry):
+        key = entry[0]
+        if key < self.last:
+            raise ValueError(f"chave {key} abaixo da última removida: a fila '{self.name}' é monótona")
+        where = self.where
+        if where is not None:
+            b = where.get(entry[3])
+            if b is not None:
+                old = self.buckets[b][entry[3]]
+                if key >= old[0]:
+                    return
+                del self.buckets[b][entry[3]]
+                self.count -= 1
+                self.decreases += 1
+        self._place(entry)
+        self.count += 1
+
+    def pop(self):
+        buckets = self.buckets
+        first = buckets[0]
+        if not first:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            bucket = buckets[i]
+            entries = list(bucket.values()) if self.where is not None else bucket
+            buckets[i] = self._new_bucket()
+            # a menor chave do balde vira a referência; as entradas descem de balde
+            self.last = min(entry[0] for entry in entries)
+            self.redistributed += len(entries)
+            for entry in entries:
+                self._place(entry)
+            first = buckets[0]
+        self.count -= 1
+        if self.where is not None:
+            index, entry = self._take(first)
+            del self.where[index]
+            return entry
+        return self._take(first)
+
+
+QUEUES = {
+    'binary': BinaryHeap,
+    'pairing': PairingHeap,
+    'dial': BucketQueue,
+    'radix': RadixHeap,
+}
+
+
+def make_queue(name='binary', strategy='lazy', lifo=False):
+    """Cria a fila `name` de `QUEUES` com a estratégia `strategy`.
+
+    `lifo` escolhe a ordem dentro de uma mesma chave nas filas por baldes.
+    """
+    try:
+        cls = QUEUES[name]
+    except KeyError:
+        raise ValueError(f"fila desconhecida: {name!r} (opções: {', '.join(QUEUES)})") from None
+    if strategy not in STRATEGIES:
+        raise ValueError(f"estratégia desconhecida: {strategy!r} (opções: {', '.join(STRATEGIES)})")
+    return cls(strategy, lifo)
@@ -0,0 +1,349 @@
+"""
+renderer.py
+
+Renderizador do grid com conjunto de células "sujas" e paleta indexada.
+
+Em vez de limpar a janela e desenhar todas as células a cada quadro, o
+`GridRenderer` repinta apenas as células alteradas desde o último quadro
+(registradas pelo `Grid` em `grid.dirty` pelos métodos `make_*`/`reset`).
+Quando é preciso redesenhar tudo (grid novo, tema, zoom ou deslocamento
+diferente, muitas alterações de uma vez), a parte visível do grid é
+rasterizada num único passo: o array de estados é convertido em cores pela
+paleta do tema (numpy) e ampliado para o tamanho das células.
+
+Só as células dentro da câmera (`viewport.Viewport`) são lidas e desenhadas;
+células sujas fora dela são descartadas. Na visão geral (menos de 1 px por
+célula), cada bloco de `step` x `step` células vira um pixel com o estado
+mais importante do bloco (`downsample`): início/fim, caminho, fronteira,
+fechados e por último obstáculos, então a busca continua visível num mapa
+inteiro reduzido. Linhas do grid e letras só aparecem com células grandes o
+bastante.
+
+Fontes e letras (I/F) ficam em cache, evitando criar `pygame.font.SysFont`
+a cada célula desenhada. Uma sobreposição translúcida opcional (ex.: mapa de
+calor do campo de fluxo, `field_overlay`) é aplicada por cima do grid e
+reaplicada só nas células repintadas.
+"""
+
+import numpy as np
+import pygame
+
+from grid_model import CLOSED, CLOSED_BACK, EMPTY, END, OBSTACLE, OPEN, OPEN_BACK, PATH, START
+from viewport import Viewport
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GREY = (128, 128, 128)
+
+# tamanhos mínimos de célula (px) para desenhar as linhas do grid e as letras
+LINE_MIN_GAP = 4
+LABEL_MIN_GAP = 10
+
+# visão geral: estados do menos ao mais importante (o bloco mostra o mais importante)
+OVERVIEW_ORDER = (EMPTY, OBSTACLE, CLOSED_BACK, CLOSED, OPEN_BACK, OPEN, PATH, END, START)
+# conjunto de estados de um bloco (bit `1 << código`) -> estado mais importante
+_STRONGEST = np.zeros(1 << len(OVERVIEW_ORDER), dtype=np.uint8)
+for _mask in range(1, len(_STRONGEST)):
+    _STRONGEST[_mask] = [code for code in OVERVIEW_ORDER if _mask >> code & 1][-1]
+_ONE = np.uint16(1)
+
+
+def downsample(states, step):
+    """Agrega blocos `step` x `step` de `states` (2D) no estado mais importante de cada um."""
+    if step == 1:
+        return states
+    h, w = states.shape
+    rows, cols = -(-h // step), -(-w // step)
+    # OU dos bits dos estados: linhas primeiro (fatias contíguas), depois colunas no
+    # array já reduzido; blocos incompletos na borda usam só as células que existem
+    bits = np.zeros((rows, w), dtype=np.uint16)
+    for k in range(step):
+        part = states[k::step]
+        bits[:len(part)] |= np.left_shift(_ONE, part, dtype=np.uint16)
+    blocks = np.zeros((rows, cols), dtype=np.uint16)
+    for k in range(step):
+        part = bits[:, k::step]
+        blocks[:, :part.shape[1]] |= part
+    return _STRONGEST[blocks]
+
+
+class GridRenderer:
+    """Desenha um `Grid` numa superfície, repintando só o que mudou.
+
+    - `labels`: dicionário código de estado -> letra desenhada na célula.
+    - `full_redraw_ratio`: fração de células sujas a partir da qual é mais
+      barato rasterizar o grid inteiro do que repintar célula a célula.
+    """
+    def __init__(self, labels=None, line_color=GREY, label_color=BLACK,
+                 background=WHITE, full_redraw_ratio=0.125):
+        self.labels = dict(labels or {})
+        self.line_color = line_color
+        self.label_color = label_color
+        self.background = background
+        self.full_redraw_ratio = full_redraw_ratio
+        self._fonts = {}
+        self._glyphs = {}
+        self._grid = None
+        self._view = None
+        self._view_key = None
+        # câmera própria quando `render` não recebe uma (grid inteiro na janela)
+        self._fit_view = None
+        self._palette = None
+        self._palette_array = None
+        self._needs_full = True
+        # regiões (r0, r1, c0, c1) a repintar no próximo quadro
+        self._regions = []
+        # superfície translúcida desenhada por cima do grid (ou None)
+        self.overlay = None
+
+    # --- invalidação ---
+    def invalidate(self):
+        """Força um redesenho completo no próximo quadro."""
+        self._needs_full = True
+
+    def set_overlay(self, surface):
+        """Define (ou remove, com None) a sobreposição desenhada sobre o grid."""
+        self.overlay = surface
+        self._needs_full = True
+
+    def invalidate_cells(self, indices):
+        """Marca células (índices lineares) para serem repintadas."""
+        if self._grid is not None and self._grid.dirty is not None:
+            self._grid.dirty.update(indices)
+
+    def invalidate_rect(self, rect):
+        """Marca para repintura as células cobertas por um retângulo em pixels.
+
+        Útil para apagar sobreposições desenhadas por cima do grid (destaque
+        do cursor, contorno do pincel, barra de status).
+        """
+        if self._view is None or rect is None:
+            return
+        region = self._view.region(rect)
+        if region is not None:
+            self._regions.append(region)
+
+    @property
+    def view(self):
+        """Câmera usada no último quadro (None antes do primeiro)."""
+        return self._view
+
+    # --- cache de fontes/letras ---
+    def font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            font = pygame.font.SysFont(None, size)
+            self._fonts[size] = font
+        return font
+
+    def glyph(self, letter, size):
+        key = (letter, size)
+        glyph = self._glyphs.get(key)
+        if glyph is None:
+            glyph = self.font(size).render(letter, True, self.label_color)
+            self._glyphs[key] = glyph
+        return glyph
+
+    # --- desenho ---
+    def render(self, win, grid, palette, view=None):
+        """Atualiza `win` e retorna a lista de retângulos alterados.
+
+        `palette` é uma sequência de cores indexada pelo código de estado e
+        `view` a câmera (`viewport.Viewport`); sem ela, o grid inteiro na
+        janela. O chamador decide como apresentar (ex.:
+        `pygame.display.update(rects)`).
+        """
+        if view is None:
+            view = self._fit(win, grid)
+        palette = tuple(palette)
+        if grid is not self._grid or view.key != self._view_key or palette != self._palette:
+            self._grid = grid
+            self._palette = palette
+            self._palette_array = np.array(palette, dtype=np.uint8)
+            self._needs_full = True
+        self._view = view
+        self._view_key = view.key
+
+        dirty = grid.dirty
+        if getattr(grid, 'full_redraw', False):
+            grid.full_redraw = False
+            self._needs_full = True
+        r0, r1, c0, c1 = view.visible()
+        if not self._needs_full and dirty is not None and \
+                len(dirty) > (r1 - r0) * (c1 - c0) * self.full_redraw_ratio:
+            self._needs_full = True
+
+        if self._needs_full:
+            self._needs_full = False
+            self._regions.clear()
+            if dirty is not None:
+                dirty.clear()
+            win.fill(self.background)
+            if r0 < r1 and c0 < c1:
+                self._paint_region(win, grid, view, r0, r1, c0, c1)
+            if self.overlay is not None:
+                win.blit(self.overlay, (0, 0))
+            return [win.get_rect()]
+
+        rects = [self._paint_region(win, grid, view, *region) for region in self._regions]
+        self._regions.clear()
+        if dirty:
+            if view.step == 1:
+                rects += [rect for rect in (self.paint_cell(win, grid, index, view) for index in dirty)
+                          if rect is not None]
+            else:
+                rects += self._paint_blocks(win, grid, view, dirty)
+            dirty.clear()
+        if self.overlay is not None:
+            for rect in rects:
+                win.blit(self.overlay, rect, rect)
+        return rects
+
+    def _fit(self, win, grid):
+        width, height = win.get_size()
+        view = self._fit_view
+        if view is None or (view.width, view.height, view.rows, view.cols) != (width, height, grid.rows, grid.cols):
+            view = self._fit_view = Viewport(width, height, grid.rows, grid.cols)
+        return view
+
+    def paint_cell(self, win, grid, index, view=None, palette=None):
+        """Pinta uma única célula (cor, linhas do grid e letra) e retorna seu retângulo.
+
+        Na visão geral, pinta o bloco que contém a célula. Retorna None se a
+        célula estiver fora da câmera.
+        """
+        view = view or self._view or self._fit(win, grid)
+        palette = palette if palette is not None else self._palette
+        row, col = divmod(index, grid.cols)
+        if not view.contains(row, col):
+            return None
+        gap, step = view.gap, view.step
+        if step > 1:
+            r0 = row - (row - view.top) % step
+            c0 = col - (col - view.left) % step
+            block = grid.read_block(r0, min(grid.rows, r0 + step), c0, min(grid.cols, c0 + step))
+            code = int(downsample(block, step)[0, 0])
+        else:
+            code = grid.cells[index]
+        x, y = view.pixel(row, col)
+        rect = pygame.Rect(x, y, gap, gap)
+        win.fill(palette[code], rect)
+        if gap >= LINE_MIN_GAP:
+            # linhas do grid pertencentes à célula (topo e esquerda)
+            win.fill(self.line_color, (x, y, gap, 1))
+            win.fill(self.line_color, (x, y, 1, gap))
+        letter = self.labels.get(code)
+        if letter and gap >= LABEL_MIN_GAP:
+            self._blit_label(win, letter, x, y, gap)
+        return rect
+
+    def _paint_blocks(self, win, grid, view, dirty):
+        # visão geral: repinta os blocos (1 px cada) que contêm células sujas visíveis
+        step, gap = view.step, view.gap
+        r0, r1, c0, c1 = view.visible()
+        index = np.fromiter(dirty, dtype=np.int64, count=len(dirty))
+        rows, cols = np.divmod(index, grid.cols)
+        inside = (rows >= r0) & (rows < r1) & (cols >= c0) & (cols < c1)
+        if not inside.any():
+            return []
+        across = -(-(c1 - c0) // step)
+        blocks = np.unique((rows[inside] - r0) // step * across + (cols[inside] - c0) // step)
+        brow, bcol = np.divmod(blocks, across)
+        # só o retângulo que envolve os blocos é lido; de cada bloco, só as suas células
+        top, left = int(brow.min()), int(bcol.min())
+        states = grid.read_block(r0 + top * step, min(r1, r0 + (int(brow.max()) + 1) * step),
+                                 c0 + left * step, min(c1, c0 + (int(bcol.max()) + 1) * step))
+        offsets = np.arange(step)
+        rr = np.minimum((brow - top)[:, None] * step + offsets, states.shape[0] - 1)
+        cc = np.minimum((bcol - left)[:, None] * step + offsets, states.shape[1] - 1)
+        bits = np.left_shift(_ONE, states[rr[:, :, None], cc[:, None, :]], dtype=np.uint16)
+        codes = _STRONGEST[np.bitwise_or.reduce(bits.reshape(len(bits), -1), axis=1)]
+        palette = self._palette
+        rects = []
+        for br, bc, code in zip(brow.tolist(), bcol.tolist(), codes.tolist()):
+            rect = pygame.Rect(bc * gap, br * gap, gap, gap)
+            win.fill(palette[code], rect)
+            rects.append(rect)
+        return rects
+
+    def _blit_label(self, win, letter, x, y, gap):
+        try:
+            txt = self.glyph(letter, max(12, gap // 2))
+        except Exception:
+            return
+        win.blit(txt, txt.get_rect(center=(x + gap // 2, y + gap // 2)))
+
+    def _paint_region(self, win, grid, view, r0, r1, c0, c1):
+        # rasteriza as células r0:r1, c0:c1 (alinhadas aos blocos) e retorna o retângulo pintado
+        gap = view.gap
+        # só a região é lida (grids em blocos carregam só esses blocos)
+        states = downsample(grid.read_block(r0, r1, c0, c1), view.step)
+        rows, cols = states.shape
+        # paleta indexada: (rows, cols) -> (rows, cols, 3); surfarray espera (x, y)
+        rgb = self._palette_array[states]
+        small = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+        x, y = view.pixel(r0, c0)
+        rect = pygame.Rect(x, y, cols * gap, rows * gap)
+        win.blit(small if gap == 1 else pygame.transform.scale(small, rect.size), rect)
+
+        if gap >= LINE_MIN_GAP:
+            for i in range(rows):
+                win.fill(self.line_color, (x, y + i * gap, rect.width, 1))
+            for j in range(cols):
+                win.fill(self.line_color, (x + j * gap, y, 1, rect.height))
+
+        if self.labels and gap >= LABEL_MIN_GAP:
+            codes = np.fromiter(self.labels, dtype=np.uint8)
+            for row, col in zip(*np.nonzero(np.isin(states, codes))):
+                self._blit_label(win, self.labels[int(states[row, col])],
+                                 x + int(col) * gap, y + int(row) * gap, gap)
+        return rect
+
+
+# cores do mapa de calor: perto do objetivo -> longe
+HEAT_NEAR = (255, 70, 0)
+HEAT_FAR = (40, 90, 255)
+ARROW = (0, 0, 0, 200)
+
+
+def field_overlay(dist, nxt, view, alpha=110, arrows=True):
+    """Sobreposição de um campo de distâncias na câmera `view`: mapa de calor e setas.
+
+    `dist` e `nxt` são arrays (numpy) com a distância ao objetivo e o índice
+    da próxima célula (-1 = inalcançável / nenhuma) de todo o grid; só a parte
+    visível é desenhada (na visão geral, uma célula por bloco). As setas só
+    são desenhadas se as células tiverem pelo menos 10 px.
+    """
+    rows, cols, step, gap = view.rows, view.cols, view.step, view.gap
+    r0, r1, c0, c1 = view.visible()
+    full = np.asarray(dist).reshape(rows, cols)
+    dist = full[r0:r1:step, c0:c1:step]
+    reach = dist >= 0
+    t = dist / max(1, int(full.max()))
+    near = np.array(HEAT_NEAR, dtype=np.float64)
+    far = np.array(HEAT_FAR, dtype=np.float64)
+    h, w = dist.shape
+    rgba = np.zeros((h, w, 4), dtype=np.uint8)
+    rgba[..., :3] = (near + (far - near) * t[..., None]).astype(np.uint8)
+    rgba[..., 3] = np.where(reach, alpha, 0)
+    small = pygame.image.frombuffer(rgba.tobytes(), (w, h), 'RGBA')
+    surface = pygame.Surface((view.width, view.height), pygame.SRCALPHA)
+    surface.blit(pygame.transform.scale(small, (w * gap, h * gap)), (0, 0))
+
+    if arrows and gap >= 10:
+        half = gap // 2
+        tip = max(2, gap // 4)
+        nxt = np.asarray(nxt).reshape(rows, cols)[r0:r1, c0:c1]
+        for row, col in zip(*np.nonzero(nxt >= 0)):
+            nrow, ncol = divmod(int(nxt[row, col]), cols)
+            row, col = int(row) + r0, int(col) + c0
+            dr, dc = nrow - row, ncol - col
+            cx, cy = (col - c0) * gap + half, (row - r0) * gap + half
+            head = (cx + dc * tip, cy + dr * tip)
+            pygame.draw.line(surface, ARROW, (cx - dc * tip, cy - dr * tip), head, 1)
+            # ponta: dois traços a 45 graus voltando da cabeça
+            back = tip // 2 + 1
+            for side in (1, -1):
+                pygame.draw.line(surface, ARROW, head, (head[0] - (dc + side * dr) * back,
+                                                        head[1] - (dr - side * dc) * back), 1)
+    return surface
@@ -0,0 +1,529 @@
+"""
+search_core.py
+
+Buscas que rodam sem janela:
+
+- `dumb_search`: placeholder "burro e lento" usado enquanto os alunos
+  implementam os algoritmos;
+- `astar` / `dijkstra`: motores de referência com heap binário (`heapq`)
+  e remoção preguiçosa, política de desempate configurável e heurísticas
+  Manhattan (4 direções) e octil (8 direções). São a linha de base ótima
+  com a qual as implementações dos alunos e os demais motores são comparados.
+  A lista aberta pode ser trocada por outra fila de `pqueue` (`queue=`,
+  `strategy=`): heap de pareamento, baldes de Dial ou heap radix;
+- `bidir_astar` / `bidir_dijkstra`: as mesmas buscas crescendo ao mesmo
+  tempo a partir do início e do fim, com critério de parada que mantém o
+  caminho ótimo.
+
+Cada busca existe como gerador (`iter_*`) que não dorme nem desenha: emite
+eventos compactos `índice << EVENT_SHIFT | estado` (abertos, fechados e
+caminho) e retorna o caminho. `run_events` aplica os eventos no grid de uma
+vez (com `draw` opcional); o visualizador consome o mesmo fluxo quadro a
+quadro (veja `playback.py`).
+"""
+
+import heapq
+import math
+import numbers
+import random
+
+from pqueue import make_queue
+
+from grid_model import (
+    CLOSED, CLOSED_BACK, DOWN, DOWN_LEFT, DOWN_RIGHT, END, EVENT_MASK, EVENT_SHIFT, LEFT, OPEN,
+    OPEN_BACK, PATH, RIGHT, UP, UP_LEFT, UP_RIGHT,
+)
+
+SQRT2 = math.sqrt(2.0)
+
+
+def iter_dumb_search(grid, start, end):
+    """Gerador de eventos da busca "burra" (DFS aleatória); retorna o caminho ou None."""
+    cells = grid.cells
+    parent = grid.parent
+    steps = neighbor_steps(grid)
+    source, target = start.index, end.index
+    visited = set()
+    stack = [source]
+    parent[source] = -1
+
+    while stack:
+        current = stack.pop()
+        if current in visited:
+            continue
+        visited.add(current)
+
+        # Marca nós para visual (fechado/vermelho)
+        if current != source and current != target:
+            yield current << EVENT_SHIFT | CLOSED
+
+        if current == target:
+            return (yield from _emit_path(parent, source, target))
+
+        # Empilha vizinhos em ordem aleatória
+        neighbors = [n for n, _ in steps(current)]
+        random.shuffle(neighbors)
+        for n in neighbors:
+            if n not in visited:
+                parent[n] = current
+                if cells[n] != END:
+                    yield n << EVENT_SHIFT | OPEN
+                stack.append(n)
+
+    return None
+
+
+def dumb_search(draw, grid, start, end):
+    """
+    "Burro e lento": caminhada aleatória com marcação de visitados e backtracking simples.
+    Serve como placeholder enquanto os alunos implementam algoritmos reais em outros arquivos.
+    """
+    return run_events(iter_dumb_search(grid, start, end), grid, draw) is not None
+
+
+def run_events(events, grid, draw=None):
+    """Aplica no grid todos os eventos de um gerador de busca e retorna seu resultado.
+
+    `draw`, se informado, é chamado a cada célula fechada (uma expansão) e
+    ao final — o mesmo ritmo do contrato `draw` das funções dos alunos.
+    """
+    set_state = grid.set_state
+    if draw is None:
+        try:
+            while True:
+                event = next(events)
+                set_state(event >> EVENT_SHIFT, event & EVENT_MASK)
+        except StopIteration as stop:
+            return stop.value
+    try:
+        while True:
+            event = next(events)
+            code = event & EVENT_MASK
+            set_state(event >> EVENT_SHIFT, code)
+            if code == CLOSED or code == CLOSED_BACK:
+                draw()
+    except StopIteration as stop:
+        draw()
+        return stop.value
+
+
+def _emit_path(parent, source, target):
+    """Reconstrói o caminho por `parent` emitindo PATH para as células intermediárias."""
+    path = [target]
+    node = parent[target]
+    while node != -1:
+        path.append(node)
+        node = parent[node]
+    path.reverse()
+    for i in path[1:-1]:
+        yield i << EVENT_SHIFT | PATH
+    return path
+
+
+def path_from_parents(grid, start, end):
+    """Reconstrói o caminho seguindo `grid.parent` a partir de `end`.
+
+    Retorna a lista de índices lineares de `start` até `end`, ou None se a
+    cadeia de pais não chegar em `start` (ex.: busca sem sucesso).
+    """
+    parent = grid.parent
+    target = start.index
+    path = [end.index]
+    current = end.index
+    limit = grid.rows * grid.cols
+    while current != target:
+        current = parent[current]
+        if current < 0 or len(path) > limit:
+            return None
+        path.append(current)
+    path.reverse()
+    return path
+
+
+def path_cost(grid, path):
+    """Custo de um caminho (1 por passo ortogonal, sqrt(2) por diagonal)."""
+    cols = grid.cols
+    cost = 0.0
+    for a, b in zip(path, path[1:]):
+        ar, ac = divmod(a, cols)
+        br, bc = divmod(b, cols)
+        cost += 1.0 if ar == br or ac == bc else SQRT2
+    return cost
+
+
+def path_cells(grid):
+    """Índices das células marcadas como caminho (PATH) no grid."""
+    return [i for i, code in enumerate(grid.cells) if code == PATH]
+
+
+# --- Heurísticas (recebem deslocamentos absolutos em linhas/colunas) ---
+
+def zero_heuristic(dr, dc):
+    return 0
+
+
+def manhattan(dr, dc):
+    """Distância exata num grid 4-direções sem obstáculos."""
+    return dr + dc
+
+
+def octile(dr, dc):
+    """Distância exata num grid 8-direções (diagonal custa sqrt(2))."""
+    if dr > dc:
+        dr, dc = dc, dr
+    return dc + (SQRT2 - 1.0) * dr
+
+
+HEURISTICS = {
+    'zero': zero_heuristic,
+    'manhattan': manhattan,
+    'octile': octile,
+}
+
+# Desempate entre nós com o mesmo f:
+# - 'high_g': prefere o maior g (mais perto do objetivo) — expande menos em campos abertos;
+# - 'low_g': prefere o menor g;
+# - 'fifo' / 'lifo': só pela ordem de inserção.
+TIE_BREAKS = ('high_g', 'low_g', 'fifo', 'lifo')
+
+
+def neighbor_steps(grid, diagonal=False):
+    """Retorna `steps(index)`, que gera `(vizinho, custo)` das células livres.
+
+    Lê a máscara de adjacência mantida pelo grid (`grid.adj`), sem checar
+    limites nem alocar listas. Em 8 direções a diagonal só é permitida se as
+    duas células ortogonais estiverem livres (não corta quinas de obstáculos).
+    """
+    cols = grid.cols
+    adj = grid.adj
+
+    def steps4(i):
+        m = adj[i]
+        if m & DOWN:
+            yield i + cols, 1
+        if m & UP:
+            yield i - cols, 1
+        if m & RIGHT:
+            yield i + 1, 1
+        if m & LEFT:
+            yield i - 1, 1
+
+    def steps8(i):
+        m = adj[i]
+        if m & DOWN:
+            yield i + cols, 1
+            if m & RIGHT and m & DOWN_RIGHT:
+                yield i + cols + 1, SQRT2
+            if m & LEFT and m & DOWN_LEFT:
+                yield i + cols - 1, SQRT2
+        if m & UP:
+            yield i - cols, 1
+            if m & RIGHT and m & UP_RIGHT:
+                yield i - cols + 1, SQRT2
+            if m & LEFT and m & UP_LEFT:
+                yield i - cols - 1, SQRT2
+        if m & RIGHT:
+            yield i + 1, 1
+        if m & LEFT:
+            yield i - 1, 1
+
+    return steps8 if diagonal else steps4
+
+
+def new_stats():
+    """Contadores preenchidos pelos motores de busca."""
+    return {'expanded': 0, 'pushes': 0, 'pops': 0, 'stale': 0, 'decreases': 0, 'peak_heap': 0,
+            'cost': None, 'queue': None}
+
+
+def iter_astar(grid, start, end, heuristic=None, diagonal=False, tie_break='high_g',
+               stats=None, queue='binary', strategy='lazy'):
+    """A* como gerador; por padrão com heap binário e remoção preguiçosa.
+
+    Entradas repetidas de um nó ficam no heap e são descartadas ao sair se
+    já estiverem fechadas. Não altera os estados do grid: emite eventos
+    `índice << EVENT_SHIFT | estado` (OPEN, CLOSED, PATH) e retorna a lista de
+    índices do caminho (início..fim) ou None. Os pais são gravados em
+    `grid.parent`; `stats` (ver `new_stats`) é atualizado se informado, com
+    os contadores da fila em `stats['queue']`.
+
+    `queue` e `strategy` escolhem a lista aberta (`pqueue.QUEUES`,
+    `pqueue.STRATEGIES`). As filas por baldes (`dial`, `radix`) precisam de
+    f inteiro: só em 4 direções e com heurística inteira (`zero`,
+    `manhattan` ou uma função que devolva `int`).
+
+    Os parâmetros são conferidos já na chamada (`ValueError`), antes da
+    primeira iteração.
+    """
+    if heuristic is None:
+        heuristic = octile if diagonal else manhattan
+    elif isinstance(heuristic, str):
+        heuristic = HEURISTICS[heuristic]
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"desempate desconhecido: {tie_break!r}")
+    if stats is None:
+        stats = new_stats()
+    # nas filas por baldes, o último inserido primeiro aproxima o desempate por maior g
+    open_list = make_queue(queue, strategy, lifo=tie_break in ('high_g', 'lifo'))
+    if open_list.integer_keys:
+        if diagonal:
+            raise ValueError(f"a fila {queue!r} precisa de custos inteiros (sem diagonais)")
+        (sr, sc), (tr, tc) = divmod(start.index, grid.cols), divmod(end.index, grid.cols)
+        if not isinstance(heuristic(abs(sr - tr), abs(sc - tc)), numbers.Integral):
+            name = getattr(heuristic, '__name__', repr(heuristic))
+            raise ValueError(f"a fila {queue!r} precisa de f inteiro: a heurística {name} não devolve inteiros")
+    return _iter_astar(grid, start, end, heuristic, diagonal, tie_break, stats, open_list, queue, strategy)
+
+
+def _iter_astar(grid, start, end, heuristic, diagonal, tie_break, stats, open_list, queue, strategy):
+    # corpo de `iter_astar`, com os parâmetros já conferidos
+    push, pop, size = open_list.push, open_list.pop, open_list.size
+
+    cols = grid.cols
+    cells = grid.cells
+    parent = grid.parent
+    steps = neighbor_steps(grid, diagonal)
+    source, target = start.index, end.index
+    tr, tc = divmod(target, cols)
+
+    def h(i):
+        r, c = divmod(i, cols)
+        return heuristic(abs(r - tr), abs(c - tc))
+
+    # chave do heap: (f, desempate, sequência, índice)
+    high_g = tie_break == 'high_g'
+    low_g = tie_break == 'low_g'
+    seq_sign = -1 if tie_break == 'lifo' else 1
+    seq = 0
+    g = {source: 0}
+    closed = set()
+    parent[source] = -1
+    push((h(source), 0, 0, source))
+    pushes = 1
+    pops = stale = expanded = 0
+    peak = 1
+    found = False
+
+    while size():
+        current = pop()[3]
+        pops += 1
+        if current in closed:
+            stale += 1
+            continue
+        closed.add(current)
+
+        if current == target:
+            found = True
+            break
+
+        expanded += 1
+        if current != source:
+            yield current << EVENT_SHIFT | CLOSED
+        g_current = g[current]
+        for n, cost in steps(current):
+            if n in closed:
+                continue
+            tentative = g_current + cost
+            if tentative < g.get(n, math.inf):
+                g[n] = tentative
+                parent[n] = current
+                seq += 1
+                tb = -tentative if high_g else (tentative if low_g else 0)
+                push((tentative + h(n), tb, seq * seq_sign, n))
+                pushes += 1
+                if cells[n] != END:
+                    yield n << EVENT_SHIFT | OPEN
+        if size() > peak:
+            peak = size()
+
+    counters = open_list.counters()
+    stats['expanded'] += expanded
+    stats['pushes'] += pushes
+    stats['pops'] += pops
+    stats['stale'] += stale
+    stats['decreases'] += counters['decreases']
+    stats['peak_heap'] = max(stats['peak_heap'], peak)
+    stats['queue'] = dict(counters, name=queue, strategy=strategy)
+    if not found:
+        return None
+    stats['cost'] = g[target]
+    return (yield from _emit_path(parent, source, target))
+
+
+def iter_dijkstra(grid, start, end, diagonal=False, tie_break='fifo', stats=None,
+                  queue='binary', strategy='lazy'):
+    """Dijkstra como gerador: A* com heurística nula."""
+    return iter_astar(grid, start, end, heuristic=zero_heuristic, diagonal=diagonal,
+                      tie_break=tie_break, stats=stats, queue=queue, strategy=strategy)
+
+
+def astar(grid, start, end, heuristic=None, diagonal=False, tie_break='high_g',
+          draw=None, stats=None, queue='binary', strategy='lazy'):
+    """Roda `iter_astar` aplicando os eventos no grid; retorna o caminho ou None.
+
+    `draw`, se informado, é chamado após cada expansão.
+    """
+    return run_events(iter_astar(grid, start, end, heuristic, diagonal, tie_break, stats,
+                                 queue, strategy), grid, draw)
+
+
+def dijkstra(grid, start, end, diagonal=False, tie_break='fifo', draw=None, stats=None,
+             queue='binary', strategy='lazy'):
+    """Dijkstra: A* com heurística nula (mesma estrutura de fila e desempate)."""
+    return run_events(iter_dijkstra(grid, start, end, diagonal, tie_break, stats, queue, strategy),
+                      grid, draw)
+
+
+def iter_bidirectional(grid, start, end, heuristic=None, diagonal=False, stats=None):
+    """A* bidirecional (ou Dijkstra, com `heuristic='zero'`) como gerador.
+
+    Uma busca parte do início (eventos OPEN/CLOSED) e outra do fim
+    (OPEN_BACK/CLOSED_BACK); a cada passo avança a que tem a fronteira menor.
+    Usa potenciais médios, `p(v) = (h_fim(v) - h_início(v)) / 2` para a frente
+    e `-p(v)` para trás, que tornam as duas buscas consistentes entre si.
+    `mu` guarda o melhor caminho visto onde as fronteiras se tocam, e a busca
+    para quando o topo das duas filas somado alcança `mu` — a partir daí
+    nenhum caminho pode ser mais curto, então o resultado é ótimo.
+
+    Além dos contadores de `new_stats`, `stats` recebe as expansões e o
+    tamanho final da fronteira de cada lado (`expanded_forward`,
+    `expanded_backward`, `frontier_forward`, `frontier_backward`).
+    """
+    if heuristic is None:
+        heuristic = octile if diagonal else manhattan
+    elif isinstance(heuristic, str):
+        heuristic = HEURISTICS[heuristic]
+    if stats is None:
+        stats = new_stats()
+
+    cols = grid.cols
+    parent = grid.parent
+    steps = neighbor_steps(grid, diagonal)
+    source, target = start.index, end.index
+    sr, sc = divmod(source, cols)
+    tr, tc = divmod(target, cols)
+
+    def potential(i):
+        r, c = divmod(i, cols)
+        return (heuristic(abs(r - tr), abs(c - tc)) - heuristic(abs(r - sr), abs(c - sc))) / 2.0
+
+    if source == target:
+        # início = fim: nenhuma das fronteiras chega a expandir
+        parent[source] = -1
+        stats['cost'] = 0
+        return [source]
+
+    # lado 0 = a partir do início, lado 1 = a partir do fim
+    g = ({source: 0}, {target: 0})
+    came = ({source: -1}, {target: -1})
+    closed = (set(), set())
+    sign = (1, -1)
+    open_code = (OPEN, OPEN_BACK)
+    closed_code = (CLOSED, CLOSED_BACK)
+    # chave: (chave com potencial, -g, sequência, índice) — desempate pelo maior g
+    heaps = ([(potential(source), 0, 0, source)], [(-potential(target), 0, 0, target)])
+    expanded = [0, 0]
+    pushes = 2
+    pops = stale = 0
+    peak = 2
+    seq = 0
+    mu = math.inf
+    meet = None
+
+    def top(side):
+        # descarta entradas já fechadas do topo; retorna a menor chave
+        nonlocal pops, stale
+        heap = heaps[side]
+        done = closed[side]
+        while heap and heap[0][3] in done:
+            heapq.heappop(heap)
+            pops += 1
+            stale += 1
+        return heap[0][0] if heap else math.inf
+
+    # com uma fila vazia a soma é infinita: para também quando não há caminho
+    while top(0) + top(1) < mu:
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        g_side, g_other = g[side], g[1 - side]
+        came_side = came[side]
+        done = closed[side]
+        current = heapq.heappop(heaps[side])[3]
+        pops += 1
+        done.add(current)
+        expanded[side] += 1
+        if current != source and current != target:
+            yield current << EVENT_SHIFT | closed_code[side]
+        g_current = g_side[current]
+        for n, cost in steps(current):
+            if n in done:
+                continue
+            tentative = g_current + cost
+            if tentative < g_side.get(n, math.inf):
+                g_side[n] = tentative
+                came_side[n] = current
+                seq += 1
+                heapq.heappush(heaps[side], (tentative + sign[side] * potential(n), -tentative, seq, n))
+                pushes += 1
+                if n != source and n != target:
+                    yield n << EVENT_SHIFT | open_code[side]
+            # as fronteiras se tocam: candidato a melhor caminho
+            other = g_other.get(n)
+            if other is not None and g_current + cost + other < mu:
+                mu = g_current + cost + other
+                meet = (current, n) if side == 0 else (n, current)
+        size = len(heaps[0]) + len(heaps[1])
+        if size > peak:
+            peak = size
+
+    stats['expanded'] += expanded[0] + expanded[1]
+    stats['pushes'] += pushes
+    stats['pops'] += pops
+    stats['stale'] += stale
+    stats['peak_heap'] = max(stats['peak_heap'], peak)
+    stats['expanded_forward'] = stats.get('expanded_forward', 0) + expanded[0]
+    stats['expanded_backward'] = stats.get('expanded_backward', 0) + expanded[1]
+    stats['frontier_forward'] = len(set(g[0]) - closed[0])
+    stats['frontier_backward'] = len(set(g[1]) - closed[1])
+    if meet is None:
+        return None
+    stats['cost'] = mu
+
+    # junta as duas metades: início..u pela frente, v..fim por trás
+    u, v = meet
+    path = []
+    node = u
+    while node != -1:
+        path.append(node)
+        node = came[0][node]
+    path.reverse()
+    node = v
+    while node != -1:
+        path.append(node)
+        node = came[1][node]
+    # deixa a cadeia de pais completa (path_from_parents funciona como no A*)
+    parent[source] = -1
+    for a, b in zip(path, path[1:]):
+        parent[b] = a
+    for i in path[1:-1]:
+        yield i << EVENT_SHIFT | PATH
+    return path
+
+
+def iter_bidir_astar(grid, start, end, heuristic=None, diagonal=False, stats=None):
+    """A* bidirecional como gerador (veja `iter_bidirectional`)."""
+    return (yield from iter_bidirectional(grid, start, end, heuristic, diagonal, stats))
+
+
+def iter_bidir_dijkstra(grid, start, end, diagonal=False, stats=None):
+    """Dijkstra bidirecional como gerador: sem heurística."""
+    return (yield from iter_bidirectional(grid, start, end, zero_heuristic, diagonal, stats))
+
+
+def bidir_astar(grid, start, end, heuristic=None, diagonal=False, draw=None, stats=None):
+    """Roda o A* bidirecional aplicando os eventos no grid; retorna o caminho ou None."""
+    return run_events(iter_bidir_astar(grid, start, end, heuristic, diagonal, stats), grid, draw)
+
+
+def bidir_dijkstra(grid, start, end, diagonal=False, draw=None, stats=None):
+    """Roda o Dijkstra bidirecional aplicando os eventos no grid; retorna o caminho ou None."""
+    return run_events(iter_bidir_dijkstra(grid, start, end, diagonal, stats), grid, draw)
@@ -0,0 +1,197 @@
+"""
+search_worker.py
+
+Busca `(draw, grid, start, end)` num processo separado, com progresso
+transmitido à janela.
+
+Uma função de aluno lenta (ou em laço infinito) rodando na thread da janela
+congela o visualizador. `iter_search_worker` roda a função num processo
+filho, sobre uma cópia do grid, e devolve um gerador de eventos para o
+`playback.SearchPlayer`:
+
+- o filho grava as mudanças de estado (`grid.log`) e as envia pelo canal em
+  lotes, a cada `draw()` (no máximo uma vez por `FLUSH_SECONDS`) ou a cada
+  `BATCH` eventos, junto com o tempo de CPU e as chamadas a `draw()` até ali;
+- o gerador repassa os eventos que já chegaram e produz `None` quando não há
+  nada novo, então a janela continua tratando a entrada a cada quadro;
+- ao fim, o filho envia o resultado e o caminho pelos pais, que são
+  copiados para o grid da janela.
+
+O gerador esvazia o canal a cada `FLUSH_SECONDS`, guardando os lotes ainda
+não reproduzidos, então o filho nunca espera a janela. Passados `timeout`
+segundos desde o início sem o filho terminar, o processo é encerrado e o
+gerador levanta `SearchTimeout` na volta seguinte, mesmo com eventos ainda
+por mostrar: o limite mede a busca, não a velocidade da reprodução. Fechar o gerador (`close()`, ou largá-lo)
+também encerra o processo: é assim que a busca é cancelada. Exceções da
+função voltam como `SearchFailed`, exceto `NotImplementedError`, que é
+levantada de novo como tal (função da atividade ainda não implementada).
+"""
+
+import multiprocessing
+import signal
+import time
+import traceback
+from array import array
+from collections import deque
+
+from grid_model import Grid, Node
+from search_core import path_from_parents
+
+# tempo máximo (s) esperando o processo da busca; None = sem limite
+DEFAULT_TIMEOUT = 30.0
+# eventos por lote e intervalo mínimo entre envios disparados por draw()
+BATCH = 4096
+FLUSH_SECONDS = 0.02
+
+
+class SearchTimeout(TimeoutError):
+    """A busca passou do tempo limite e o processo foi encerrado."""
+
+
+class SearchFailed(RuntimeError):
+    """A função de busca levantou uma exceção (ou o processo morreu)."""
+
+
+class _StreamLog(list):
+    """`grid.log` do processo filho: envia os eventos pelo canal em lotes."""
+    def __init__(self, conn):
+        super().__init__()
+        self.conn = conn
+        self.draws = 0
+        self.cpu0 = time.process_time()
+        self.sent = time.perf_counter()
+
+    def append(self, event):
+        list.append(self, event)
+        if len(self) >= BATCH:
+            self.flush()
+
+    def draw(self):
+        self.draws += 1
+        if self and time.perf_counter() - self.sent >= FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self):
+        self.conn.send(('events', array('q', self).tobytes(), time.process_time() - self.cpu0, self.draws))
+        self.clear()
+        self.sent = time.perf_counter()
+
+
+def _run_child(conn, func, rows, cols, cells, start, end):
+    # um filho criado por fork herda o tratador de SIGTERM do SDL (pygame.init), que
+    # só enfileira um evento QUIT: sem o padrão de volta, terminate() não encerra a busca
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    grid = Grid(rows, cols, 1)
+    grid.dirty = None
+    grid.load_cells(cells)
+    log = grid.log = _StreamLog(conn)
+    try:
+        result = func(log.draw, grid, Node(grid, start), Node(grid, end))
+    except BaseException as exc:
+        grid.log = None
+        log.flush()
+        conn.send(('error', type(exc).__name__, str(exc), traceback.format_exc()))
+        return
+    grid.log = None
+    log.flush()
+    if isinstance(result, list):
+        path = result
+    else:
+        result = bool(result)
+        path = path_from_parents(grid, Node(grid, start), Node(grid, end)) if result else None
+    conn.send(('done', result, path, time.process_time() - log.cpu0, log.draws))
+    conn.close()
+
+
+def iter_search_worker(func, grid, start, end, timeout=DEFAULT_TIMEOUT, metrics=None):
+    """Roda `func(draw, grid, start, end)` num processo e gera seus eventos.
+
+    `func` precisa poder ser importada pelo processo filho (função de nível
+    de módulo). Gera `None` enquanto espera o filho e retorna o valor
+    devolvido por `func` (o caminho é gravado em `grid.parent`). Com
+    `metrics` (`instrument.RunMetrics`), CPU da busca, chamadas a `draw()` e
+    pico da fronteira vêm do processo filho. `grid` é um `Grid` comum: as
+    células são copiadas inteiras para o filho (um `TiledGrid` não serve).
+    """
+    snapshot = bytes(grid.cells)
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_run_child, args=(sender, func, grid.rows, grid.cols, snapshot, start.index, end.index),
+        daemon=True)
+    process.start()
+    sender.close()
+    deadline = time.perf_counter() + timeout if timeout else None
+    seen = [] if metrics is not None else None
+    if metrics is not None:
+        metrics.recorded = True
+    # lotes recebidos e ainda não repassados; mensagem final ('done'/'error') do filho
+    pending = deque()
+    final = None
+
+    def drain():
+        # lê tudo o que o filho já enviou, sem esperar
+        nonlocal final
+        while final is None and receiver.poll():
+            try:
+                message = receiver.recv()
+            except EOFError:
+                raise SearchFailed("o processo da busca terminou sem resposta") from None
+            if message[0] == 'events':
+                _, data, cpu, draws = message
+                events = array('q')
+                events.frombytes(data)
+                if metrics is not None:
+                    metrics.search_cpu = cpu
+                    metrics.draw_calls = draws
+                    seen.extend(events)
+                pending.append(events)
+            else:
+                final = message
+        if final is None and deadline is not None and time.perf_counter() > deadline:
+            raise SearchTimeout(f"a busca passou de {timeout:g} s e foi interrompida")
+
+    try:
+        while True:
+            drain()
+            if pending:
+                # repassa o lote, voltando a ler o canal e a conferir o prazo de tempos em tempos
+                clock = time.perf_counter
+                next_drain = clock() + FLUSH_SECONDS
+                for event in pending.popleft():
+                    yield event
+                    if clock() >= next_drain:
+                        drain()
+                        next_drain = clock() + FLUSH_SECONDS
+                continue
+            if final is None:
+                if not process.is_alive() and not receiver.poll():
+                    raise SearchFailed(f"o processo da busca terminou sem resposta (código {process.exitcode})")
+                yield None
+                continue
+            if final[0] == 'done':
+                _, result, path, cpu, draws = final
+                if path:
+                    parent = grid.parent
+                    parent[path[0]] = -1
+                    for a, b in zip(path, path[1:]):
+                        parent[b] = a
+                if metrics is not None:
+                    metrics.search_cpu = cpu
+                    metrics.draw_calls = draws
+                    metrics.observe_log(seen, snapshot)
+                return result
+            _, name, text, details = final
+            if name == 'NotImplementedError':
+                raise NotImplementedError(text)
+            error = SearchFailed(f"{name}: {text}" if text else name)
+            # traceback do processo filho, para depuração
+            error.details = details
+            raise error
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.terminate()
+        process.join(1.0)
+        if process.is_alive():
+            process.kill()
+            process.join()
@@ -0,0 +1,350 @@
+"""
+searchtrace.py
+
+Gravação compacta de buscas (`.trace`) e reprodução com avanço e recuo.
+
+Um trace guarda o mapa de partida (obstáculos, início e fim), a sequência
+de eventos `(índice da célula, novo estado)` da busca, o caminho e os
+contadores da execução. Pode ser gravado sem janela (`headless.py --trace`)
+numa máquina e aberto no visualizador em outra, sem refazer a busca.
+
+Codificação dos eventos: cada evento vira um inteiro `zigzag(Δíndice) << 4 |
+estado`, com Δíndice relativo ao evento anterior, escrito em varint (7 bits
+por byte). Como a fronteira de uma busca avança localmente, a maioria dos
+eventos ocupa 1 a 3 bytes (contra 8 de um evento cru). Codificação e
+decodificação são vetorizadas com numpy.
+
+Quadros-chave: a cada `keyframe_every` eventos o arquivo guarda a posição do
+evento no fluxo, o índice anterior (para retomar a decodificação ali) e um
+instantâneo esparso das células que diferem do mapa de partida (mesma
+codificação, comprimida com zlib). Ir para qualquer passo custa restaurar o
+quadro-chave anterior e aplicar no máximo `keyframe_every` eventos.
+
+Formato (little-endian): cabeçalho `HEADER`, metadados em JSON, obstáculos
+(`numpy.packbits` + zlib), tabela de quadros-chave (`KEYFRAME` cada), fluxo
+de eventos e instantâneos.
+"""
+
+import json
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from grid_model import END, EVENT_MASK, EVENT_SHIFT, OBSTACLE, START, Grid, Node
+
+MAGIC = b'MADS'
+VERSION = 1
+# magic, versão, linhas, colunas, início, fim, eventos, intervalo dos quadros-chave,
+# quadros-chave, bytes dos metadados, do mapa e do fluxo de eventos
+HEADER = struct.Struct('<4sH2xIIqqQIIIIQ')
+# passo, posição no fluxo, índice anterior, posição e tamanho do instantâneo
+KEYFRAME = struct.Struct('<QQqQI')
+EXTENSION = '.trace'
+KEYFRAME_EVERY = 65536
+
+
+def _encode(index, codes, prev):
+    """Varints de `zigzag(Δíndice) << 4 | código` (Δ em relação ao evento anterior)."""
+    index = np.asarray(index, dtype=np.int64)
+    delta = np.diff(index, prepend=np.int64(prev))
+    zigzag = ((delta << 1) ^ (delta >> 63)).astype(np.uint64)
+    values = zigzag << np.uint64(EVENT_SHIFT) | np.asarray(codes, dtype=np.uint64)
+    # bytes por valor (7 bits cada)
+    sizes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+    offsets = np.cumsum(sizes) - sizes
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    for k in range(int(sizes.max()) if len(sizes) else 0):
+        sel = sizes > k
+        byte = (values[sel] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (sizes[sel] - 1 > k).astype(np.uint64) << np.uint64(7)
+        out[offsets[sel] + k] = byte | more
+    return out.tobytes()
+
+
+def _decode(data, prev):
+    """Inverso de `_encode`: retorna `(índices int64, códigos uint8)`."""
+    b = np.frombuffer(data, dtype=np.uint8)
+    if not len(b):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+    ends = np.flatnonzero(b < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    group = np.zeros(len(b), dtype=np.int64)
+    group[starts[1:]] = 1
+    group = np.cumsum(group)
+    shift = (np.arange(len(b)) - starts[group]) * 7
+    values = np.bitwise_or.reduceat((b & 0x7F).astype(np.uint64) << shift.astype(np.uint64), starts)
+    codes = (values & np.uint64(EVENT_MASK)).astype(np.uint8)
+    zigzag = values >> np.uint64(EVENT_SHIFT)
+    delta = (zigzag >> np.uint64(1)).astype(np.int64) ^ -(zigzag & np.uint64(1)).astype(np.int64)
+    return prev + np.cumsum(delta), codes
+
+
+def _apply(state, index, codes):
+    """Aplica eventos a um array de estados; o último evento de cada célula vence."""
+    if not len(index):
+        return
+    last, first = np.unique(index[::-1], return_index=True)
+    state[last] = codes[::-1][first]
+
+
+class SearchTrace:
+    """Trace de uma busca: mapa de partida, eventos codificados, caminho e contadores.
+
+    Crie com `SearchTrace.record(...)` (eventos de uma busca) ou
+    `SearchTrace.load(path)`; grave com `save(path)`.
+    """
+    def __init__(self, rows, cols, obstacles, start, end, stream, keyframes, snapshots, steps,
+                 meta=None, keyframe_every=KEYFRAME_EVERY):
+        self.rows = rows
+        self.cols = cols
+        # obstáculos do mapa de partida (bool, rows * cols)
+        self.obstacles = obstacles
+        self.start = start
+        self.end = end
+        self.stream = stream
+        # (passo, posição no fluxo, índice anterior, posição e tamanho do instantâneo)
+        self.keyframes = keyframes
+        self.snapshots = snapshots
+        self.steps = steps
+        self.meta = meta or {}
+        self.keyframe_every = keyframe_every
+        self._segment = (None, None)
+
+    @classmethod
+    def record(cls, base, rows, cols, start, end, events, path=None, meta=None,
+               keyframe_every=KEYFRAME_EVERY):
+        """Codifica os `events` (inteiros `índice << EVENT_SHIFT | estado`) de uma busca.
+
+        `base` são os estados do grid antes da busca (bytes ou array de
+        `rows * cols`); só obstáculos, início e fim são guardados. `path` é o
+        caminho encontrado (lista de índices) e `meta`, contadores e demais
+        informações da execução (JSON).
+        """
+        base = np.frombuffer(bytes(base), dtype=np.uint8)
+        obstacles = base == OBSTACLE
+        start, end = _node_index(start), _node_index(end)
+        events = np.asarray(events, dtype=np.int64)
+        index, codes = events >> EVENT_SHIFT, (events & EVENT_MASK).astype(np.uint8)
+
+        initial = _base_cells(obstacles, start, end)
+        state = initial.copy()
+        stream, keyframes, snapshots = [], [], []
+        offset = snap_offset = 0
+        prev = 0
+        for step in range(0, max(len(events), 1), keyframe_every):
+            changed = np.flatnonzero(state != initial)
+            snapshot = zlib.compress(_encode(changed, state[changed], 0))
+            keyframes.append((step, offset, prev, snap_offset, len(snapshot)))
+            snapshots.append(snapshot)
+            snap_offset += len(snapshot)
+            chunk = slice(step, step + keyframe_every)
+            data = _encode(index[chunk], codes[chunk], prev)
+            stream.append(data)
+            offset += len(data)
+            if len(index[chunk]):
+                prev = int(index[chunk][-1])
+            _apply(state, index[chunk], codes[chunk])
+
+        meta = dict(meta or {})
+        meta['path'] = list(path) if path else None
+        meta.setdefault('recorded_at', time.time())
+        meta['counts'] = np.bincount(codes, minlength=EVENT_MASK + 1).tolist()
+        return cls(rows, cols, obstacles, start, end, b''.join(stream), keyframes, b''.join(snapshots),
+                   len(events), meta, keyframe_every)
+
+    @property
+    def path(self):
+        return self.meta.get('path')
+
+    def base_cells(self):
+        """Estados do mapa de partida (uint8, `rows * cols`)."""
+        return _base_cells(self.obstacles, self.start, self.end)
+
+    def _keyframe_for(self, step):
+        k = min(step // self.keyframe_every, len(self.keyframes) - 1)
+        return k, self.keyframes[k]
+
+    def _decoded(self, k):
+        # eventos do trecho do quadro-chave k (o último trecho decodificado fica guardado)
+        if self._segment[0] == k:
+            return self._segment[1]
+        _, offset, prev, _, _ = self.keyframes[k]
+        stop = self.keyframes[k + 1][1] if k + 1 < len(self.keyframes) else len(self.stream)
+        decoded = _decode(self.stream[offset:stop], prev)
+        self._segment = (k, decoded)
+        return decoded
+
+    def events(self, first, last):
+        """Eventos dos passos `first:last` como `(índices, códigos)`."""
+        last = min(last, self.steps)
+        parts_index, parts_codes = [], []
+        step = first
+        while step < last:
+            k, (kstep, *_) = self._keyframe_for(step)
+            index, codes = self._decoded(k)
+            stop = min(last, kstep + len(index))
+            parts_index.append(index[step - kstep:stop - kstep])
+            parts_codes.append(codes[step - kstep:stop - kstep])
+            step = stop
+        if not parts_index:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8)
+        return np.concatenate(parts_index), np.concatenate(parts_codes)
+
+    def state_at(self, step):
+        """Estados de todas as células depois de `step` eventos (uint8, `rows * cols`)."""
+        step = max(0, min(step, self.steps))
+        k, (kstep, _, _, snap_offset, snap_len) = self._keyframe_for(step)
+        state = self.base_cells()
+        changed, codes = _decode(zlib.decompress(self.snapshots[snap_offset:snap_offset + snap_len]), 0)
+        state[changed] = codes
+        _apply(state, *self.events(kstep, step))
+        return state
+
+    def to_grid(self, width=800):
+        """`(grid, start, end)` com o mapa de partida, para reproduzir o trace."""
+        grid = Grid(self.rows, self.cols, max(1, width // max(self.rows, self.cols, 1)))
+        grid.load_cells(self.base_cells().tobytes())
+        size = self.rows * self.cols
+        start = Node(grid, self.start) if 0 <= self.start < size else None
+        end = Node(grid, self.end) if 0 <= self.end < size else None
+        return grid, start, end
+
+    def save(self, path):
+        meta = json.dumps(self.meta, default=str).encode('utf-8')
+        packed = zlib.compress(np.packbits(self.obstacles).tobytes())
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.rows, self.cols, self.start, self.end, self.steps,
+                                self.keyframe_every, len(self.keyframes), len(meta), len(packed),
+                                len(self.stream)))
+            f.write(meta)
+            f.write(packed)
+            for keyframe in self.keyframes:
+                f.write(KEYFRAME.pack(*keyframe))
+            f.write(self.stream)
+            f.write(self.snapshots)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"trace truncado: {path}")
+        (magic, version, rows, cols, start, end, steps, every, count,
+         meta_len, map_len, stream_len) = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"não é um arquivo {EXTENSION}: {path}")
+        if version != VERSION:
+            raise ValueError(f"versão {version} do formato {EXTENSION} não suportada: {path}")
+        pos = HEADER.size
+        meta = json.loads(data[pos:pos + meta_len].decode('utf-8'))
+        pos += meta_len
+        bits = np.frombuffer(zlib.decompress(data[pos:pos + map_len]), dtype=np.uint8)
+        obstacles = np.unpackbits(bits, count=rows * cols).astype(bool)
+        pos += map_len
+        keyframes = [KEYFRAME.unpack_from(data, pos + i * KEYFRAME.size) for i in range(count)]
+        pos += count * KEYFRAME.size
+        stream = data[pos:pos + stream_len]
+        if len(stream) < stream_len or not keyframes:
+            raise ValueError(f"trace truncado: {path}")
+        snapshots = data[pos + stream_len:]
+        return cls(rows, cols, obstacles, start, end, stream, keyframes, snapshots, steps, meta, every)
+
+
+def _node_index(node):
+    if node is None:
+        return -1
+    return node if isinstance(node, int) else node.index
+
+
+def _base_cells(obstacles, start, end):
+    cells = np.where(obstacles, OBSTACLE, 0).astype(np.uint8)
+    for index, code in ((start, START), (end, END)):
+        if 0 <= index < len(cells):
+            cells[index] = code
+    return cells
+
+
+class TracePlayer:
+    """Reproduz um `SearchTrace` num grid com a interface do `playback.SearchPlayer`.
+
+    Além de `step`, permite pausar (`paused`) e ir para qualquer passo
+    (`seek`). O grid tem as dimensões do trace (`SearchTrace.to_grid`).
+    """
+    # eventos decodificados por vez
+    CHUNK = 4096
+
+    def __init__(self, trace, grid, speed=64):
+        self.trace = trace
+        self.grid = grid
+        self.speed = speed
+        self.stats = None
+        self.metrics = None
+        self.error = None
+        self.paused = False
+        self.position = 0
+        self.done = trace.steps == 0
+        self.result = self._result() if self.done else None
+        self._pending = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8))
+
+    def _result(self):
+        path = self.trace.path
+        if not path:
+            return None
+        path = list(path)
+        parent = self.grid.parent
+        parent[path[0]] = -1
+        for a, b in zip(path, path[1:]):
+            parent[b] = a
+        return path
+
+    def step(self, budget=0.012):
+        """Aplica os eventos de um quadro; retorna True enquanto houver eventos (ou pausado)."""
+        if self.done:
+            return False
+        if self.paused:
+            return True
+        set_state = self.grid.set_state
+        deadline = time.perf_counter() + budget
+        limit = self.speed
+        applied = 0
+        while limit is None or applied < limit:
+            index, codes = self._pending
+            if not len(index):
+                if self.position >= self.trace.steps:
+                    self.done = True
+                    self.result = self._result()
+                    break
+                index, codes = self.trace.events(self.position, self.position + self.CHUNK)
+            n = len(index) if limit is None else min(len(index), limit - applied)
+            for i, code in zip(index[:n].tolist(), codes[:n].tolist()):
+                set_state(i, code)
+            self._pending = (index[n:], codes[n:])
+            self.position += n
+            applied += n
+            if time.perf_counter() > deadline:
+                break
+        return not self.done
+
+    def seek(self, step):
+        """Vai para o passo `step` (o grid passa a mostrar o estado depois de `step` eventos)."""
+        trace = self.trace
+        step = max(0, min(step, trace.steps))
+        self.grid.load_cells(trace.state_at(step).tobytes())
+        self.position = step
+        self._pending = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8))
+        self.done = step >= trace.steps
+        self.result = self._result() if self.done else None
+
+    def close(self):
+        self.done = True
+
+    def finish(self):
+        self.seek(self.trace.steps)
+        return self.result
+
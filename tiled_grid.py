@@ -0,0 +1,498 @@
+"""
+tiled_grid.py
+
+Grid em blocos (tiles) sobre um arquivo mapeado em memória, para mapas
+maiores que a RAM.
+
+O arquivo `.tgrid` guarda só os estados (1 byte por célula) em blocos
+quadrados de `tile` x `tile` células, bloco após bloco, então cada bloco é
+um trecho contíguo do arquivo. `TiledGrid` mantém em memória apenas os
+blocos usados recentemente (cache LRU com limite de bytes): um bloco é lido
+do arquivo mapeado na primeira vez que uma célula dele é acessada e, quando
+sai do cache, volta para o arquivo se foi alterado. A máscara de adjacência
+de cada bloco é calculada ao carregá-lo (com uma borda de 1 célula lida dos
+blocos vizinhos), então não ocupa espaço em disco.
+
+`TiledGrid` é um `Grid`: `cells`, `adj` e `parent` aceitam os mesmos
+acessos por índice linear (`row * cols + col`), `set_state` mantém a
+adjacência e os motores de `search_core` e `jps_impl` rodam sem mudanças,
+tocando só os blocos por onde a busca passa. Os pais ficam num dicionário
+(só as células alcançadas). `stats` informa acertos e faltas do cache.
+
+Exemplo (converte um mapa e busca com no máximo 32 MB de blocos):
+
+    python tiled_grid.py convert mapa.grid mapa.tgrid --tile 256
+    python tiled_grid.py search mapa.tgrid --start 0,0 --end 9999,9999 --cache-mb 32
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from grid_model import END, EMPTY, OBSTACLE, OPEN, START, STATE_NAMES, Grid, adjacency_from_free, zobrist_hash
+
+MAGIC = b'MADT'
+VERSION = 1
+HEADER = struct.Struct('<4sH2xIII')
+
+DEFAULT_TILE = 256
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+# menor cache aceito (em blocos), qualquer que seja o limite de bytes
+MIN_TILES = 4
+
+
+class TileStore:
+    """Blocos do arquivo mapeado com cache LRU limitado por `max_bytes`.
+
+    Cada bloco em memória é um `bytearray` com os estados (`tile * tile`
+    bytes) seguidos das máscaras de adjacência (mais `tile * tile` bytes).
+    """
+    def __init__(self, path, rows, cols, tile, max_bytes=DEFAULT_CACHE_BYTES):
+        self.rows = rows
+        self.cols = cols
+        self.tile = tile
+        self.shift = tile.bit_length() - 1
+        self.across = -(-cols // tile)
+        self.down = -(-rows // tile)
+        self.file = np.memmap(path, dtype=np.uint8, mode='r+', offset=HEADER.size,
+                              shape=(self.down, self.across, tile, tile))
+        self.capacity = max(MIN_TILES, max_bytes // (2 * tile * tile))
+        self.tiles = OrderedDict()
+        # blocos com estados alterados (voltam ao arquivo ao sair do cache)
+        self.modified = set()
+        # blocos que já receberam estados de busca (>= OPEN), para clear_marks
+        self.marked = set()
+        self.hits = self.misses = self.evictions = self.writes = 0
+        self._last = -1
+        self._last_buf = None
+
+    def get(self, t):
+        """Bloco `t` (linha de blocos * blocos por linha + coluna de blocos)."""
+        if t == self._last:
+            self.hits += 1
+            return self._last_buf
+        buf = self.tiles.get(t)
+        if buf is None:
+            buf = self._load(t)
+        else:
+            self.hits += 1
+            self.tiles.move_to_end(t)
+        self._last = t
+        self._last_buf = buf
+        return buf
+
+    def view(self, buf):
+        """Visão numpy `(2, tile, tile)` (estados, adjacência) de um bloco em memória."""
+        return np.frombuffer(buf, dtype=np.uint8).reshape(2, self.tile, self.tile)
+
+    def cells_of(self, tr, tc):
+        """Estados atuais de um bloco: do cache, se estiver lá, ou do arquivo."""
+        buf = self.tiles.get(tr * self.across + tc)
+        return self.view(buf)[0] if buf is not None else self.file[tr, tc]
+
+    def _load(self, t):
+        self.misses += 1
+        tr, tc = divmod(t, self.across)
+        buf = bytearray(2 * self.tile * self.tile)
+        view = self.view(buf)
+        view[0] = self.file[tr, tc]
+        self.compute_adjacency(tr, tc, view)
+        self.tiles[t] = buf
+        while len(self.tiles) > self.capacity:
+            self._evict()
+        return buf
+
+    def _evict(self):
+        t, buf = self.tiles.popitem(last=False)
+        self.evictions += 1
+        if t in self.modified:
+            self.modified.discard(t)
+            tr, tc = divmod(t, self.across)
+            self.file[tr, tc] = self.view(buf)[0]
+            self.writes += 1
+
+    def compute_adjacency(self, tr, tc, view):
+        """Recalcula a adjacência do bloco a partir dos estados e da borda vizinha."""
+        n = self.tile
+        free = np.zeros((n + 2, n + 2), dtype=bool)
+        free[1:-1, 1:-1] = view[0] != OBSTACLE
+        # borda: última/primeira linha e coluna dos 8 blocos vizinhos
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                r, c = tr + dr, tc + dc
+                if (dr or dc) and 0 <= r < self.down and 0 <= c < self.across:
+                    src_rows = slice(n - 1, n) if dr < 0 else (slice(0, 1) if dr > 0 else slice(0, n))
+                    src_cols = slice(n - 1, n) if dc < 0 else (slice(0, 1) if dc > 0 else slice(0, n))
+                    dst_rows = slice(0, 1) if dr < 0 else (slice(n + 1, n + 2) if dr > 0 else slice(1, n + 1))
+                    dst_cols = slice(0, 1) if dc < 0 else (slice(n + 1, n + 2) if dc > 0 else slice(1, n + 1))
+                    free[dst_rows, dst_cols] = self.cells_of(r, c)[src_rows, src_cols] != OBSTACLE
+        view[1] = adjacency_from_free(free)[1:-1, 1:-1]
+
+    def flush(self):
+        """Grava no arquivo os blocos alterados que ainda estão no cache."""
+        for t in sorted(self.modified):
+            tr, tc = divmod(t, self.across)
+            self.file[tr, tc] = self.view(self.tiles[t])[0]
+            self.writes += 1
+        self.modified.clear()
+        self.file.flush()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'tiles': self.down * self.across,
+            'tile': self.tile,
+            'cached': len(self.tiles),
+            'capacity': self.capacity,
+            'cache_bytes': len(self.tiles) * 2 * self.tile * self.tile,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else None,
+            'evictions': self.evictions,
+            'writes': self.writes,
+        }
+
+
+class TiledArray:
+    """Estados (`part=0`) ou adjacência (`part=1`) de um `TileStore`, por índice linear."""
+    __slots__ = ('store', 'cols', 'size', 'shift', 'mask', 'across', 'offset', 'is_cells')
+
+    def __init__(self, store, part):
+        self.store = store
+        self.cols = store.cols
+        self.size = store.rows * store.cols
+        self.shift = store.shift
+        self.mask = store.tile - 1
+        self.across = store.across
+        self.offset = part * store.tile * store.tile
+        self.is_cells = part == 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        # percorre célula a célula (lento); prefira TiledGrid.read_block
+        for index in range(self.size):
+            yield self[index]
+
+    def __getitem__(self, index):
+        r, c = divmod(index, self.cols)
+        s, m = self.shift, self.mask
+        buf = self.store.get((r >> s) * self.across + (c >> s))
+        return buf[self.offset + ((r & m) << s) + (c & m)]
+
+    def __setitem__(self, index, value):
+        r, c = divmod(index, self.cols)
+        s, m = self.shift, self.mask
+        t = (r >> s) * self.across + (c >> s)
+        store = self.store
+        store.get(t)[self.offset + ((r & m) << s) + (c & m)] = value
+        if self.is_cells:
+            store.modified.add(t)
+            if value >= OPEN:
+                store.marked.add(t)
+
+
+class SparseParents(dict):
+    """Pais por índice só das células alcançadas (-1 = sem pai)."""
+    def __missing__(self, index):
+        return -1
+
+
+class TiledGrid(Grid):
+    """`Grid` cujos estados vivem num arquivo `.tgrid` mapeado, em blocos sob demanda.
+
+    Abra um arquivo existente com `TiledGrid(path)` ou crie um com
+    `TiledGrid.create`. `max_bytes` limita a memória dos blocos em cache.
+    """
+    def __init__(self, path, max_bytes=DEFAULT_CACHE_BYTES, gap=1):
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"arquivo .tgrid truncado: {path}")
+        magic, version, rows, cols, tile = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"não é um arquivo .tgrid: {path}")
+        if version != VERSION:
+            raise ValueError(f"versão {version} do formato .tgrid não suportada: {path}")
+        self.path = path
+        self.rows = rows
+        self.cols = cols
+        self.gap = gap
+        self.tile = tile
+        self.store = TileStore(path, rows, cols, tile, max_bytes)
+        self.cells = TiledArray(self.store, 0)
+        self.adj = TiledArray(self.store, 1)
+        self.parent = SparseParents()
+        self.obstacle_version = 0
+        # hash Zobrist dos obstáculos: calculado (faixa por faixa) no primeiro uso
+        self._layout_hash = None
+        self.dirty = set()
+        self.full_redraw = False
+        self.counts = [0] * len(STATE_NAMES)
+        self.log = None
+
+    @classmethod
+    def create(cls, path, rows, cols, tile=DEFAULT_TILE, fill=EMPTY, **options):
+        """Cria um `.tgrid` com todas as células em `fill` e o abre.
+
+        `tile` deve ser potência de 2. As células de preenchimento dos blocos
+        da borda (além de `rows`/`cols`) são gravadas como obstáculo.
+        """
+        if tile < 1 or tile & (tile - 1):
+            raise ValueError(f"tile deve ser potência de 2: {tile}")
+        down, across = -(-rows // tile), -(-cols // tile)
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, rows, cols, tile))
+            f.truncate(HEADER.size + down * across * tile * tile)
+        data = np.memmap(path, dtype=np.uint8, mode='r+', offset=HEADER.size, shape=(down, across, tile, tile))
+        for tr in range(down):
+            block = data[tr]
+            if fill != EMPTY:
+                block[:] = fill
+            # linhas e colunas além do grid: obstáculo
+            extra_rows = (tr + 1) * tile - rows
+            if extra_rows > 0:
+                block[:, tile - extra_rows:, :] = OBSTACLE
+            extra_cols = across * tile - cols
+            if extra_cols > 0:
+                block[across - 1, :, tile - extra_cols:] = OBSTACLE
+        data.flush()
+        del data
+        return cls(path, **options)
+
+    @classmethod
+    def convert(cls, source, path, tile=DEFAULT_TILE, **options):
+        """Cria um `.tgrid` a partir de um mapa (`.grid`, `.map` do MovingAI ou texto).
+
+        `.grid` e `.map` são lidos em faixas de `tile` linhas, sem montar o
+        mapa inteiro na memória; outros formatos passam por `mapfile.load_map`.
+        """
+        rows, cols, bands = _map_bands(source, tile)
+        grid = cls.create(path, rows, cols, tile, **options)
+        for r0, band in bands:
+            grid.write_block(r0, 0, band, update=False)
+        grid.flush()
+        grid.rebuild_adjacency()
+        return grid
+
+    @property
+    def stats(self):
+        """Contadores do cache de blocos (acertos, faltas, despejos, gravações)."""
+        return self.store.stats()
+
+    @property
+    def layout_hash(self):
+        """Hash Zobrist dos obstáculos (o mesmo de um `Grid` com o mesmo layout).
+
+        Na primeira consulta o arquivo é lido em faixas de `tile` linhas; depois
+        o hash é mantido a cada mudança, como no `Grid`.
+        """
+        if self._layout_hash is None:
+            h = 0
+            for r0 in range(0, self.rows, self.tile):
+                band = self.read_block(r0, min(self.rows, r0 + self.tile), 0, self.cols)
+                h ^= zobrist_hash(np.flatnonzero(band == OBSTACLE) + r0 * self.cols)
+            self._layout_hash = h
+        return self._layout_hash
+
+    @layout_hash.setter
+    def layout_hash(self, value):
+        self._layout_hash = value
+
+    def read_block(self, r0, r1, c0, c1):
+        """Estados das linhas `r0:r1` e colunas `c0:c1`, lendo só os blocos envolvidos.
+
+        Blocos fora do cache são lidos direto do arquivo, sem tirar do cache
+        os blocos que a busca está usando.
+        """
+        out = np.empty((max(0, r1 - r0), max(0, c1 - c0)), dtype=np.uint8)
+        store = self.store
+        for tr, tc, src, dst in self._tiles_in(r0, r1, c0, c1):
+            out[dst] = store.cells_of(tr, tc)[src]
+        return out
+
+    def write_block(self, r0, c0, block, update=True):
+        """Grava em bloco um array 2D de estados a partir de `(r0, c0)`.
+
+        Blocos em cache são alterados no cache; os demais, direto no arquivo.
+        Com `update`, a adjacência dos blocos em cache é refeita e caches
+        derivados são invalidados (os outros blocos a calculam ao carregar).
+        """
+        block = np.asarray(block, dtype=np.uint8)
+        store = self.store
+        if self._layout_hash is not None:
+            # atualiza o hash só com as células que ganharam ou perderam obstáculo
+            h, w = block.shape
+            old = self.read_block(r0, r0 + h, c0, c0 + w)
+            rs, cs = np.nonzero((old == OBSTACLE) != (block == OBSTACLE))
+            self._layout_hash ^= zobrist_hash((rs + r0) * self.cols + cs + c0)
+        for tr, tc, src, dst in self._tiles_in(r0, r0 + block.shape[0], c0, c0 + block.shape[1]):
+            t = tr * store.across + tc
+            buf = store.tiles.get(t)
+            if buf is None:
+                store.file[tr, tc][src] = block[dst]
+            else:
+                store.view(buf)[0][src] = block[dst]
+                store.modified.add(t)
+            if (block[dst] >= OPEN).any():
+                store.marked.add(t)
+        if update:
+            self.rebuild_adjacency()
+
+    def _tiles_in(self, r0, r1, c0, c1):
+        # (linha e coluna do bloco, fatia dentro do bloco, fatia dentro do retângulo)
+        n = self.tile
+        if r1 <= r0 or c1 <= c0:
+            return
+        for tr in range(r0 // n, (r1 - 1) // n + 1):
+            rs, re = max(r0, tr * n), min(r1, (tr + 1) * n)
+            for tc in range(c0 // n, (c1 - 1) // n + 1):
+                cs, ce = max(c0, tc * n), min(c1, (tc + 1) * n)
+                yield (tr, tc, (slice(rs - tr * n, re - tr * n), slice(cs - tc * n, ce - tc * n)),
+                       (slice(rs - r0, re - r0), slice(cs - c0, ce - c0)))
+
+    def rebuild_adjacency(self):
+        """Refaz a adjacência dos blocos em cache (os demais calculam ao carregar)."""
+        store = self.store
+        for t, buf in store.tiles.items():
+            tr, tc = divmod(t, store.across)
+            store.compute_adjacency(tr, tc, store.view(buf))
+        self.obstacle_version += 1
+        self.full_redraw = True
+
+    def load_cells(self, data):
+        """Substitui todos os estados (array/bytes de `rows * cols`) e atualiza a adjacência."""
+        cells = np.frombuffer(bytes(data), dtype=np.uint8).reshape(self.rows, self.cols)
+        self.write_block(0, 0, cells)
+
+    def clear_marks(self):
+        """Limpa estados de busca só nos blocos que os receberam e esquece os pais."""
+        store = self.store
+        for t in sorted(store.marked):
+            cells = store.view(store.get(t))[0]
+            marked = cells >= OPEN
+            if marked.any():
+                cells[marked] = EMPTY
+                store.modified.add(t)
+        store.marked.clear()
+        self.parent.clear()
+        if self.dirty is not None:
+            self.full_redraw = True
+
+    def flush(self):
+        """Grava no arquivo os blocos alterados em cache."""
+        self.store.flush()
+
+
+def _map_bands(path, tile):
+    """`(linhas, colunas, faixas)`: as faixas são `(r0, estados)` de até `tile` linhas."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.grid':
+        return _grid_bands(path, tile)
+    if ext == '.map':
+        return _movingai_bands(path, tile)
+    from mapfile import load_map
+    grid, start, end = load_map(path)
+    cells = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(grid.rows, grid.cols)
+    return grid.rows, grid.cols, ((r0, cells[r0:r0 + tile]) for r0 in range(0, grid.rows, tile))
+
+
+def _grid_bands(path, tile):
+    from mapfile import HEADER as GRID_HEADER, MAGIC as GRID_MAGIC
+    with open(path, 'rb') as f:
+        magic, _, rows, cols, start, end = GRID_HEADER.unpack(f.read(GRID_HEADER.size))
+    if magic != GRID_MAGIC:
+        raise ValueError(f"não é um arquivo .grid: {path}")
+    bits = np.memmap(path, dtype=np.uint8, mode='r', offset=GRID_HEADER.size)
+
+    def bands():
+        for r0 in range(0, rows, tile):
+            r1 = min(rows, r0 + tile)
+            first, last = r0 * cols, r1 * cols
+            chunk = np.unpackbits(bits[first // 8:(last + 7) // 8])
+            band = chunk[first % 8:first % 8 + last - first].reshape(r1 - r0, cols) * np.uint8(OBSTACLE)
+            for index, code in ((start, START), (end, END)):
+                if first <= index < last:
+                    band.flat[index - first] = code
+            yield r0, band
+    return rows, cols, bands()
+
+
+def _movingai_bands(path, tile):
+    from mapfile import MOVINGAI_BLOCKED, MOVINGAI_FREE
+    f = open(path, 'rb')
+    header = {}
+    for line in f:
+        line = line.strip()
+        if line == b'map':
+            break
+        key, _, value = line.decode('ascii').partition(' ')
+        header[key] = value.strip()
+    rows, cols = int(header['height']), int(header['width'])
+    table = np.full(256, 255, dtype=np.uint8)
+    table[np.frombuffer(MOVINGAI_FREE, dtype=np.uint8)] = EMPTY
+    table[np.frombuffer(MOVINGAI_BLOCKED, dtype=np.uint8)] = OBSTACLE
+
+    def bands():
+        with f:
+            for r0 in range(0, rows, tile):
+                lines = [f.readline().rstrip() for _ in range(min(tile, rows - r0))]
+                if any(len(line) != cols for line in lines):
+                    raise ValueError(f"mapa MovingAI não tem {rows} linhas de {cols} caracteres: {path}")
+                band = table[np.frombuffer(b''.join(lines), dtype=np.uint8)].reshape(len(lines), cols)
+                if (band == 255).any():
+                    raise ValueError(f"caractere inválido no mapa MovingAI: {path}")
+                yield r0, band
+    return rows, cols, bands()
+
+
+def _parse_cell(text):
+    row, col = text.split(',')
+    return int(row), int(col)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grids em blocos sobre arquivo mapeado (.tgrid).")
+    sub = parser.add_subparsers(dest='command', required=True)
+    conv = sub.add_parser('convert', help="converte .grid, .map ou texto em .tgrid")
+    conv.add_argument('source')
+    conv.add_argument('target')
+    conv.add_argument('--tile', type=int, default=DEFAULT_TILE, help="lado do bloco (potência de 2)")
+    search = sub.add_parser('search', help="roda uma busca num .tgrid e mostra o uso do cache")
+    search.add_argument('path')
+    search.add_argument('--start', type=_parse_cell, required=True, help="'linha,coluna'")
+    search.add_argument('--end', type=_parse_cell, required=True, help="'linha,coluna'")
+    search.add_argument('--algo', choices=('astar', 'dijkstra', 'bidir_astar', 'jps'), default='astar')
+    search.add_argument('--diagonal', action='store_true')
+    search.add_argument('--cache-mb', type=float, default=DEFAULT_CACHE_BYTES / 2 ** 20)
+    args = parser.parse_args(argv)
+
+    if args.command == 'convert':
+        t0 = time.perf_counter()
+        grid = TiledGrid.convert(args.source, args.target, args.tile)
+        print(f"{grid.rows}x{grid.cols} em blocos de {grid.tile} -> {args.target} "
+              f"({time.perf_counter() - t0:.2f} s)")
+        return 0
+
+    from batch import _load, _solve
+    grid = TiledGrid(args.path, max_bytes=int(args.cache_mb * 2 ** 20))
+    grid.dirty = None
+    result = _solve(grid, _load(args.algo), args.diagonal, False, 0,
+                    grid.node(*args.start).index, grid.node(*args.end).index)
+    stats = grid.stats
+    print(f"grid: {grid.rows}x{grid.cols} ({stats['tiles']} blocos de {stats['tile']}x{stats['tile']})")
+    print(f"caminho encontrado: {'sim' if result['found'] else 'não'}; custo: {result['cost']}")
+    print(f"expansões: {result['expanded']}; tempo: {result['wall_time_ms']:.1f} ms")
+    print(f"cache: {stats['cached']}/{stats['capacity']} blocos ({stats['cache_bytes'] / 2 ** 20:.1f} MB), "
+          f"acertos {stats['hits']}, faltas {stats['misses']}, despejos {stats['evictions']}")
+    return 0 if result['found'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+viewport.py
+
+Câmera do visualizador: que parte do grid aparece na janela e em que escala.
+
+O grid inteiro raramente cabe na janela com células legíveis (um mapa de
+5000 x 5000 teria células de 0,16 px numa janela de 800 px). `Viewport`
+guarda a escala e o canto superior esquerdo visível, e faz as contas entre
+pixels e células usadas pelo desenho e pelo mouse:
+
+- com zoom, cada célula ocupa `gap` pixels (`step == 1`);
+- abaixo de 1 px por célula, a visão geral agrega blocos de `step` x `step`
+  células em 1 pixel (`gap == 1`); o renderizador escolhe a cor de cada bloco
+  pelo estado mais importante dentro dele (`renderer.downsample`).
+
+O canto (`top`, `left`) é sempre múltiplo de `step`, então os blocos da visão
+geral não mudam ao deslocar a câmera. `fit()` mostra o grid inteiro na maior
+escala possível; é também o menor zoom aceito.
+"""
+
+import pygame
+
+# escalas com zoom: pixels por célula
+CELL_SIZES = (1, 2, 3, 4, 5, 6, 8, 10, 12, 16, 20, 24, 32, 48, 64)
+# visão geral: células por pixel (lado do bloco agregado)
+OVERVIEW_STEPS = (2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64, 128)
+# níveis (gap, step) do mais distante ao mais próximo
+LEVELS = tuple((1, step) for step in reversed(OVERVIEW_STEPS)) + tuple((gap, 1) for gap in CELL_SIZES)
+
+
+class Viewport:
+    """Escala e deslocamento da janela `width` x `height` sobre um grid `rows` x `cols`."""
+    def __init__(self, width, height, rows, cols):
+        self.width = width
+        self.height = height
+        self.rows = rows
+        self.cols = cols
+        self.gap = 1
+        self.step = 1
+        self.top = 0
+        self.left = 0
+        # arrasto acumulado (em células) ainda menor que um bloco
+        self._drag = [0.0, 0.0]
+        self.fit()
+
+    @property
+    def scale(self):
+        """Pixels por célula (menor que 1 na visão geral)."""
+        return self.gap / self.step
+
+    @property
+    def key(self):
+        """Muda sempre que o desenho da janela muda (zoom, deslocamento, tamanhos)."""
+        return self.width, self.height, self.rows, self.cols, self.gap, self.step, self.top, self.left
+
+    def label(self):
+        if self.step > 1:
+            return f"visão geral, 1 px = {self.step}x{self.step} células"
+        return f"{self.gap} px por célula"
+
+    # --- escala ---
+    def fit(self):
+        """Maior escala que mostra o grid inteiro, a partir do canto."""
+        rows, cols = self.rows, self.cols
+        if cols <= self.width and rows <= self.height:
+            self.gap, self.step = max(1, min(self.width // cols, self.height // rows)), 1
+        else:
+            self.gap, self.step = 1, max(-(-cols // self.width), -(-rows // self.height))
+        self._fit = (self.gap, self.step)
+        self.top = self.left = 0
+        self._drag = [0.0, 0.0]
+
+    def levels(self):
+        """Níveis de zoom disponíveis: do grid inteiro (`fit`) até o mais próximo."""
+        least = self._fit[0] / self._fit[1]
+        return sorted({self._fit, *(level for level in LEVELS if level[0] / level[1] >= least)},
+                      key=lambda level: level[0] / level[1])
+
+    def zoom(self, steps, pos=None):
+        """Aproxima (`steps` > 0) ou afasta níveis mantendo fixa a célula sob `pos`.
+
+        Sem `pos`, o centro da janela. Retorna False se já estava no limite.
+        """
+        levels = self.levels()
+        current = (self.gap, self.step)
+        i = levels.index(current) if current in levels else 0
+        j = min(max(i + steps, 0), len(levels) - 1)
+        if j == i:
+            return False
+        x, y = pos if pos is not None else (self.width // 2, self.height // 2)
+        # célula (fracionária) sob o ponto, antes e depois da troca de escala
+        row = self.top + y / self.gap * self.step
+        col = self.left + x / self.gap * self.step
+        self.gap, self.step = levels[j]
+        self.top = round(row - y / self.gap * self.step)
+        self.left = round(col - x / self.gap * self.step)
+        self._drag = [0.0, 0.0]
+        self.clamp()
+        return True
+
+    # --- deslocamento ---
+    def pan(self, dx, dy):
+        """Arrasta o grid `dx`, `dy` pixels (o conteúdo acompanha o mouse)."""
+        drag = self._drag
+        drag[0] -= dy * self.step / self.gap
+        drag[1] -= dx * self.step / self.gap
+        # só blocos inteiros; o resto fica para o próximo arrasto
+        moves = [int(d / self.step) * self.step for d in drag]
+        drag[0] -= moves[0]
+        drag[1] -= moves[1]
+        before = self.top, self.left
+        self.top += moves[0]
+        self.left += moves[1]
+        self.clamp()
+        return (self.top, self.left) != before
+
+    def clamp(self):
+        """Mantém a câmera dentro do grid, com o canto alinhado aos blocos."""
+        step = self.step
+        max_top = max(0, self.rows - self.height // self.gap * step)
+        max_left = max(0, self.cols - self.width // self.gap * step)
+        self.top = min(max(0, self.top), max_top) // step * step
+        self.left = min(max(0, self.left), max_left) // step * step
+
+    # --- conversões ---
+    def visible(self):
+        """Células visíveis: `(r0, r1, c0, c1)`, fins exclusivos."""
+        rows = -(-self.height // self.gap) * self.step
+        cols = -(-self.width // self.gap) * self.step
+        return (self.top, min(self.rows, self.top + rows),
+                self.left, min(self.cols, self.left + cols))
+
+    def contains(self, row, col):
+        r0, r1, c0, c1 = self.visible()
+        return r0 <= row < r1 and c0 <= col < c1
+
+    def cell_at(self, pos):
+        """Célula `(row, col)` sob o pixel `pos` (na visão geral, o canto do bloco) ou None."""
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        row = self.top + y // self.gap * self.step
+        col = self.left + x // self.gap * self.step
+        if row >= self.rows or col >= self.cols:
+            return None
+        return row, col
+
+    def pixel(self, row, col):
+        """Canto superior esquerdo (em pixels) da célula ou do seu bloco."""
+        return ((col - self.left) // self.step * self.gap,
+                (row - self.top) // self.step * self.gap)
+
+    def cell_rect(self, row, col):
+        return pygame.Rect(*self.pixel(row, col), self.gap, self.gap)
+
+    def cells_rect(self, r0, r1, c0, c1):
+        """Retângulo em pixels das células `r0..r1`, `c0..c1` (inclusive)."""
+        x0, y0 = self.pixel(r0, c0)
+        x1, y1 = self.pixel(r1, c1)
+        return pygame.Rect(x0, y0, x1 - x0 + self.gap, y1 - y0 + self.gap)
+
+    def region(self, rect):
+        """Células cobertas pelo retângulo em pixels, alinhadas aos blocos, ou None."""
+        rect = pygame.Rect(rect).clip(pygame.Rect(0, 0, self.width, self.height))
+        if not rect.width or not rect.height:
+            return None
+        gap, step = self.gap, self.step
+        r0 = self.top + rect.top // gap * step
+        c0 = self.left + rect.left // gap * step
+        r1 = min(self.rows, self.top + -(-rect.bottom // gap) * step)
+        c1 = min(self.cols, self.left + -(-rect.right // gap) * step)
+        if r0 >= r1 or c0 >= c1:
+            return None
+        return r0, r1, c0, c1